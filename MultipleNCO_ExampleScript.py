@@ -55,13 +55,15 @@ Matthew J. Reno - mjreno@sandia.gov
     
 # The results of steps 2-4 are saved as .xlrd or .csv files
 
+# ParallelNCO_ExampleScript.py runs the same objectives in parallel worker
+#    processes, each with its own copy of the study
+
 
 #%% Python Library Imports
-import numpy as np
-import pandas as pd
 import cympy
 import cympy.rm
-import locale
+from cympy_automation import (Pipeline, Profiler, ReportExporter, RunJournal, StudySession,
+                              loadDriveProfile, scenarioKey, studyFingerprint)
 #import xlrd
 
 ###############################################################################
@@ -75,6 +77,26 @@ studyFilename = r'\studyFile.sxst'
 # Folder to save .xlrd and .csv results
 saveResultsFolder = r'C:\<Path>\<To>\<Save\<Results>'
 
+# Each completed run is recorded in this journal (see cympy_automation/journal.py).
+#   If the script stops part way (e.g. a license drop or CYME crash), running it
+#   again skips the runs already in the journal.  Delete the file to start over
+runJournal = RunJournal(saveResultsFolder + r'\RunJournal.jsonl')
+
+# Time each stage of the run and every cympy call (see cympy_automation/profiling.py).
+#   A summary table is printed at the end and the trace is saved as
+#   ProfileTrace.json, ProfileTrace_stages.csv and ProfileTrace_calls.csv.  With
+#   profileRun = False the script runs as without the profiler
+profileRun = False
+profiler = Profiler(enabled=profileRun)
+
+# Parse the HC reports and write the CSVs and journal entries in a background
+#   thread (see cympy_automation/exporter.py), so CYME starts the next objective
+#   while the reports of the previous one are read.  The results are printed
+#   once all objectives have run.  With exportInBackground = False each
+#   objective is parsed and printed before the next one starts
+exportInBackground = True
+reportExporter = ReportExporter() if exportInBackground else None
+
 
 
 ###############################################################################
@@ -86,38 +108,26 @@ saveResultsFolder = r'C:\<Path>\<To>\<Save\<Results>'
 print('Opening CYME Study')
 print('')
 
-locale.setlocale(locale.LC_NUMERIC, '')
-cympy.app.ActivateRefresh(True)
-
+# The study session (see cympy_automation/pipeline.py) keeps the study open for
+#   all objectives, along with everything read from it: the networks, the
+#   switching device snapshot and baseline, the DRIVE and NCO objects and the
+#   NCO parameters.  Its stages are timed by the profiler and its files are
+#   written by the report exporter
 studyFilePath = studyFolderPath + studyFilename
-cympy.study.Open(studyFilePath)
-cympy.study.ActivateModifications(False)
+session = StudySession(studyFilePath, saveResultsFolder, cympy, profiler=profiler,
+                       exporter=reportExporter)
+session.open()
 
-# Check to see if the study loaded
-spot_loads = cympy.study.ListDevices(cympy.enums.DeviceType.SpotLoad)
-networks_df = pd.DataFrame(cympy.study.ListNetworks())
-
-networks = cympy.study.ListNetworks()  # This gives all 'networks' which may include transmission lines
-
-feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)  # This gives only 'networks' which are feeders which is what Drive requires
+networks = session.networks  # This gives all 'networks' which may include transmission lines
+feeders = session.feeders  # This gives only 'networks' which are feeders which is what Drive requires
     
 
 # Get load models and load characteristics for EPRI DRIVE settings
 # In this example, custom load models were created for peak and light load conditions
 # Those load models (index 4 and 5, respectively) were hard-coded in this example, since they are required inputs for EPRI DRIVE
-# However, this code shows how you would access the various load models available in a CYME study 
-LoadModels = cympy.study.ListLoadModels()
-LoadModelNames = []
-LoadModelIDs = np.zeros((len(LoadModels),1),dtype=int)
-for ii in range(len(LoadModels)):
-    LoadModelIDs[ii]=LoadModels[ii].ID
-    LoadModelNames.append(LoadModels[ii].Name)
-peakLoadName = LoadModelNames[4]
-peakLoadID = LoadModelIDs[4,0]
-lightLoadName = LoadModelNames[5]
-lightLoadID = LoadModelIDs[5,0]
-
-feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)
+# session.loadModels lists the (name, ID) of the various load models available in the study
+peakLoadName, peakLoadID = session.loadModel(4)
+lightLoadName, lightLoadID = session.loadModel(5)
 
 ###############################################################################
 
@@ -129,80 +139,13 @@ feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)
 # The below includes Switch, Recloser, and Breaker
 
 
-switchList = cympy.study.ListDevices(cympy.enums.DeviceType.Switch)
-
-breakerList = cympy.study.ListDevices(cympy.enums.DeviceType.Breaker)
-recloserList = cympy.study.ListDevices(cympy.enums.DeviceType.Recloser)
-fuses = cympy.study.ListDevices(cympy.enums.DeviceType.Fuse)
-
-switchingDeviceTypes = []
-# From switch list, get a list of all switch ids
-switchIDs = []
-switchStatus = []
-for switchCtr in range(0,len(switchList)):
-    currSwitch = switchList[switchCtr]
-    currID = currSwitch.GetValue('DeviceNumber')
-    #currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Switch)
-    currState = currSwitch.GetValue('ClosedPhase')
-    if currState == 'None':
-        currState = 'Open'
-    else:
-        currState = 'Close'
-    switchIDs.append(currID)
-    switchStatus.append(currState)
-    switchingDeviceTypes.append('Switch')
-
-
-# From breaker list, get a list of all breaker ids
-breakerIDs = []
-breakerStatus = []
-for breakerCtr in range(0,len(breakerList)):
-    currBreaker = breakerList[breakerCtr]
-    currID = currBreaker.GetValue('DeviceNumber')
-    #currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Breaker)
-    currState = currSwitch.GetValue('ClosedPhase')
-    if currState == 'None':
-        currState = 'Open'
-    else:
-        currState = 'Close'    
-    breakerIDs.append(currID)
-    breakerStatus.append(currState)
-    switchingDeviceTypes.append('Breaker')
-
-
-# From recloser list, get a list of all recloser ids and states
-recloserIDs = []
-recloserStatus = []
-for recloserCtr in range(0,len(recloserList)):
-    currRecloser = recloserList[recloserCtr]
-    currID = currRecloser.GetValue('DeviceNumber')
-    #currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Recloser)
-    currState = currSwitch.GetValue('ClosedPhase')
-    if currState == 'None':
-        currState = 'Open'
-    else:
-        currState = 'Close'
-    recloserIDs.append(currID)
-    recloserStatus.append(currState)
-    switchingDeviceTypes.append('Recloser')
-    
-    
-# Note:  We chose to omit fuses from consideration, but those could be added with the same syntax,
-#           simply subsitute the keyword Fuse for Recloser
-
-
-allSwitchingDeviceIDs = switchIDs + breakerIDs + recloserIDs
-allSwitchingStates = switchStatus + breakerStatus + recloserStatus
-
-
-# Write Switch states to csv
-df = pd.DataFrame()
-df['Switch ID'] = np.array(allSwitchingDeviceIDs)
-df['Status'] = allSwitchingStates
-df['Type'] = switchingDeviceTypes
-filename = '\SwitchingDevicesStates_Initial.csv'
-filePath = saveResultsFolder + filename
-df.to_csv(filePath)
+# All switching devices are read in a single pass (see cympy_automation/snapshot.py)
+#   and their states are saved as SwitchingDevicesStates_Initial.csv.  They are
+#   also kept as the baseline every objective starts from
+# Note:  We chose to omit fuses from consideration, but those could be added
+#           with session.takeSnapshot(includeFuses=True)
+switchingSnapshot = session.takeSnapshot()
+print(switchingSnapshot.timingReport())
 print('')
 
 
@@ -222,136 +165,60 @@ print('')
 
 
 
-#breakers = cympy.study.ListDevices(cympy.enums.DeviceType.Breaker)
-#reclosers = cympy.study.ListDevices(cympy.enums.DeviceType.Recloser)
-#fuses = cympy.study.ListDevices(cympy.enums.DeviceType.Fuse)
 ###############################################################################
 
 
 #%% Set Up EPRI DRIVE Parameters 
 
-DRIVE = cympy.sim.EPRIDrive()  # Assigns the specific simulation a variable name
 cympy.Describe('EPRIDriveParameters') # prints the settable parameters for this tool/simulation
 
-# Use DRIVE.SetValue and DRIVE.GetValue to set a new value and get the current value respectively
-#Parameters/Future Resource Settings
-DRIVE.SetValue(True,'IncludeExistingDER')
-DRIVE.SetValue('Photovoltaic','DERType')
-DRIVE.SetValue(True,'InverterBasedInterface')
-DRIVE.SetValue(False,'ExcludeExistingViolations')
-DRIVE.SetValue(10.0,'MinTolerance')
-DRIVE.SetValue('WholeNetwork','LargeDERDistribution')
-DRIVE.SetValue(False,'UniformDERDistribution')
-DRIVE.SetValue('Remove','BadImpedanceAction')
-DRIVE.SetValue(100.0,'PowerFactor')
-DRIVE.SetValue(120.0,'FaultContribution')
-DRIVE.SetValue(60.0,'MaxDEROutputChange')
-DRIVE.SetValue(100.0,'MaxDEROutputChange_AbnormalVoltages')
-DRIVE.SetValue(True,'UseLoadModels')
-DRIVE.SetValue(True,'SimulatePeakConditions')
-DRIVE.SetValue(True,'SimulateOffPeakConditions')
-DRIVE.SetValue(int(peakLoadID),'PeakLoadModelID')
-DRIVE.SetValue(int(lightLoadID),'MinLoadModelID')
-
-# Verifications
-DRIVE.SetValue(False,'VerifyPrimaryOverVoltageLoad')
-DRIVE.SetValue(True,'VerifyPrimaryVoltageDeviationGen')
-DRIVE.SetValue(False,'VerifyPrimaryUnderVoltageLoad')
-DRIVE.SetValue(False,'VerifyPrimaryUnderVoltageGen')
-DRIVE.SetValue(105.0,'OverVoltageLimit')
-# DRIVE.SetValue(95.0,'UnderVoltageLimit')
-DRIVE.SetValue(False,'VerifyPrimaryVoltageDeviationLoad')
-DRIVE.SetValue(True,'VerifyPrimaryVoltageDeviationGen')
-DRIVE.SetValue(True,'VerifyRegulatorVoltageDeviation')
-DRIVE.SetValue(3.0,'MaxVoltageDeviation')
-DRIVE.SetValue(50.0,'MaxRegulatorVoltageDeviation')
-DRIVE.SetValue(10.0,'AllowableViolation_Thermal_Deviation')
-DRIVE.SetValue(1.0,'AllowableViolation_AbnormalVoltage')
-DRIVE.SetValue(False,'VerifyThermalLoadingLoad')
-DRIVE.SetValue(True,'VerifyThermalLoadingGen')
-DRIVE.SetValue(100.0,'ThermalLoadingDischarging')
-DRIVE.SetValue(1.0,'ThermalLoadingMinRating')
-
-#If not including protection
-DRIVE.SetValue(False,'VerifyAdditionalElementFaultCurrent')
-DRIVE.SetValue(False,'VerifySympatheticTrip')
-DRIVE.SetValue(False,'VerifyProtectionReach')
-DRIVE.SetValue(False,'VerifyUnintentionalIslanding')
-DRIVE.SetValue(False,'VerifyReverseFlow')
-DRIVE.SetValue(False,'VerifyOperationalFlexibility')
-DRIVE.SetValue(False,'VerifyFlicker')
-
-# # If including protection
-# DRIVE.SetValue(True,'VerifyAdditionalElementFaultCurrent')
-# DRIVE.SetValue(10.0,'MaxFaultCurrentDeviation')
-# DRIVE.SetValue(True,'VerifySympatheticTrip')
-# DRIVE.SetValue(150.0,'BreakerZeroSequenceCurrent')
-# DRIVE.SetValue(True,'VerifyProtectionReach')
-# DRIVE.SetValue(10.0,'MaxBreakerFaultCurrentDeviation')
-# DRIVE.SetValue(False,'VerifyUnintentionalIslanding')
-# DRIVE.SetValue(False,'VerifyReverseFlow')
-# DRIVE.SetValue(False,'VerifyOperationalFlexibility')
-# DRIVE.SetValue(True,'VerifyFlicker')
-# DRIVE.SetValue(0.35,'FlickerPst')
-# DRIVE.SetValue(0.75,'FlickerPowerChange')
-# DRIVE.SetValue(0.2,'FlickerShapeFactor')
-# DRIVE.SetValue(0.0256,'FlickerCurveValue')
-
-#Options
-DRIVE.SetValue(False,'VerifyVoltageUnbalanceLoad')
-DRIVE.SetValue(False,'VerifyVoltageUnbalanceGen')
-DRIVE.SetValue(False,'GlobalEditDER')
-DRIVE.SetValue(True,'ConsiderGenForGenImpacts')
-DRIVE.SetValue(False,'ConsiderGenForLoadImpacts')
-DRIVE.SetValue(False,'ConsiderStorageChargingForGenImpacts')
-DRIVE.SetValue(False,'ConsiderStorageChargingForLoadImpacts')
-DRIVE.SetValue(False,'DeleteIntermediateFilesAfterCalculation')
-
-# Reset the Maximum Large DER Penetration to 20MW for 23kV feeders
-print('Initial value - MaxLargeDERPenetrationLowVoltage: ' + DRIVE.GetValue('MaxLargeDERPenetrationLowVoltage'))
+# The DRIVE settings are read from a named profile in cympy_automation/drive_profiles.json
+#   (see cympy_automation/driveprofiles.py) instead of one DRIVE.SetValue line each.
+#   'no-protection' does not include the protection verifications; use 'with-protection'
+#   to include them.  Settings that are specific to this script and study are overrides
+# The peak and light load model IDs of this study
+driveProfile = loadDriveProfile('no-protection',
+                                overrides={'PeakLoadModelID': peakLoadID,
+                                           'MinLoadModelID': lightLoadID})
+
+# The profile resets the Maximum Large DER Penetration to 20MW for 23kV feeders
+print('Initial value - MaxLargeDERPenetrationLowVoltage: ' + session.DRIVE.GetValue('MaxLargeDERPenetrationLowVoltage'))
+print('')
+
+# Only the values that differ from DRIVE.GetValue are written with DRIVE.SetValue
+profileResult = session.configureDrive(driveProfile)
+print(profileResult.report())
 print('')
-DRIVE.SetValue(20000,'MaxLargeDERPenetrationLowVoltage')
 
 ###############################################################################
 
 #%% Run DRIVE with intial switch settings
-print('Starting EPRI DRIVE Run')
-print('')
 
-DRIVE.Run(feeders)
-
-# Save EPRI DRIVE Report as .xlsx file
-# Specify the name of the desired report - this will need to be in the list cympy.rm.ListReports()
-report_name = 'Hosting Capacity Summary Report (Powered by EPRI DRIVE™)'  
-# Specify the type of report as MSExcel to produce a .xlsx file
-report_type_save = cympy.enums.ReportModeType.MSExcel
-# Note that the path here must include the filename as well as the folder path
-
-hc1Filename = r'\HCReport_Initial.xlsx'
-savePathHC = saveResultsFolder + hc1Filename
-cympy.rm.Save(report_name, feeders, report_type_save,savePathHC)
-
-
-# Load report and calculate average HC across all feeders
-hcData = pd.read_excel(savePathHC,header=None)
-
-maxDERValues_Dist = []
-maxDERValues_Cent = []
-for rowCtr in range(0,hcData.shape[0]):
-    currRow = hcData.loc[rowCtr,:]
-    index1 = np.where(np.array(currRow)=='Hosting Capacity')[0]
-    if len(index1) > 0:
-        valueDist = currRow.loc[3]
-        valueCent = currRow.loc[5]
-        maxDERValues_Dist.append(valueDist)
-        maxDERValues_Cent.append(valueCent)
-maxDistAvg = np.round(np.mean(maxDERValues_Dist),decimals=2)
-maxCentAvg = np.round(np.mean(maxDERValues_Cent),decimals=2)
-
-print('Calulating the HC results from the output file of the intial run of EPRI DRIVE')
-print('The Average Max Distributed DER Before Running Optimizer is ' + str(maxDistAvg))
-print('The Average Max Centralized DER Before Running Optimizer is ' + str(maxCentAvg))
-print('')
+def printInitialResults(pipelineResult):
+    if pipelineResult.skipped:
+        print('Initial EPRI DRIVE Run already completed, read back from ' + runJournal.filePath)
+        print('')
+    print(pipelineResult.hcResults)
+    
+    print('Calulating the HC results from the output file of the intial run of EPRI DRIVE')
+    print('The Average Max Distributed DER Before Running Optimizer is ' + str(pipelineResult.values['maxDistAvg']))
+    print('The Average Max Centralized DER Before Running Optimizer is ' + str(pipelineResult.values['maxCentAvg']))
+    print('')
+
+# The journal keys identify the study file, the DRIVE settings and the run
+studyKey = studyFingerprint(studyFilePath)
+
+# The EPRI DRIVE report is saved as HCReport_Initial, in the CSV report mode when
+#   this CYME version has it (see cympy_automation/hcreport.py), and the HC of
+#   each feeder is read back from it.  When the journal already has the initial
+#   run, its HC is read back from the journal instead
+# submit() returns once the report is saved; the report is parsed by the
+#   exporter while NCO runs.  The results are printed in the last section
+initialPipeline = Pipeline('Initial').then('evaluate', 'Initial')
+initialFuture = initialPipeline.submit(session, runJournal,
+                                       scenarioKey(studyKey, driveProfile.hash, 'Initial'))
+if not exportInBackground:
+    printInitialResults(initialFuture.result())
 
 
 
@@ -361,44 +228,14 @@ print('')
 
 #%% Run Network Configuration Optimization tool
 
-nco = cympy.sim.NetworkConfigurationOptimization()
-nco.GetObjType()  # command give the string to use for this module in the Describe function 
+session.nco.GetObjType()  # command give the string to use for this module in the Describe function 
 cympy.Describe('SOMParameters') # The Describe function provides the list of settable parameters for the specified module
 
 # Print intial parameter values
-print('Initial value - Objective: ' + nco.GetValue('Objective'))
-print('Initial value - Method: ' + nco.GetValue('Method'))
-print('Initial value - ObjectiveLosses: ' + nco.GetValue('ObjectiveLosses'))
-print('Initial value - AcceleratedSearch: ' + nco.GetValue('AcceleratedSearch'))
-print('Initial value - InstallNewSwitch: ' + nco.GetValue('InstallNewSwitch'))
-print('Initial value - LoadFlowParamConfigID: ' + nco.GetValue('LoadFlowParamConfigID'))
-print('Initial value - ExcludedDeviceType: ' + nco.GetValue('ExcludedDeviceType'))
-print('Initial value - OperateRemotelyControlled: ' + nco.GetValue('OperateRemotelyControlled'))
-print('Initial value - ExcludedDevices: ' + nco.GetValue('ExcludedDevices'))
-print('Initial value - AllowInitialViolation: ' + nco.GetValue('AllowInitialViolation'))
-print('Initial value - IgnoreTieInSameTopo: ' + nco.GetValue('IgnoreTieInSameTopo'))
-print('Initial value - ObjectiveOperations: ' + nco.GetValue('ObjectiveOperations'))
-print('Initial value - ObjectiveLoadBalancing: ' + nco.GetValue('ObjectiveLoadBalancing'))
-print('Initial value - ObjectiveDistance: ' + nco.GetValue('ObjectiveDistance'))
-print('Initial value - ObjectiveVoltageExceptions: ' + nco.GetValue('ObjectiveVoltageExceptions'))
-print('Initial value - ObjectiveLosses: ' + nco.GetValue('ObjectiveLosses'))
-print('Initial value - ObjectiveOverload: ' + nco.GetValue('ObjectiveOverload'))
-print('Initial value - ObjectiveWeightOperations: ' + nco.GetValue('ObjectiveWeightOperations'))
-print('Initial value - ObjectiveWeightLoadBalancing: ' + nco.GetValue('ObjectiveWeightLoadBalancing'))
-print('Initial value - ObjectiveWeightDistance: ' + nco.GetValue('ObjectiveWeightDistance'))
-print('Initial value - ObjectiveWeightLosses: ' + nco.GetValue('ObjectiveWeightLosses'))
-print('Initial value - ObjectiveWeightVoltageExceptions: ' + nco.GetValue('ObjectiveWeightVoltageExceptions'))
-print('Initial value - ObjectiveWeightOverload: ' + nco.GetValue('ObjectiveWeightOverload'))
-print('Initial value - EnableMinimumLoss: ' + nco.GetValue('EnableMinimumLoss'))
-print('Initial value - MinimumLoss: ' + nco.GetValue('MinimumLoss'))
-print('Initial value - EnableMinimumLoadingUnbalance: ' + nco.GetValue('EnableMinimumLoadingUnbalance'))
-print('Initial value - MinimumLoadingUnbalance: ' + nco.GetValue('MinimumLoadingUnbalance'))
-print('Initial value - EnableMinimumLengthUnbalance: ' + nco.GetValue('EnableMinimumLengthUnbalance'))
-print('Initial value - MinimumLengthUnbalance: ' + nco.GetValue('MinimumLengthUnbalance'))
-print('Initial value - EnableMinDistanceBetweenNewSwitch: ' + nco.GetValue('EnableMinDistanceBetweenNewSwitch'))
-print('Initial value - MinDistanceBetweenNewSwitch: ' + nco.GetValue('MinDistanceBetweenNewSwitch'))
-print('Initial value - EnableMaximumNumberSwitchingOperations: ' + nco.GetValue('EnableMaximumNumberSwitchingOperations'))
-print('Initial value - MaximumNumberSwitchingOperations: ' + nco.GetValue('MaximumNumberSwitchingOperations'))
+# All SOMParameters are read once (the names come from cympy.Describe, see
+#   cympy_automation/ncoprofiles.py) and kept, so later changes only write the
+#   parameters that differ and do not read them again
+print(session.ncoParameters.report('Initial value'))
 
 objectiveList = ['MinimizeLosses', 'MinimizeVoltageExceptions','MinimizeOverloadExceptions','BalanceLoad']
 methodList = ['HeuristicLocal','HeuristicZones','HeuristicZones','HeuristicLocal']
@@ -407,113 +244,22 @@ noOpt = []
 distHC = []
 centHC = []
 
-for objCtr in range(0,len(objectiveList)):
-    currObj = objectiveList[objCtr]
-    currMethod = methodList[objCtr]
-    print('Starting ' + str(currObj) + ' Objective run')
-    noOptFlag = False    
-                     
-    nco.SetValue(currObj, 'Objective')
-    nco.SetValue(currMethod,'Method')
-    
-    
-    # This tool takes the full list of networks including transmission lines
-    #print('Run Network Configuration Optimization Tool')
-    #print('')
+def collectObjectiveResults(currObj, pipelineResult):
+    if pipelineResult.skipped:
+        print(str(currObj) + ' already completed, read back from ' + runJournal.filePath)
+        print('')
     
-    try:
-        nco.Run(networks)
-    except cympy.err.CymError as e:
-        print('NCO message below (' + str(currObj) + ') :')
-        print(e.GetMessage())
-        noOptFlag = True
+    if pipelineResult.status == 'noOptimization':
+        if not pipelineResult.skipped:
+            print('NCO message below (' + str(currObj) + ') :')
+            print(pipelineResult.stageResults[1].message)
         noOpt.append(currObj)
-    
-    
-    if not noOptFlag:
-        # Save .xlsx report with NCO tool results
-        report_name = 'Network Configuration Optimization - Summary'
-        report_type_save = cympy.enums.ReportModeType.MSExcel
-        report_type_show = cympy.enums.ReportModeType.CYMESpreadsheet
-        filenameOpt = r'OptReport_' + str(currObj) + '_' + str(currMethod) + '.xlsx'
-        savePathOpt = saveResultsFolder + filenameOpt
-        cympy.rm.Save(report_name, networks, report_type_save,savePathOpt)
-        
-        
-        # Using the list of ids, get the current/active switch state
-               
-        switchStatusAfter = []
-        
-        
-        for switchCtr in range(0,len(switchList)):
-            currSwitch = switchList[switchCtr]
-            currID = currSwitch.GetValue('DeviceNumber')
-            currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Switch)
-            switchStatusAfter.append(currState)
-        
-        
-        # From breaker list, get a list of all breaker ids
-        for breakerCtr in range(0,len(breakerList)):
-            currBreaker = breakerList[breakerCtr]
-            currID = currBreaker.GetValue('DeviceNumber')
-            currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Breaker)
-            switchStatusAfter.append(currState)
-        
-        
-        # From recloser list, get a list of all recloser ids and states
-        recloserIDs = []
-        recloserStatus = []
-        for recloserCtr in range(0,len(recloserList)):
-            currRecloser = recloserList[recloserCtr]
-            currID = currRecloser.GetValue('DeviceNumber')
-            currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Recloser)
-            switchStatusAfter.append(currState)
-        
-        
-
-        
-        # Write Switch states to csv
-        df = pd.DataFrame()
-        df['Switch ID'] = np.array(allSwitchingDeviceIDs)
-        df['Status'] = switchStatusAfter
-        df['Type'] = switchingDeviceTypes
-        filenameSwitchAfter = '\SwitchDevicesAfter_' + str(currObj) + '_' + str(currMethod) + '.csv'
-        filePathSwitchAfter = saveResultsFolder + filenameSwitchAfter
-        df.to_csv(filePathSwitchAfter)
-    
-        
-        print('Starting EPRI DRIVE Run')
-        print('')
-        
-        DRIVE.Run(feeders)
-        
-        # Save EPRI DRIVE Report as .xlsx file
-        # Specify the name of the desired report - this will need to be in the list cympy.rm.ListReports()
-        report_name = 'Hosting Capacity Summary Report (Powered by EPRI DRIVE™)'  
-        # Specify the type of report as MSExcel to produce a .xlsx file
-        report_type_save = cympy.enums.ReportModeType.MSExcel
-        # Note that the path here must include the filename as well as the folder path
-        
-        hc1Filename = r'\HCReport_' + str(currObj) + '_' + str(currMethod) + '.xlsx'
-        savePathHC = saveResultsFolder + hc1Filename
-        cympy.rm.Save(report_name, feeders, report_type_save,savePathHC)
-        
-        
-        # Load report and calculate average HC across all feeders
-        hcData = pd.read_excel(savePathHC,header=None)
-        
-        maxDERValues_Dist = []
-        maxDERValues_Cent = []
-        for rowCtr in range(0,hcData.shape[0]):
-            currRow = hcData.loc[rowCtr,:]
-            index1 = np.where(np.array(currRow)=='Hosting Capacity')[0]
-            if len(index1) > 0:
-                valueDist = currRow.loc[3]
-                valueCent = currRow.loc[5]
-                maxDERValues_Dist.append(valueDist)
-                maxDERValues_Cent.append(valueCent)
-        maxDistAvg = np.round(np.mean(maxDERValues_Dist),decimals=2)
-        maxCentAvg = np.round(np.mean(maxDERValues_Cent),decimals=2)
+    else:
+        if not pipelineResult.skipped:
+            print(pipelineResult.stageResults[1].readback.report())
+            print(pipelineResult.hcResults)
+        maxDistAvg = pipelineResult.values['maxDistAvg']
+        maxCentAvg = pipelineResult.values['maxCentAvg']
         
         print('Calulating the HC results from the output file of the intial run of EPRI DRIVE')
         print('The Average Max Distributed DER Before Running Optimizer is ' + str(maxDistAvg))
@@ -522,10 +268,63 @@ for objCtr in range(0,len(objectiveList)):
         
         distHC.append(maxDistAvg)
         centHC.append(maxCentAvg)
-    # End of noOptFlag condition
+    # End of noOptimization condition
+
+objectiveFutures = []
+
+for objCtr in range(0,len(objectiveList)):
+    currObj = objectiveList[objCtr]
+    currMethod = methodList[objCtr]
+    print('Starting ' + str(currObj) + ' Objective run')
+    
+    # Each objective:
+    #   - undoes the switching changes made by the previous objective, writing
+    #       back only the devices that changed (see cympy_automation/baseline.py)
+    #   - runs NCO, saves OptReport_<objective>_<method>.xlsx and reads back the
+    #       states of the devices NCO may operate into
+    #       SwitchDevicesAfter_<objective>_<method>.csv (only the parameters that
+    #       differ from the previous run are written)
+    #   - runs EPRI DRIVE and saves and reads HCReport_<objective>_<method>
+    # If NCO does not find a better configuration, DRIVE is not run.  Objectives
+    #   completed by an earlier run of this script are skipped.  With the report
+    #   exporter, HCReport_<objective>_<method> is parsed (and the CSV written)
+    #   in the background while the next objective runs
+    runName = str(currObj) + '_' + str(currMethod)
+    objectivePipeline = (Pipeline(currObj)
+                         .then('restoreBaseline')
+                         .then('optimize', runName, {'Objective': currObj, 'Method': currMethod},
+                               operableOnly=True)
+                         .then('evaluate', runName))
+    objectiveFuture = objectivePipeline.submit(session, runJournal,
+                                               scenarioKey(studyKey, driveProfile.hash, currObj, currMethod))
+    if exportInBackground:
+        objectiveFutures.append((currObj, objectiveFuture))
+    else:
+        collectObjectiveResults(currObj, objectiveFuture.result())
 
 # End of objCtr for loop
 
+###############################################################################
+
+
+#%% Print the results parsed in the background
+
+# Each result waits for its reports to be parsed, in the order the runs were
+#   submitted; an error while parsing is raised here
+if exportInBackground:
+    printInitialResults(initialFuture.result())
+    for currObj, objectiveFuture in objectiveFutures:
+        collectObjectiveResults(currObj, objectiveFuture.result())
+    reportExporter.close()
+    print(reportExporter.report())
+
+print(runJournal.report())
+
+if profileRun:
+    print('')
+    print(profiler.report())
+    profiler.save(saveResultsFolder + r'\ProfileTrace')
+
 
 ###############################################################################
 
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Parallel Multiple Optimization Study Script             ###
+
+
+# This script runs the same objective/method loop as MultipleNCO_ExampleScript,
+#    but each objective (and the initial EPRI DRIVE run) is a separate scenario
+#    that is run in its own worker process with its own copy of the study
+#    (see cympy_automation/scenarios.py).  The hosting capacity of every
+#    feeder in every scenario is merged into one table
+
+# The workflow of each scenario is:
+    #  1.  Open a copy of the .sxst model in the worker's CYME session
+    #  2.  Run the Network Configuration Optimization Tool with the scenario
+    #         objective and method (skipped for the 'Initial' scenario)
+    #  3.  Run EPRI DRIVE to determine the hosting capacity
+    
+# The reports of each scenario are saved with the same names as in
+#    MultipleNCO_ExampleScript, and the merged results are saved as
+#    HCResults_AllScenarios.csv
+
+# Notes:
+#   Each worker process uses a CYME license while the script runs, so set
+#       maxWorkers to at most the number of licenses available, or set
+#       nLicenses to let the workers check out licenses (see below)
+#   Unlike the other scripts this one has to be run as a whole (e.g. with
+#       python ParallelNCO_ExampleScript.py), not cell by cell, because the
+#       worker processes re-import this file
+#   Set useFakeBackend = True to try out the script without CYME, using the
+#       synthetic study in cympy_automation/fakecympy.py
+
+
+#%% Python Library Imports
+import functools
+import os
+import tempfile
+
+from cympy_automation import (LicensedBackend, LocalLicenseServer, fakecympy, loadDriveProfile,
+                              makeNCOScenarios, runNCOScenario, runScenarios)
+
+###############################################################################
+
+#%%  Set directory paths, filenames and scenarios
+
+# Location and name of .sxst file
+studyFolderPath = r'C:\<Path>\<To>\<Study>\<Folder>'
+studyFilename = r'\studyFile.sxst'
+
+# Folder to save .xlrd and .csv results
+saveResultsFolder = r'C:\<Path>\<To>\<Save\<Results>'
+
+objectiveList = ['MinimizeLosses', 'MinimizeVoltageExceptions','MinimizeOverloadExceptions','BalanceLoad']
+methodList = ['HeuristicLocal','HeuristicZones','HeuristicZones','HeuristicLocal']
+
+# Number of worker processes (CYME sessions); None uses one per scenario, up
+#   to the number of cores
+maxWorkers = None
+
+# Number of "CYME Scripting Tool with Python" licenses the workers may use at
+#   the same time (see cympy_automation/licenses.py).  Each worker checks out
+#   one of nLicenses seats in licenseFolder before starting CymPy, so no more
+#   workers are started than there are free seats, and a worker that finds
+#   none waits and retries with backoff.  Scripts run at the same time on this
+#   machine with the same licenseFolder share the seats.  Set to None to start
+#   the workers without checking out a seat
+nLicenses = None
+licenseFolder = saveResultsFolder + r'\Licenses'
+
+useFakeBackend = False
+
+# Folder of the HC result cache (see cympy_automation/hccache.py).  Switching
+#   configurations already analyzed with the same study and DRIVE settings, in
+#   this or an earlier run, are read from the cache instead of running DRIVE.
+#   Set to None to always run DRIVE
+hcCacheFolder = saveResultsFolder + r'\HCCache'
+
+# Positions of the peak and light load models in cympy.study.ListLoadModels(),
+#   as in session.loadModel(4) and (5) of the other scripts.  Each worker reads
+#   their IDs from its own study
+peakLoadIndex = 4
+lightLoadIndex = 5
+
+
+###############################################################################
+
+#%% EPRI DRIVE Parameters
+# The same settings as MultipleNCO_ExampleScript, read from the 'no-protection'
+#   profile in cympy_automation/drive_profiles.json (see driveprofiles.py).  Each
+#   worker sets the IDs of the peak and light load models in the profile and
+#   applies it before running DRIVE, and the profile name and hash are saved
+#   with the results and used as part of the HC result cache key
+
+driveProfile = loadDriveProfile('no-protection')
+
+
+###############################################################################
+
+#%% Run all scenarios in parallel
+
+if __name__ == '__main__':
+    studyFilePath = studyFolderPath + studyFilename
+    backendFactory = None  # each worker imports the real cympy
+    if useFakeBackend:
+        backendFactory = functools.partial(fakecympy.makeSyntheticStudy, nFeeders=8,
+                                           simulationDelay=0.25)
+        saveResultsFolder = tempfile.mkdtemp()
+        hcCacheFolder = os.path.join(saveResultsFolder, 'HCCache')
+        licenseFolder = os.path.join(saveResultsFolder, 'Licenses')
+        # The synthetic study has a single load model
+        peakLoadIndex = lightLoadIndex = 0
+
+    licenseServer = None
+    if nLicenses is not None:
+        licenseServer = LocalLicenseServer(licenseFolder, nLicenses)
+        backendFactory = LicensedBackend(licenseServer, backendFactory)
+        print(str(licenseServer.available()) + ' of ' + str(nLicenses) + ' licenses available')
+
+    scenarios = makeNCOScenarios(objectiveList, methodList)
+    scenarioFunction = functools.partial(runNCOScenario, outputFolder=saveResultsFolder,
+                                         driveSettings=driveProfile, cacheFolder=hcCacheFolder,
+                                         loadModelIndexes=(peakLoadIndex, lightLoadIndex))
+
+    print('Running ' + str(len(scenarios)) + ' scenarios')
+    print('')
+    hcResults = runScenarios(scenarios, scenarioFunction, studyFilePath,
+                             backendFactory=backendFactory, maxWorkers=maxWorkers,
+                             licenseServer=licenseServer)
+    hcResults.to_csv(os.path.join(saveResultsFolder, 'HCResults_AllScenarios.csv'))
+
+    # Average HC of each scenario, as printed by MultipleNCO_ExampleScript
+    summary = hcResults.groupby('Scenario', sort=False)[['Distributed', 'Centralized']].mean().round(2)
+    print(summary)
+    print('')
+    noOpt = list(hcResults.loc[hcResults['Status'] == 'No optimization', 'Objective'])
+    print('Objectives without a better configuration: ' + str(noOpt))
+    print('Scenarios read from the HC result cache: '
+          + str(list(hcResults.loc[hcResults['Cached'] == True, 'Scenario'].unique())))
+    print('Time spent waiting for licenses (s): '
+          + format(hcResults['License Wait'].sum(), '.1f'))
+    print('Results saved to ' + saveResultsFolder)
@@ -59,11 +59,9 @@ Matthew J. Reno - mjreno@sandia.gov
 #   Type - this should be Switch, Recloser, or Breaker (the scripts could be expanded to include whatever switching devices were required)
 
 #%% Python Library Imports
-import numpy as np
-import pandas as pd
 import cympy
 import cympy.rm
-import locale
+from cympy_automation import LoadFlowScreen, ScreeningLimits, StudySession, loadDriveProfile
 #import xlrd
 
 ###############################################################################
@@ -96,307 +94,100 @@ switchStatesFilename = '\SwitchingDeviceStates_Manual_NCO.csv'
 print('Opening CYME Study')
 print('')
 
-locale.setlocale(locale.LC_NUMERIC, '')
-cympy.app.ActivateRefresh(True)
-
+# The study session (see cympy_automation/pipeline.py) keeps the study open
+#   along with everything read from it: the networks, the switching device
+#   snapshot, the section phases used to close devices and the DRIVE object
 studyFilePath = studyFolderPath + studyFilename
-cympy.study.Open(studyFilePath)
-cympy.study.ActivateModifications(False)
-
-# Check to see if the study loaded
-spot_loads = cympy.study.ListDevices(cympy.enums.DeviceType.SpotLoad)
-networks_df = pd.DataFrame(cympy.study.ListNetworks())
-
-networks = cympy.study.ListNetworks()  # This gives all 'networks' which may include transmission lines
+session = StudySession(studyFilePath, saveResultsFolder, cympy)
+session.open()
 
-feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)  # This gives only 'networks' which are feeders which is what Drive requires
+feeders = session.feeders  # This gives only 'networks' which are feeders which is what Drive requires
     
 
 # Get load models and load characteristics for EPRI DRIVE settings
 # In this example, the default load model was used for peak and light load conditions
 # This load model was hard-coded in this example, since it is a required input for EPRI DRIVE
-# However, this code shows how you would access the various load models available in a CYME study 
+# session.loadModels lists the (name, ID) of the various load models available in the study
 # Typically, DRIVE would need a separate load model for light loading and peak loading, 
 # but this example circuit only contains a single default load model.
-LoadModels = cympy.study.ListLoadModels()
-LoadModelNames = []
-LoadModelIDs = np.zeros((len(LoadModels),1),dtype=int)
-for ii in range(len(LoadModels)):
-    LoadModelIDs[ii]=LoadModels[ii].ID
-    LoadModelNames.append(LoadModels[ii].Name)
-peakLoadName = LoadModelNames[0]
-peakLoadID = LoadModelIDs[0,0]
-lightLoadName = LoadModelNames[0]
-lightLoadID = LoadModelIDs[0,0]
-
-feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)
-
-load_flow = cympy.sim.LoadFlow()
-load_flow.Run()
+peakLoadName, peakLoadID = session.loadModel(0)
+lightLoadName, lightLoadID = session.loadModel(0)
 
 
 ###############################################################################
 
 
-#%%  Read and Parse CSV file with manual switch settings
+#%%  Read the switching devices and set them to the CSV switch settings
 
+# Get the switching devices and their current states from the study in a single
+#   pass (see cympy_automation/snapshot.py).  The CSV with the initial states is
+#   not needed by this script
+switchingSnapshot = session.takeSnapshot(filename=None)
+print(switchingSnapshot.timingReport())
+print('')
 
+# The device IDs and types in the CSV are checked against the devices in the
+#   study; devices which do not match are excluded, but the script will continue
+# Only the devices whose state in the CSV differs from their current state in
+#   the study are written (onlyChanges=True), since every SetValue makes CYME
+#   update the model.  Use onlyChanges=False to write every device in the CSV
 switchStatesFilePath = switchStatesFolder + switchStatesFilename
-manSwitchStatesDF = pd.read_csv(switchStatesFilePath)
-
-manDeviceIDs = manSwitchStatesDF['Switch ID']
-manDeviceStates = manSwitchStatesDF['Status']
-manDeviceTypes = manSwitchStatesDF['Type']
-
-
-# Get list of switches from the study
-switchList = cympy.study.ListDevices(cympy.enums.DeviceType.Switch)
-breakerList = cympy.study.ListDevices(cympy.enums.DeviceType.Breaker)
-recloserList = cympy.study.ListDevices(cympy.enums.DeviceType.Recloser)
-
-switchTest=switchList[0]
-switchTest.GetValue('ClosedPhase')
-
-
-# Using the list of ids, get the current/active switch state
-allOrgStates = []
-switchIDs = []
-for switchCtr in range(0,len(switchList)):
-    currSwitch = switchList[switchCtr]
-    currID = currSwitch.GetValue('DeviceNumber')
-    switchIDs.append(currID)
-    allOrgStates.append(currSwitch.GetValue('ClosedPhase'))
-
-# From breaker list, get a list of all breaker ids
-breakerIDs = []
-for breakerCtr in range(0,len(breakerList)):
-    currBreaker = breakerList[breakerCtr]
-    currID = currBreaker.GetValue('DeviceNumber')  
-    breakerIDs.append(currID)
-    allOrgStates.append(currBreaker.GetValue('ClosedPhase'))
-
-# From recloser list, get a list of all recloser ids and states
-recloserIDs = []
-recloserStatus = []
-for recloserCtr in range(0,len(recloserList)):
-    currRecloser = recloserList[recloserCtr]
-    currID = currRecloser.GetValue('DeviceNumber')
-    recloserIDs.append(currID)
-    allOrgStates.append(currRecloser.GetValue('ClosedPhase'))
- 
-
-# This section splits the devices by type - new types would need to be added here (for example fuses)
-# This section also does error checking to make sure the device IDs in the CSV match device IDs in the study
-#   devices which do not match are excluded, but the script will continue
-manRecloserIDs = []
-manRecloserStatus = []
-manSwitchIDs = []
-manSwitchStatus = []
-manBreakerIDs = []
-manBreakerStatus = []
-missingDevices = []
-unknownTypes = []
-
-for deviceCtr in range(0,len(manDeviceIDs)):
-    currID = manDeviceIDs[deviceCtr]
-    currState = manDeviceStates[deviceCtr]
-    currType = manDeviceTypes[deviceCtr]
-    
-    if currType == 'Switch':
-        if currID not in set(switchIDs):
-            missingDevices.append(currID)
-        else:
-            manSwitchIDs.append(currID)
-            manSwitchStatus.append(currState)
-    elif currType == 'Recloser':
-        if currID not in set(recloserIDs):
-            missingDevices.append(currID)
-        else:
-            manRecloserIDs.append(currID)
-            manRecloserStatus.append(currState)
-    elif currType == 'Breaker':
-        if currID not in set(breakerIDs):
-            missingDevices.append(currID)
-        else:
-            manBreakerIDs.append(currID)
-            manBreakerStatus.append(currState)
-    else:
-        unknownTypes.append(currID)
-    
-    if len(unknownTypes) != 0:
-        print('There are unknown device types in the CSV list.  You may need to add those device types to the script.  For this run, those devices have been excluded.  ')
-    if len(missingDevices) != 0:
-        print('There are device IDs in the CSV list which do not match device IDs in the study.  For this run those devices have been excluded. ')
-    
+switchResult = session.applySwitchStates(switchStatesFilePath, onlyChanges=True)
 
-
-# Notes:  
-#   There are two different ways in the script of referencing the devices.  
-#       The switchList variable has the Switch objects from cympy and these are
-#       what is in the cyme study
-print('CymPy Switch object:')
-print(switchList[0])
+if len(switchResult.unknownTypes) != 0:
+    print('There are unknown device types in the CSV list.  You may need to add those device types to the script.  For this run, those devices have been excluded.  ')
+if len(switchResult.missingDevices) != 0:
+    print('There are device IDs in the CSV list which do not match device IDs in the study.  For this run those devices have been excluded. ')
+print(switchResult.report())
 print('')
-#       and that has the fields DeviceNumber and DeviceType
-#       In most of the script code I have also created lists of device ids, 
-#       states, and types to work with
-print('Device Lists in the script:')
-print(switchIDs[0])
-print('or')
-print(manSwitchIDs[0])
-print(manSwitchStatus[0])
-
 
-###############################################################################
 
-#%%  Manually set the switching device states
-
-# This script doesn't check to see if the new states are the same as the old states
-#       it just uses the values in the CSV to set everything
-#       if you wanted to check in advance if the settings were the same or different,
-#           or just compare the csv version to the study version
-#           you could use originalValue = SwitchList[switchIndex].GetValue('ClosedPhase')
-#           for each switching device
-
-# Set Switch states
-newSwitchStates = []
-for switchCtr in range(0,len(manSwitchIDs)):
-    currID = manSwitchIDs[switchCtr]
-    currState = manSwitchStatus[switchCtr]
-    # Get the location of the device in the study which corresponds to the current device from the CSV
-    switchIndex = np.where(np.array(switchIDs) == currID)[0][0]
-    if currState == 'Open':
-        switchList[switchIndex].SetValue('None','ClosedPhase')
-        newSwitchStates.append('None')
-    else:
-        # If the switch is closed we also need the phase information to correctly set the switch state
-        currSection = cympy.study.GetSection(switchList[switchIndex].SectionID)
-        currPhase = currSection.GetValue('Phase')
-        switchList[switchIndex].SetValue(currPhase,'ClosedPhase')
-        newSwitchStates.append(currPhase)
-
-
-# Set Recloser states
-for recloserCtr in range(0,len(manRecloserIDs)):
-    currID = manRecloserIDs[recloserCtr]
-    currState = manRecloserStatus[recloserCtr]
-    # Get the location of the device in the study which corresponds to the current device from the CSV
-    recloserIndex = np.where(np.array(recloserIDs) == currID)[0][0]
-    if currState == 'Open':
-        recloserList[recloserIndex].SetValue('None','ClosedPhase')
-        newSwitchStates.append('None')
-
-    else:
-        # If the device is closed we also need the phase information to correctly set the switch state
-        currSection = cympy.study.GetSection(recloserList[recloserIndex].SectionID)
-        currPhase = currSection.GetValue('Phase')
-        recloserList[recloserIndex].SetValue(currPhase,'ClosedPhase')
-        newSwitchStates.append(currPhase)
-               
-
-# Set Breaker states
-for breakerCtr in range(0,len(manBreakerIDs)):
-    currID = manBreakerIDs[breakerCtr]
-    currState = manBreakerStatus[breakerCtr]
-    # Get the location of the device in the study which corresponds to the current device from the CSV
-    breakerIndex = np.where(np.array(breakerIDs) == currID)[0][0]
-    if currState == 'Open':
-        breakerList[breakerIndex].SetValue('None','ClosedPhase')
-        newSwitchStates.append('None')
-
-    else:
-        # If the switch is closed we also need the phase information to correctly set the switch state
-        currSection = cympy.study.GetSection(breakerList[breakerIndex].SectionID)
-        currPhase = currSection.GetValue('Phase')
-        breakerList[breakerIndex].SetValue(currPhase,'ClosedPhase')
-        newSwitchStates.append(currPhase)
+#%% Screen the new switch settings with a load flow
+
+# A load flow is much faster than EPRI DRIVE.  The voltage of every node and the
+#   loading of the closed switching devices are checked against the limits below
+#   (see cympy_automation/screening.py); if the new configuration already
+#   violates them, its hosting capacity results should be treated with care
+loadFlowScreen = LoadFlowScreen(switchingSnapshot, limits=ScreeningLimits(minVoltage=0.95,
+                                                                          maxVoltage=1.05,
+                                                                          maxLoading=100.0),
+                                cympyLib=session.cympyLib)
+screenResult = loadFlowScreen.run()
+print(screenResult.report())
+if not screenResult.passed:
+    print('The new switch settings violate the load flow limits, see screenResult for the nodes and devices')
+print('')
 
 
 #%% Set Up EPRI DRIVE Parameters 
-DRIVE = cympy.sim.EPRIDrive()  # Assigns the specific simulation a variable name
-
-#cympy.sim.
 
 cympy.Describe('EPRIDriveParameters') # prints the settable parameters for this tool/simulation
 
-# Use DRIVE.SetValue and DRIVE.GetValue to set a new value and get the current value respectively
-#Parameters/Future Resource Settings
-DRIVE.SetValue(True,'IncludeExistingDER')
-DRIVE.SetValue('Photovoltaic','DERType')
-DRIVE.SetValue(True,'InverterBasedInterface')
-DRIVE.SetValue(False,'ExcludeExistingViolations')
-DRIVE.SetValue(10.0,'MinTolerance')
-DRIVE.SetValue('WholeNetwork','LargeDERDistribution')
-DRIVE.SetValue(False,'UniformDERDistribution')
-DRIVE.SetValue('Remove','BadImpedanceAction')
-DRIVE.SetValue(100.0,'PowerFactor')
-DRIVE.SetValue(120.0,'FaultContribution')
-DRIVE.SetValue(60.0,'MaxDEROutputChange')
-DRIVE.SetValue(100.0,'MaxDEROutputChange_AbnormalVoltages')
-DRIVE.SetValue(True,'UseLoadModels')
-DRIVE.SetValue(True,'SimulatePeakConditions')
-DRIVE.SetValue(True,'SimulateOffPeakConditions')
-DRIVE.SetValue(int(peakLoadID),'PeakLoadModelID')
-DRIVE.SetValue(int(lightLoadID),'MinLoadModelID')
-
-# Verifications
-DRIVE.SetValue(False,'VerifyPrimaryOverVoltageLoad')
-DRIVE.SetValue(True,'VerifyPrimaryVoltageDeviationGen')
-DRIVE.SetValue(False,'VerifyPrimaryUnderVoltageLoad')
-DRIVE.SetValue(True,'VerifyPrimaryUnderVoltageGen')
-DRIVE.SetValue(105.0,'OverVoltageLimit')
-DRIVE.SetValue(95.0,'UnderVoltageLimit')
-DRIVE.SetValue(False,'VerifyPrimaryVoltageDeviationLoad')
-DRIVE.SetValue(True,'VerifyPrimaryVoltageDeviationGen')
-DRIVE.SetValue(False,'VerifyRegulatorVoltageDeviation')
-DRIVE.SetValue(3.0,'MaxVoltageDeviation')
-# DRIVE.SetValue(50.0,'MaxRegulatorVoltageDeviation')
-DRIVE.SetValue(10.0,'AllowableViolation_Thermal_Deviation')
-DRIVE.SetValue(1.0,'AllowableViolation_AbnormalVoltage')
-DRIVE.SetValue(False,'VerifyThermalLoadingLoad')
-DRIVE.SetValue(True,'VerifyThermalLoadingGen')
-DRIVE.SetValue(100.0,'ThermalLoadingDischarging')
-DRIVE.SetValue(1.0,'ThermalLoadingMinRating')
-
-#If not including protection
-DRIVE.SetValue(False,'VerifyAdditionalElementFaultCurrent')
-DRIVE.SetValue(False,'VerifySympatheticTrip')
-DRIVE.SetValue(False,'VerifyProtectionReach')
-DRIVE.SetValue(False,'VerifyUnintentionalIslanding')
-DRIVE.SetValue(False,'VerifyReverseFlow')
-DRIVE.SetValue(False,'VerifyOperationalFlexibility')
-DRIVE.SetValue(False,'VerifyFlicker')
-
-# # If including protection
-DRIVE.SetValue(False,'VerifyAdditionalElementFaultCurrent')
-# DRIVE.SetValue(10.0,'MaxFaultCurrentDeviation')
-# DRIVE.SetValue(False,'VerifySympatheticTrip')
-# DRIVE.SetValue(150.0,'BreakerZeroSequenceCurrent')
-DRIVE.SetValue(False,'VerifyProtectionReach')
-# DRIVE.SetValue(10.0,'MaxBreakerFaultCurrentDeviation')
-DRIVE.SetValue(False,'VerifyUnintentionalIslanding')
-DRIVE.SetValue(False,'VerifyReverseFlow')
-DRIVE.SetValue(False,'VerifyOperationalFlexibility')
-DRIVE.SetValue(False,'VerifyFlicker')
-# DRIVE.SetValue(0.35,'FlickerPst')
-# DRIVE.SetValue(0.75,'FlickerPowerChange')
-# DRIVE.SetValue(0.2,'FlickerShapeFactor')
-# DRIVE.SetValue(0.0256,'FlickerCurveValue')
-
-#Options
-DRIVE.SetValue(False,'VerifyVoltageUnbalanceLoad')
-DRIVE.SetValue(False,'VerifyVoltageUnbalanceGen')
-DRIVE.SetValue(False,'GlobalEditDER')
-DRIVE.SetValue(True,'ConsiderGenForGenImpacts')
-DRIVE.SetValue(False,'ConsiderGenForLoadImpacts')
-DRIVE.SetValue(False,'ConsiderStorageChargingForGenImpacts')
-DRIVE.SetValue(False,'ConsiderStorageChargingForLoadImpacts')
-DRIVE.SetValue(False,'DeleteIntermediateFilesAfterCalculation')
-
-# Reset the Maximum Large DER Penetration to 20MW for 23kV feeders
-print('Initial value - MaxLargeDERPenetrationLowVoltage: ' + DRIVE.GetValue('MaxLargeDERPenetrationLowVoltage'))
+# The DRIVE settings are read from a named profile in cympy_automation/drive_profiles.json
+#   (see cympy_automation/driveprofiles.py) instead of one DRIVE.SetValue line each.
+#   'no-protection' does not include the protection verifications; use 'with-protection'
+#   to include them.  Settings that are specific to this script and study are overrides
+# The load model IDs of this study, the under voltage verification (instead of the
+#   regulator voltage deviation) and a 10MW Maximum Large DER Penetration.  The
+#   Max Regulator Voltage Deviation of the profile is not set (None), as this
+#   script left it at the value of the study
+driveProfile = loadDriveProfile('no-protection',
+                                overrides={'PeakLoadModelID': peakLoadID,
+                                           'MinLoadModelID': lightLoadID,
+                                           'VerifyPrimaryUnderVoltageGen': True,
+                                           'UnderVoltageLimit': 95.0,
+                                           'VerifyRegulatorVoltageDeviation': False,
+                                           'MaxRegulatorVoltageDeviation': None,
+                                           'MaxLargeDERPenetrationLowVoltage': 10000})
+
+# The profile resets the Maximum Large DER Penetration to 10MW for 23kV feeders
+print('Initial value - MaxLargeDERPenetrationLowVoltage: ' + session.DRIVE.GetValue('MaxLargeDERPenetrationLowVoltage'))
+print('')
+
+# Only the values that differ from DRIVE.GetValue are written with DRIVE.SetValue
+profileResult = session.configureDrive(driveProfile)
+print(profileResult.report())
 print('')
-DRIVE.SetValue(10000,'MaxLargeDERPenetrationLowVoltage')
 
 ###############################################################################
 
@@ -404,39 +195,20 @@ DRIVE.SetValue(10000,'MaxLargeDERPenetrationLowVoltage')
 print('Starting EPRI DRIVE Run')
 print('')
 
-DRIVE.Run(feeders)
-
-# Save EPRI DRIVE Report as .xlsx file
-# Specify the name of the desired report - this will need to be in the list cympy.rm.ListReports()
-report_name = 'Hosting Capacity Summary Report (Powered by EPRI DRIVE™)'  
-# Specify the type of report as MSExcel to produce a .xlsx file
-report_type_save = cympy.enums.ReportModeType.MSExcel
-# Note that the path here must include the filename as well as the folder path
-
-hc1Filename = r'\HCReport_Initial.xlsx'
-savePathHC = saveResultsFolder + hc1Filename
-cympy.rm.Save(report_name, feeders, report_type_save,savePathHC)
-
-
-# Load report and calculate average HC across all feeders
-hcData = pd.read_excel(savePathHC,header=None)
-
-maxDERValues_Dist = []
-maxDERValues_Cent = []
-for rowCtr in range(0,hcData.shape[0]):
-    currRow = hcData.loc[rowCtr,:]
-    index1 = np.where(np.array(currRow)=='Hosting Capacity')[0]
-    if len(index1) > 0:
-        valueDist = currRow.loc[3]
-        valueCent = currRow.loc[5]
-        maxDERValues_Dist.append(valueDist)
-        maxDERValues_Cent.append(valueCent)
-maxDistAvg = np.round(np.mean(maxDERValues_Dist),decimals=2)
-maxCentAvg = np.round(np.mean(maxDERValues_Cent),decimals=2)
+# For studies with many feeders, cympy_automation.runShardedDrive can instead split
+#   the feeders over several worker processes (each with its own CYME license), with
+#   the switching device CSV passed as switchStatesFile.  It must be called from
+#   a script run as a whole under  if __name__ == '__main__':  (see drive.py)
+# The EPRI DRIVE report is saved as HCReport_Initial, in the CSV report mode when
+#   this CYME version has it (see cympy_automation/hcreport.py), and the HC of
+#   each feeder is read back from it
+evaluation = session.evaluate('Initial')
+hcResults = evaluation.hcResults
+print(hcResults)
 
 print('Calulating the HC results from the output file of the intial run of EPRI DRIVE')
-print('The Average Max Distributed DER Before Running Optimizer is ' + str(maxDistAvg))
-print('The Average Max Centralized DER Before Running Optimizer is ' + str(maxCentAvg))
+print('The Average Max Distributed DER Before Running Optimizer is ' + str(evaluation.maxDistAvg))
+print('The Average Max Centralized DER Before Running Optimizer is ' + str(evaluation.maxCentAvg))
 print('')
 
 
@@ -444,9 +216,4 @@ print('')
 
 
 # To save out a new study after making changes
-newStudyFilename = '\\newStudy2.sxst'
-
-studyFilePath = saveResultsFolder + newStudyFilename
-cympy.study.Save(studyFilePath,True,True,True)
-
-
+session.saveStudy('newStudy2.sxst')
@@ -60,11 +60,9 @@ Matthew J. Reno - mjreno@sandia.gov
 #   Type - this should be Switch, Recloser, or Breaker (the scripts could be expanded to include whatever switching devices were required)
 
 #%% Python Library Imports
-import numpy as np
-import pandas as pd
 import cympy
 import cympy.rm
-import locale
+from cympy_automation import StudySession
 #import xlrd
 
 ###############################################################################
@@ -94,20 +92,15 @@ switchStatesFilename = '\SwitchingDeviceStates_Manual_NCO.csv'
 print('Opening CYME Study')
 print('')
 
-locale.setlocale(locale.LC_NUMERIC, '')
-cympy.app.ActivateRefresh(True)
-
+# The study session (see cympy_automation/pipeline.py) keeps the study open
+#   along with everything read from it: the networks, the switching device
+#   snapshot and the section phases used to close devices
 studyFilePath = studyFolderPath + studyFilename
-cympy.study.Open(studyFilePath)
-cympy.study.ActivateModifications(False)
-
-# Check to see if the study loaded
-spot_loads = cympy.study.ListDevices(cympy.enums.DeviceType.SpotLoad)
-networks_df = pd.DataFrame(cympy.study.ListNetworks())
+session = StudySession(studyFilePath, saveResultsFolder, cympy)
+session.open()
 
-networks = cympy.study.ListNetworks()  # This gives all 'networks' which may include transmission lines
-
-feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)  # This gives only 'networks' which are feeders which is what Drive requires
+networks = session.networks  # This gives all 'networks' which may include transmission lines
+feeders = session.feeders  # This gives only 'networks' which are feeders which is what Drive requires
     
 
 ###############################################################################
@@ -117,234 +110,52 @@ feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)  # This gives
 # The below includes Switch, Recloser, and Breaker
 
 
-switchList = cympy.study.ListDevices(cympy.enums.DeviceType.Switch)
-
-breakerList = cympy.study.ListDevices(cympy.enums.DeviceType.Breaker)
-recloserList = cympy.study.ListDevices(cympy.enums.DeviceType.Recloser)
-fuses = cympy.study.ListDevices(cympy.enums.DeviceType.Fuse)
-
-switchingDeviceTypes = []
-# From switch list, get a list of all switch ids
-switchIDs = []
-switchStatus = []
-for switchCtr in range(0,len(switchList)):
-    currSwitch = switchList[switchCtr]
-    currID = currSwitch.GetValue('DeviceNumber')
-    #currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Switch)
-    currState = currSwitch.GetValue('ClosedPhase')
-    if currState == 'None':
-        currState = 'Open'
-    else:
-        currState = 'Close'
-    switchIDs.append(currID)
-    switchStatus.append(currState)
-    switchingDeviceTypes.append('Switch')
-
-
-# From breaker list, get a list of all breaker ids
-breakerIDs = []
-breakerStatus = []
-for breakerCtr in range(0,len(breakerList)):
-    currBreaker = breakerList[breakerCtr]
-    currID = currBreaker.GetValue('DeviceNumber')
-    #currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Breaker)
-    currState = currBreaker.GetValue('ClosedPhase')
-    if currState == 'None':
-        currState = 'Open'
-    else:
-        currState = 'Close'    
-    breakerIDs.append(currID)
-    breakerStatus.append(currState)
-    switchingDeviceTypes.append('Breaker')
-
-
-# From recloser list, get a list of all recloser ids and states
-recloserIDs = []
-recloserStatus = []
-for recloserCtr in range(0,len(recloserList)):
-    currRecloser = recloserList[recloserCtr]
-    currID = currRecloser.GetValue('DeviceNumber')
-    #currState = cympy.study.QueryInfoDevice("EqState",currID,cympy.enums.DeviceType.Recloser)
-    currState = currRecloser.GetValue('ClosedPhase')
-    if currState == 'None':
-        currState = 'Open'
-    else:
-        currState = 'Close'
-    recloserIDs.append(currID)
-    recloserStatus.append(currState)
-    switchingDeviceTypes.append('Recloser')
-    
-    
-# Note:  We chose to omit fuses from consideration, but those could be added with the same syntax,
-#           simply subsitute the keyword Fuse for Recloser
-
-
-allSwitchingDeviceIDs = switchIDs + breakerIDs + recloserIDs
-allSwitchingStates = switchStatus + breakerStatus + recloserStatus
-
-
-# Write Switch states to csv
-df = pd.DataFrame()
-df['Switch ID'] = np.array(allSwitchingDeviceIDs)
-df['Status'] = allSwitchingStates
-df['Type'] = switchingDeviceTypes
-filename = '\SwitchingDevicesStates_Initial.csv'
-filePath = saveResultsFolder + filename
-df.to_csv(filePath)
+# All switching devices are read in a single pass (see cympy_automation/snapshot.py)
+#   and their states are saved as SwitchingDevicesStates_Initial.csv
+# Note:  We chose to omit fuses from consideration, but those could be added
+#           with session.takeSnapshot(includeFuses=True)
+switchingSnapshot = session.takeSnapshot()
+print(switchingSnapshot.timingReport())
 print('')
 
-
-
-
-#%%  Read and Parse CSV file with manual switch settings
-
-
-switchStatesFilePath = switchStatesFolder + switchStatesFilename
-manSwitchStatesDF = pd.read_csv(switchStatesFilePath)
-
-manDeviceIDs = manSwitchStatesDF['Switch ID']
-manDeviceStates = manSwitchStatesDF['Status']
-manDeviceTypes = manSwitchStatesDF['Type']
-
-
-switchTest=switchList[0]
-switchTest.GetValue('ClosedPhase')
-
- 
-# This section splits the devices by type - new types would need to be added here (for example fuses)
-# This section also does error checking to make sure the device IDs in the CSV match device IDs in the study
-#   devices which do not match are excluded, but the script will continue
-manRecloserIDs = []
-manRecloserStatus = []
-manSwitchIDs = []
-manSwitchStatus = []
-manBreakerIDs = []
-manBreakerStatus = []
-missingDevices = []
-unknownTypes = []
-
-for deviceCtr in range(0,len(manDeviceIDs)):
-    currID = manDeviceIDs[deviceCtr]
-    currState = manDeviceStates[deviceCtr]
-    currType = manDeviceTypes[deviceCtr]
-    
-    if currType == 'Switch':
-        if currID not in set(switchIDs):
-            missingDevices.append(currID)
-        else:
-            manSwitchIDs.append(currID)
-            manSwitchStatus.append(currState)
-    elif currType == 'Recloser':
-        if currID not in set(recloserIDs):
-            missingDevices.append(currID)
-        else:
-            manRecloserIDs.append(currID)
-            manRecloserStatus.append(currState)
-    elif currType == 'Breaker':
-        if currID not in set(breakerIDs):
-            missingDevices.append(currID)
-        else:
-            manBreakerIDs.append(currID)
-            manBreakerStatus.append(currState)
-    else:
-        unknownTypes.append(currID)
-    
-    if len(unknownTypes) != 0:
-        print('There are unknown device types in the CSV list.  You may need to add those device types to the script.  For this run, those devices have been excluded.  ')
-    if len(missingDevices) != 0:
-        print('There are device IDs in the CSV list which do not match device IDs in the study.  For this run those devices have been excluded. ')
-    
-
-
-# Notes:  
-#   There are two different ways in the script of referencing the devices.  
-#       The switchList variable has the Switch objects from cympy and these are
-#       what is in the cyme study
+# There are two different ways of referencing the devices.  The snapshot has
+#   the Switch objects from cympy, which are what is in the cyme study
+switchList = switchingSnapshot.listDevices('Switch')
 print('CymPy Switch object:')
 print(switchList[0])
 print('')
-#       and that has the fields DeviceNumber and DeviceType
-#       In most of the script code I have also created lists of device ids, 
-#       states, and types to work with
+#   and that has the fields DeviceNumber and DeviceType, which are also kept
+#   as arrays of device ids, states, and types to work with
 print('Device Lists in the script:')
-print(switchIDs[0])
-print('or')
-print(manSwitchIDs[0])
-print(manSwitchStatus[0])
+print(switchingSnapshot.ids[0])
+print(switchingSnapshot.statuses[0])
+print('')
 
 
 ###############################################################################
 
 #%%  Manually set the switching device states
 
-# This script doesn't check to see if the new states are the same as the old states
-#       it just uses the values in the CSV to set everything
-#       if you wanted to check in advance if the settings were the same or different,
-#           or just compare the csv version to the study version
-#           you could use originalValue = SwitchList[switchIndex].GetValue('ClosedPhase')
-#           for each switching device
-
-# Set Switch states
-newSwitchStates = []
-for switchCtr in range(0,len(manSwitchIDs)):
-    currID = manSwitchIDs[switchCtr]
-    currState = manSwitchStatus[switchCtr]
-    # Get the location of the device in the study which corresponds to the current device from the CSV
-    switchIndex = np.where(np.array(switchIDs) == currID)[0][0]
-    if currState == 'Open':
-        switchList[switchIndex].SetValue('None','ClosedPhase')
-        newSwitchStates.append('None')
-    else:
-        # If the switch is closed we also need the phase information to correctly set the switch state
-        currSection = cympy.study.GetSection(switchList[switchIndex].SectionID)
-        currPhase = currSection.GetValue('Phase')
-        switchList[switchIndex].SetValue(currPhase,'ClosedPhase')
-        newSwitchStates.append(currPhase)
-
-
-# Set Recloser states
-for recloserCtr in range(0,len(manRecloserIDs)):
-    currID = manRecloserIDs[recloserCtr]
-    currState = manRecloserStatus[recloserCtr]
-    # Get the location of the device in the study which corresponds to the current device from the CSV
-    recloserIndex = np.where(np.array(recloserIDs) == currID)[0][0]
-    if currState == 'Open':
-        recloserList[recloserIndex].SetValue('None','ClosedPhase')
-        newSwitchStates.append('None')
-
-    else:
-        # If the device is closed we also need the phase information to correctly set the switch state
-        currSection = cympy.study.GetSection(recloserList[recloserIndex].SectionID)
-        currPhase = currSection.GetValue('Phase')
-        recloserList[recloserIndex].SetValue(currPhase,'ClosedPhase')
-        newSwitchStates.append(currPhase)
-               
-
-# Set Breaker states
-for breakerCtr in range(0,len(manBreakerIDs)):
-    currID = manBreakerIDs[breakerCtr]
-    currState = manBreakerStatus[breakerCtr]
-    # Get the location of the device in the study which corresponds to the current device from the CSV
-    breakerIndex = np.where(np.array(breakerIDs) == currID)[0][0]
-    if currState == 'Open':
-        breakerList[breakerIndex].SetValue('None','ClosedPhase')
-        newSwitchStates.append('None')
-
-    else:
-        # If the switch is closed we also need the phase information to correctly set the switch state
-        currSection = cympy.study.GetSection(breakerList[breakerIndex].SectionID)
-        currPhase = currSection.GetValue('Phase')
-        breakerList[breakerIndex].SetValue(currPhase,'ClosedPhase')
-        newSwitchStates.append(currPhase)
+# The device IDs and types in the CSV are checked against the devices in the
+#   study; devices which do not match are excluded, but the script will continue
+# Only the devices whose state in the CSV differs from their current state in
+#   the study are written (onlyChanges=True), since every SetValue makes CYME
+#   update the model.  Use onlyChanges=False to write every device in the CSV
+switchStatesFilePath = switchStatesFolder + switchStatesFilename
+switchResult = session.applySwitchStates(switchStatesFilePath, onlyChanges=True)
+
+if len(switchResult.unknownTypes) != 0:
+    print('There are unknown device types in the CSV list.  You may need to add those device types to the script.  For this run, those devices have been excluded.  ')
+if len(switchResult.missingDevices) != 0:
+    print('There are device IDs in the CSV list which do not match device IDs in the study.  For this run those devices have been excluded. ')
+print(switchResult.report())
+print('')
 
 
 ###############################################################################
 
 
 # To save out a new study after making changes
-newStudyFilename = '\\newStudy.sxst'
-
-studyFilePath = saveResultsFolder + newStudyFilename
-cympy.study.Save(studyFilePath,True,True,True)
+session.saveStudy('newStudy.sxst')
 
 
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Study Worker Example Script             ###
+
+
+# This script sends jobs to a resident CYME worker: a separate process that
+#    has already imported cympy, checked out its license and opened the study,
+#    and keeps them while it runs (see cympy_automation/worker.py).  Each job
+#    then only takes the time of the simulation itself, instead of the Python,
+#    CymPy and study startup every script run pays
+
+# The workflow is:
+    #  1.  Connect to the worker running for saveResultsFolder, or start one
+    #         (which loads the .sxst model) if none is running
+    #  2.  Set the devices to the switching device CSV and run EPRI DRIVE
+    #  3.  Run the Network Configuration Optimization Tool with an NCO profile
+    #         and run EPRI DRIVE again on the new configuration
+    #  4.  Shut the worker down if this script started it
+
+# Notes:
+#   To keep a worker running between runs of this and other scripts, run this
+#       script once with runAsWorker = True (e.g. in its own console).  It then
+#       only serves jobs, until a client sends 'shutdown'.  A worker this
+#       script starts itself ends with the script
+#   Like ParallelNCO_ExampleScript this script has to be run as a whole (e.g.
+#       with python StudyWorker_ExampleScript.py), since the worker process
+#       re-imports this file
+#   Set useFakeBackend = True to try out the script without CYME, using the
+#       synthetic study in cympy_automation/fakecympy.py
+
+
+#%% Python Library Imports
+import functools
+import os
+import tempfile
+
+from cympy_automation import (WORKER_FILE, connectWorker, fakecympy, runWorker, startWorker,
+                              takeSnapshot)
+
+###############################################################################
+
+#%%  Set directory paths, filenames and jobs
+
+# Location and name of .sxst file
+studyFolderPath = r'C:\<Path>\<To>\<Study>\<Folder>'
+studyFilename = r'\studyFile.sxst'
+
+# Folder to save .xlrd and .csv results; the address of the running worker is
+#   saved in it as CymeWorker.json
+saveResultsFolder = r'C:\<Path>\<To>\<Save\<Results>'
+
+# Location and name of .csv with switch states
+switchStatesFolder = r'C:\<Path>\<To>\<Switch>\<CSV>'
+switchStatesFilename = '\SwitchingDeviceStates_Manual_NCO.csv'
+
+# DRIVE profile (see cympy_automation/drive_profiles.json) and NCO profile (see
+#   cympy_automation/nco_profiles.json) the jobs use
+driveProfileName = 'no-protection'
+driveOverrides = {'UseLoadModels': False}
+ncoProfileName = 'MinimizeVoltageExceptions_Iterative'
+
+# True to only run the worker (until a client shuts it down), False to send the
+#   jobs below to it
+runAsWorker = False
+
+useFakeBackend = False
+
+
+###############################################################################
+
+#%% Run the jobs
+
+if __name__ == '__main__':
+    studyFilePath = studyFolderPath + studyFilename
+    switchStatesFilePath = switchStatesFolder + switchStatesFilename
+    backendFactory = None  # the worker imports the real cympy
+    if useFakeBackend:
+        backendFactory = functools.partial(fakecympy.makeSyntheticStudy, nTies=6)
+        saveResultsFolder = tempfile.mkdtemp()
+        switchStatesFilePath = os.path.join(saveResultsFolder, 'SwitchingDeviceStates_Manual.csv')
+        switchStates = takeSnapshot(backendFactory()).toDataFrame()
+        switchStates.loc[switchStates.index[:3], 'Status'] = 'Open'
+        switchStates.to_csv(switchStatesFilePath, index=False)
+
+    if runAsWorker:
+        print('Worker running for ' + studyFilePath + ', address saved in '
+              + os.path.join(saveResultsFolder, WORKER_FILE))
+        runWorker(studyFilePath, saveResultsFolder, backendFactory)
+
+    else:
+        # Use the worker already running for this results folder, if there is one
+        workerProcess = None
+        try:
+            client = connectWorker(saveResultsFolder)
+            print('Connected to the running worker')
+        except OSError:
+            print('Starting a worker (import cympy, license and study open)')
+            workerProcess, client = startWorker(studyFilePath, saveResultsFolder, backendFactory)
+        print(client.status().result)
+        print('')
+
+        # Each job returns a JobResult; its result holds the parsed results and
+        #   elapsed the time the job took in the worker
+        jobResult = client.applySwitchStates(switchStatesFilePath)
+        print('Applied the switch states: ' + str(jobResult.result))
+        jobResult = client.runDrive('Manual', driveProfileName, overrides=driveOverrides)
+        print(jobResult.result['hcResults'])
+        print('The Average Max Distributed DER is ' + str(jobResult.result['maxDistAvg'])
+              + ' (job time ' + format(jobResult.elapsed, '.2f') + ' s)')
+        print('')
+
+        # NCO starts from the study as opened, not from the CSV switch states
+        jobResult = client.runNCO('AfterOpt', ncoProfileName)
+        if jobResult.status == 'failed' or not jobResult.result['optimized']:
+            print('NCO did not find a better configuration: '
+                  + (jobResult.message or jobResult.result['message']))
+        else:
+            print('NCO changed ' + str(jobResult.result['changedDevices']) + ' devices')
+            jobResult = client.runDrive('AfterOpt', driveProfileName, overrides=driveOverrides)
+            print(jobResult.result['hcResults'])
+            print('The Average Max Distributed DER After Running Optimizer is '
+                  + str(jobResult.result['maxDistAvg']))
+        print('')
+
+        # A worker run with runAsWorker = True is left running for later runs
+        if workerProcess is not None:
+            print('Worker shut down after ' + str(client.shutdown().result['jobsRun']) + ' jobs')
+            workerProcess.join()
+        else:
+            client.close()
+        print('Results saved to ' + saveResultsFolder)
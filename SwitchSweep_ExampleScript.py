@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Switch Configuration Sweep Script             ###
+
+
+# This script evaluates many switching configurations of a study with EPRI
+#    DRIVE, instead of the single configuration chosen by NCO or read from a
+#    CSV.  The candidate configurations are tie swaps (close an open switch,
+#    open a closed one); the ones that would create a loop or de-energize part
+#    of a feeder are discarded with a local graph check before anything is
+#    run in CYME (see cympy_automation/sweep.py)
+
+# The workflow is:
+    #  1.  Load .sxst model using CymPy library
+    #  2.  Run EPRI DRIVE on the initial configuration
+    #  3.  Generate the radial candidate configurations from the loop of each tie
+    #  4.  Run a load flow on each remaining candidate and skip the ones with
+    #         voltage or loading violations
+    #  5.  Run EPRI DRIVE on each remaining candidate, only on the feeders
+    #         the swapped devices are on
+    #  6.  Save the hosting capacity of every candidate to one CSV
+
+# Notes:
+#   The number of candidates grows quickly with maxSwaps, so start with 1
+#   Set useFakeBackend = True to try out the script without CYME, using the
+#       synthetic study in cympy_automation/fakecympy.py
+
+
+#%% Python Library Imports
+import os
+import tempfile
+
+import pandas as pd
+from cympy_automation import (FeederImpactMap, LoadFlowScreen, RadialityChecker, RunJournal,
+                              ScreeningLimits, SectionPhaseCache, SwitchSweep, applyDriveProfile,
+                              cachedTopology, fakecympy, loadDriveProfile, loadHCReport, openStudy,
+                              operableMask, rankCandidates, runSweepDrive, saveHCReport,
+                              scenarioKey, studyFingerprint, summarizeHC, takeSnapshot,
+                              trainSurrogate)
+
+###############################################################################
+
+#%%  Set directory paths, filenames and sweep settings
+
+# Location and name of .sxst file
+studyFolderPath = r'C:\<Path>\<To>\<Study>\<Folder>'
+studyFilename = r'\studyFile.sxst'
+
+# Folder to save .xlrd and .csv results
+saveResultsFolder = r'C:\<Path>\<To>\<Save\<Results>'
+
+# Maximum number of tie swaps in one candidate configuration
+maxSwaps = 1
+
+# Stop after this many radial candidates (None for all of them)
+maxCandidates = None
+
+# Devices that may not be operated, in the format of the NCO ExcludedDevices
+#   and ExcludedDeviceType parameters.  Breakers are left alone by default
+excludedDevices = ''
+excludedDeviceTypes = 'Breaker'
+
+# Run a load flow on each radial candidate first and skip EPRI DRIVE for the
+#   candidates with a node voltage outside [minVoltage, maxVoltage] (pu) or a
+#   device loading above maxLoading (%).  Set to None to run DRIVE on all
+screeningLimits = ScreeningLimits(minVoltage=0.95, maxVoltage=1.05, maxLoading=100.0)
+
+# Only send the surrogateTopK candidates with the highest estimated HC to EPRI
+#   DRIVE.  The estimates come from a model trained on the HC reports and switch
+#   states saved in saveResultsFolder by earlier runs (see
+#   cympy_automation/surrogate.py).  Set to None to send all candidates
+surrogateTopK = None
+
+# DER devices (a cympy.enums.DeviceType name) counted as the DER already
+#   connected to each feeder, one of the features of the surrogate model, and
+#   the keyword of their size (None counts the devices).  Set derDeviceType to
+#   None if the study has no DER
+derDeviceType = 'Photovoltaic'
+derKey = None
+
+useFakeBackend = False
+
+if useFakeBackend:
+    cympy = fakecympy.makeSyntheticStudy(nFeeders=4, nSwitches=40, nDER=20)
+    saveResultsFolder = tempfile.mkdtemp()
+else:
+    import cympy
+    import cympy.rm
+
+
+###############################################################################
+
+#%% Open CYME Study
+
+print('Opening CYME Study')
+print('')
+
+# Section phases (to close devices) and the networks of each device (to only
+#   rerun DRIVE on the affected feeders) are read once for the open study
+sectionPhaseCache = SectionPhaseCache(cympy)
+impactMap = FeederImpactMap(cympy)
+
+studyFilePath = studyFolderPath + studyFilename
+openStudy(studyFilePath, cympy, caches=[sectionPhaseCache, impactMap])
+
+feeders = cympy.study.ListNetworks(cympy.enums.NetworkType.Feeder)
+
+switchingSnapshot = takeSnapshot(cympy)
+print(switchingSnapshot.timingReport())
+sectionPhaseCache.populate(switchingSnapshot.sectionIDs)
+impactMap.build(switchingSnapshot)
+
+
+###############################################################################
+
+#%% EPRI DRIVE on the initial configuration
+
+DRIVE = cympy.sim.EPRIDrive()
+driveProfile = loadDriveProfile('no-protection')
+profileResult = applyDriveProfile(DRIVE, driveProfile)
+print(profileResult.report())
+
+# Every DRIVE run (the initial one, and each candidate run or rejected by the
+#   screen) is recorded in the journal, so if the sweep stops part way, running
+#   the script again skips those runs (see cympy_automation/journal.py).  The
+#   keys identify the study file and the DRIVE settings, so nothing is skipped
+#   after either changes.  Use one journal per study
+runJournal = RunJournal(os.path.join(saveResultsFolder, 'RunJournal_Sweep.jsonl'))
+runKey = (studyFingerprint(studyFilePath), driveProfile.hash)
+
+initialKey = scenarioKey(*runKey, 'Initial')
+journalEntry = runJournal.get(initialKey)
+if journalEntry is not None:
+    print('Reading the initial EPRI DRIVE results from the journal')
+    hcResultsInitial = journalEntry.hcResults
+else:
+    print('Starting EPRI DRIVE Run')
+    DRIVE.Run(feeders)
+    savePathHC = saveHCReport(feeders, os.path.join(saveResultsFolder, 'HCReport_Initial'), cympy)
+    hcResultsInitial = loadHCReport(savePathHC, feeders)
+    runJournal.record(initialKey, 'Initial', outputs=[savePathHC], hcResults=hcResultsInitial)
+maxDistAvg, maxCentAvg = summarizeHC(hcResultsInitial)
+print('Initial configuration - Distributed: ' + str(maxDistAvg) + ', Centralized: ' + str(maxCentAvg))
+print('')
+
+
+###############################################################################
+
+#%% Generate the radial candidates and run EPRI DRIVE on each
+
+# The sections (with their lengths), sources, loads and DER of the study are
+#   saved to topology.npz and reused in later runs as long as the study file does not change (see
+#   cympy_automation/topology.py)
+topology = cachedTopology(os.path.join(saveResultsFolder, 'topology.npz'), studyFilePath,
+                          switchingSnapshot, cympy, derDeviceType=derDeviceType, derKey=derKey)
+radialityChecker = RadialityChecker(cympy)
+radialityChecker.build(switchingSnapshot, topology)
+
+operable = operableMask(switchingSnapshot, excludedDevices, excludedDeviceTypes, cympy)
+sweep = SwitchSweep(switchingSnapshot, radialityChecker, operable=operable,
+                    maxSwaps=maxSwaps, maxCandidates=maxCandidates)
+
+# The load flow screen checks the voltage of every node of the topology (see
+#   cympy_automation/screening.py)
+loadFlowScreen = None
+if screeningLimits is not None:
+    loadFlowScreen = LoadFlowScreen(switchingSnapshot, topology.nodeIDs, screeningLimits, cympy)
+
+# The candidates are generated and checked one at a time while DRIVE runs, so
+#   the full list of configurations is never held in memory
+candidates = sweep.candidates()
+if surrogateTopK is not None:
+    surrogate = trainSurrogate(saveResultsFolder, topology)
+    if surrogate.nObservations != 0:
+        candidates = rankCandidates(candidates, surrogate, surrogateTopK)
+        print('Sending the ' + str(len(candidates)) + ' candidates with the highest estimated HC to EPRI DRIVE')
+    else:
+        print('No saved HC results to train the surrogate model on, all candidates are sent to EPRI DRIVE')
+
+sweepResults = []
+for hcResults in runSweepDrive(candidates, switchingSnapshot, DRIVE, feeders,
+                               hcResultsInitial, saveResultsFolder, impactMap,
+                               sectionPhaseCache, cympy, screen=loadFlowScreen,
+                               journal=runJournal, runKey=runKey):
+    maxDistAvg, maxCentAvg = summarizeHC(hcResults)
+    print(hcResults['Candidate'][0] + ' - Distributed: ' + str(maxDistAvg)
+          + ', Centralized: ' + str(maxCentAvg))
+    sweepResults.append(hcResults)
+
+print('')
+print(sweep.report())
+if loadFlowScreen is not None:
+    print(loadFlowScreen.report())
+print(runJournal.report())
+
+
+###############################################################################
+
+#%% Save the results
+
+if len(sweepResults) != 0:
+    sweepResults = pd.concat(sweepResults, ignore_index=True)
+    sweepResults.to_csv(os.path.join(saveResultsFolder, 'HCResults_Sweep.csv'))
+
+    # Average HC of each candidate, best distributed HC first
+    summary = sweepResults.groupby('Candidate', sort=False)[['Distributed', 'Centralized']].mean()
+    print(summary.sort_values('Distributed', ascending=False).round(2).head(10))
+print('Results saved to ' + saveResultsFolder)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Hosting Capacity Report Benchmark             ###
+
+
+# Compares the ways of reading a Hosting Capacity Summary Report on synthetic
+#   reports of increasing size (no CYME required):
+#       - legacy:          pd.read_excel + the original row-by-row loop
+#       - read_excel:      pd.read_excel + vectorized parseHCReport
+#       - excel read-only: openpyxl read-only streaming (loadHCReport on .xlsx)
+#       - csv stream:      csv module streaming (loadHCReport on .csv)
+#
+# Run from the repository folder:
+#   python benchmarks/bench_hcreport.py
+
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cympy_automation import fakecympy, parseHCReport, readHCReport
+from cympy_automation.hcreport import streamHCReportCSV, streamHCReportExcel
+
+
+FEEDER_COUNTS = [40, 400, 4000]
+REPEATS = 3
+
+
+def legacyParse(filePath):
+    # The original loop from the scripts, kept here as the baseline
+    hcData = pd.read_excel(filePath, header=None)
+    maxDERValues_Dist = []
+    maxDERValues_Cent = []
+    for rowCtr in range(0, hcData.shape[0]):
+        currRow = hcData.loc[rowCtr, :]
+        index1 = np.where(np.array(currRow) == 'Hosting Capacity')[0]
+        if len(index1) > 0:
+            maxDERValues_Dist.append(currRow.loc[3])
+            maxDERValues_Cent.append(currRow.loc[5])
+    return maxDERValues_Dist, maxDERValues_Cent
+
+
+def bestTime(function, *args):
+    times = []
+    for repeatCtr in range(REPEATS):
+        startTime = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - startTime)
+    return min(times)
+
+
+def main():
+    cympyLib = fakecympy.FakeCympy()
+    results = []
+    with tempfile.TemporaryDirectory() as tempFolder:
+        for nFeeders in FEEDER_COUNTS:
+            feeders = ['FEEDER' + str(feederCtr + 1) for feederCtr in range(nFeeders)]
+            rows = fakecympy.makeHCReportRows({feederID: cympyLib.hostingCapacity(feederID)
+                                               for feederID in feeders})
+            xlsxPath = os.path.join(tempFolder, 'HCReport_' + str(nFeeders) + '.xlsx')
+            csvPath = os.path.join(tempFolder, 'HCReport_' + str(nFeeders) + '.csv')
+            fakecympy.writeReportRows(rows, xlsxPath, fakecympy.ReportModeType.MSExcel)
+            fakecympy.writeReportRows(rows, csvPath, fakecympy.ReportModeType.CSV)
+
+            results.append({
+                'Feeders': nFeeders,
+                'legacy (s)': bestTime(legacyParse, xlsxPath),
+                'read_excel (s)': bestTime(lambda: parseHCReport(readHCReport(xlsxPath), feeders)),
+                'excel read-only (s)': bestTime(streamHCReportExcel, xlsxPath, feeders),
+                'csv stream (s)': bestTime(streamHCReportCSV, csvPath, feeders),
+            })
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:.4f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Python-Side Benchmark Suite             ###
+
+
+# Measures the Python-side cost of the script workflows on synthetic studies
+#   (cympy_automation/fakecympy.py, no CYME required) with 1k, 10k and 100k
+#   switching devices:
+#       - enumerate:          takeSnapshot of all switching devices
+#       - write states CSV:   the switching device CSV saved after NCO
+#       - validate CSV:       readSwitchStatesCSV + matching against the study
+#       - apply states:       applySwitchStates of a CSV that changes 10% of
+#                               the devices
+#       - read back states:   readDeviceStates after NCO
+#       - parse HC report:    loadHCReport on CSV and .xlsx reports with one
+#                               feeder per 250 devices
+#       - aggregate results:  merging the per-feeder HC of 20 scenarios and
+#                               the averages printed by the scripts
+#   The stand-in answers calls instantly, so the times are what the helpers
+#   themselves cost on top of CYME
+#
+# Every run is appended to benchmarks/benchmark_history.csv with the date,
+#   commit and machine.  A benchmark that is more than --threshold (25%)
+#   slower than the best earlier result on the same machine, and at least
+#   --min-difference (5 ms) slower so timer noise on the small studies is not
+#   flagged, is reported as a regression.  With --check the script then exits
+#   with status 1
+#
+# Run from the repository folder:
+#   python benchmarks/bench_suite.py
+#   python benchmarks/bench_suite.py --sizes 1000 10000 --repeats 5 --check
+
+
+import argparse
+import datetime
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cympy_automation import (SectionPhaseCache, applySwitchStates, fakecympy, loadHCReport,
+                              readDeviceStates, readSwitchStatesCSV, summarizeHC, takeSnapshot)
+
+
+DEVICE_COUNTS = [1000, 10000, 100000]
+REPEATS = 3
+THRESHOLD = 0.25
+MIN_DIFFERENCE = 0.005
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_history.csv')
+DEVICES_PER_FEEDER = 250
+N_SCENARIOS = 20
+
+
+def makeStudy(nDevices, seed=0):
+    """Synthetic study with about nDevices switching devices (60% switches)."""
+    nFeeders = max(4, nDevices // DEVICES_PER_FEEDER)
+    nSwitches = int(0.6 * nDevices)
+    nReclosers = int(0.1 * nDevices)
+    nFuses = int(0.25 * nDevices)
+    nBreakers = max(0, nDevices - nSwitches - nReclosers - nFuses - nFeeders)
+    return fakecympy.makeSyntheticStudy(nFeeders=nFeeders, nSections=2 * nDevices,
+                                        nSwitches=nSwitches, nReclosers=nReclosers,
+                                        nFuses=nFuses, nBreakers=nBreakers, seed=seed)
+
+
+def timeRuns(function, repeats, setup=None):
+    """Times (s) of repeats calls of function; setup is called untimed before each."""
+    times = []
+    for repeatCtr in range(repeats):
+        if setup is not None:
+            setup()
+        startTime = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - startTime)
+    return times
+
+
+def runSize(nDevices, repeats, tempFolder):
+    """Times of every benchmark on a study of nDevices switching devices."""
+    cympyLib = makeStudy(nDevices)
+    feeders = cympyLib.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+    times = {}
+
+    times['enumerate'] = timeRuns(lambda: takeSnapshot(cympyLib), repeats)
+    snapshot = takeSnapshot(cympyLib)
+
+    statesPath = os.path.join(tempFolder, 'SwitchDevices_' + str(nDevices) + '.csv')
+    times['write states CSV'] = timeRuns(lambda: snapshot.toDataFrame().to_csv(statesPath), repeats)
+
+    def validate():
+        deviceIDs, statuses, typeNames = readSwitchStatesCSV(statesPath)
+        snapshot.index.validate(deviceIDs, typeNames)
+    times['validate CSV'] = timeRuns(validate, repeats)
+
+    # Every 10th device is toggled; the setup puts the study back first
+    deviceIDs, statuses, typeNames = readSwitchStatesCSV(statesPath)
+    toggled = statuses.copy()
+    toggled[::10] = np.where(statuses[::10] == 'Open', 'Close', 'Open')
+    phaseCache = SectionPhaseCache(cympyLib)
+    phaseCache.populate(snapshot.sectionIDs)
+    times['apply states'] = timeRuns(
+        lambda: applySwitchStates(snapshot, deviceIDs, toggled, typeNames, phaseCache),
+        repeats, setup=lambda: applySwitchStates(snapshot, deviceIDs, statuses, typeNames,
+                                                 phaseCache))
+    applySwitchStates(snapshot, deviceIDs, toggled, typeNames, phaseCache)
+    times['read back states'] = timeRuns(lambda: readDeviceStates(snapshot, cympyLib), repeats)
+
+    feederHC = {feederID: cympyLib.hostingCapacity(feederID) for feederID in feeders}
+    rows = fakecympy.makeHCReportRows(feederHC)
+    for reportMode, extension in ((fakecympy.ReportModeType.CSV, '.csv'),
+                                  (fakecympy.ReportModeType.MSExcel, '.xlsx')):
+        reportPath = os.path.join(tempFolder, 'HCReport_' + str(nDevices) + extension)
+        fakecympy.writeReportRows(rows, reportPath, reportMode)
+        times['parse HC report (' + extension[1:] + ')'] = timeRuns(
+            lambda: loadHCReport(reportPath, feeders), repeats)
+
+    hcResults = loadHCReport(reportPath, feeders)
+    scenarioResults = []
+    for scenarioCtr in range(N_SCENARIOS):
+        results = hcResults.copy()
+        results[['Distributed', 'Centralized']] *= 1 + 0.01 * scenarioCtr
+        results.insert(0, 'Scenario', 'Scenario' + str(scenarioCtr + 1))
+        scenarioResults.append(results)
+
+    def aggregate():
+        allResults = pd.concat(scenarioResults, ignore_index=True)
+        allResults.groupby('Scenario', sort=False)[['Distributed', 'Centralized']].mean()
+        for results in scenarioResults:
+            summarizeHC(results)
+    times['aggregate results'] = timeRuns(aggregate, repeats)
+    return times
+
+
+def gitCommit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def findRegressions(results, history, threshold, minDifference=MIN_DIFFERENCE):
+    """
+    Rows of results slower than (1 + threshold) x, and minDifference seconds
+    more than, the best earlier time on this machine.
+    """
+    if history is None or len(history) == 0:
+        return results.iloc[0:0]
+    earlier = history[history['Machine'] == results['Machine'].iloc[0]]
+    bestEarlier = earlier.groupby(['Benchmark', 'Devices'])['Best (s)'].min().rename('Earlier Best (s)')
+    compared = results.join(bestEarlier, on=['Benchmark', 'Devices'], how='inner')
+    compared['Change (%)'] = 100.0 * (compared['Best (s)'] / compared['Earlier Best (s)'] - 1)
+    slower = ((compared['Best (s)'] > (1 + threshold) * compared['Earlier Best (s)'])
+              & (compared['Best (s)'] - compared['Earlier Best (s)'] >= minDifference))
+    return compared[slower]
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Python-side benchmarks on synthetic studies')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEVICE_COUNTS,
+                        help='numbers of switching devices')
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--history', default=HISTORY_FILE, help='CSV the results are appended to')
+    parser.add_argument('--no-history', action='store_true', help='do not read or write the history')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='slowdown reported as a regression (0.25 = 25%%)')
+    parser.add_argument('--min-difference', type=float, default=MIN_DIFFERENCE,
+                        help='smallest slowdown (s) reported as a regression')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 on a regression')
+    options = parser.parse_args(arguments)
+
+    rows = []
+    date = datetime.datetime.now().isoformat(timespec='seconds')
+    commit = gitCommit()
+    with tempfile.TemporaryDirectory() as tempFolder:
+        for nDevices in options.sizes:
+            print('Running ' + str(nDevices) + ' devices', flush=True)
+            for benchmark, times in runSize(nDevices, options.repeats, tempFolder).items():
+                rows.append({'Date': date, 'Commit': commit, 'Machine': platform.node(),
+                             'Python': platform.python_version(), 'Benchmark': benchmark,
+                             'Devices': nDevices, 'Best (s)': min(times),
+                             'Median (s)': statistics.median(times)})
+    results = pd.DataFrame(rows)
+    print('')
+    print('Best time (s) of ' + str(options.repeats) + ' runs')
+    print(results.pivot(index='Benchmark', columns='Devices', values='Best (s)')
+          .reindex(results['Benchmark'].unique()).to_string(float_format='{:.4f}'.format))
+
+    regressions = results.iloc[0:0]
+    if not options.no_history:
+        history = pd.read_csv(options.history) if os.path.isfile(options.history) else None
+        regressions = findRegressions(results, history, options.threshold,
+                                      options.min_difference)
+        results.to_csv(options.history, mode='a', header=history is None, index=False)
+        print('')
+        print('Results appended to ' + options.history)
+        if len(regressions) != 0:
+            print('Regressions (more than ' + format(100 * options.threshold, '.0f')
+                  + '% slower than the best earlier run):')
+            print(regressions[['Benchmark', 'Devices', 'Best (s)', 'Earlier Best (s)', 'Change (%)']]
+                  .to_string(index=False, float_format='{:.4f}'.format))
+        elif history is not None:
+            print('No regressions against ' + str(history['Date'].nunique()) + ' earlier runs')
+    return 1 if options.check and len(regressions) != 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
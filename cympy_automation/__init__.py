@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               CymPy Automation Helpers             ###
+
+
+# Reusable building blocks for the example scripts in this repository.  The
+#   scripts import from here so that optimizations only need to be made once
+#
+# Every helper accepts an optional cympyLib argument; see backend.py
+
+
+from .backend import getCympy
+from .baseline import BaselineState, RestoreResult
+from .drive import DriveShard, runDriveShard, runShardedDrive, shardFeeders
+from .driveprofiles import (DEFAULT_PROFILE_FILE, DriveProfile, ParameterProfile,
+                            ProfileApplyResult, applyDriveProfile, applyDriveSettings,
+                            listDriveProfiles, loadDriveProfile, loadProfile)
+from .exporter import ReportExporter, completedFuture
+from .hccache import HCResultCache, settingsKey, studyFingerprint, switchStateVector
+from .hcreport import (CENTRALIZED_COLUMN, DISTRIBUTED_COLUMN, HC_REPORT_NAME, HC_ROW_LABEL,
+                       REPORT_MODE_PREFERENCE, loadHCReport, parseHCReport, parseHCRows,
+                       readHCReport, saveHCReport, summarizeHC)
+from .impact import FeederImpactMap, changedDevices, rerunChangedFeeders
+from .journal import JournalEntry, RunJournal, scenarioKey
+from .licenses import (DEFAULT_BACKOFF, BackoffPolicy, LicenseAcquisition, LicensedBackend,
+                       LicenseUnavailable, LocalLicenseServer, acquireBackend, isLicenseError)
+from .ncoprofiles import (DEFAULT_NCO_PROFILE_FILE, SOM_PARAMETERS, NCOProfile,
+                          SimulationParameters, describeParameters, loadNCOProfile)
+from .pipeline import (NCO_REPORT_NAME, PIPELINE_STAGES, DriveRun, Evaluation,
+                       OptimizationResult, Pipeline, PipelineResult, StudySession)
+from .profiling import CYMPY_NAMESPACES, Profiler
+from .readback import StateReadback, operableMask, readDeviceStates
+from .scenarios import NCOScenario, makeNCOScenarios, runNCOScenario, runScenarios
+from .screening import (DEFAULT_LIMITS, LOADING_KEYWORD, VOLTAGE_KEYWORDS, LoadFlowScreen,
+                        ScreeningLimits, ScreeningResult)
+from .sections import SectionPhaseCache
+from .snapshot import (SWITCHING_DEVICE_TYPES, DeviceEntry, DeviceIndex,
+                       SwitchingDeviceSnapshot, phaseToStatus, takeSnapshot)
+from .study import openStudy
+from .surrogate import (FEATURE_COLUMNS, HCSurrogate, loadSavedResults, rankCandidates,
+                        trainSurrogate)
+from .sweep import RadialityChecker, SweepCandidate, SwitchSweep, runSweepDrive
+from .switching import SwitchApplyResult, applySwitchStates, readSwitchStatesCSV
+from .topology import (NetworkTopology, RadialityResult, cachedTopology, extractTopology,
+                       loadTopology)
+from .worker import (WORKER_FILE, WORKER_JOBS, JobResult, StudyWorker, WorkerClient, WorkerJob,
+                     connectWorker, runWorker, startWorker)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Baseline Snapshot and Restore             ###
+
+
+# Each NCO run changes the switching devices of the open study, so in
+#   MultipleNCO_ExampleScript.py every objective started from the switch
+#   states left by the previous objective.  The only way back to the study as
+#   saved was cympy.study.Open, which is slow on large models
+#
+# BaselineState keeps the ClosedPhase of every switching device of a snapshot
+#   (and optionally other device values and simulation parameters) in
+#   memory.  restore() writes back only what differs from the baseline:
+#       - switching devices whose open/closed state changed are set back to
+#           their baseline ClosedPhase
+#       - tracked device values (trackDeviceValues) that changed are set back
+#       - SimulationParameters objects (see ncoprofiles.py) are set back to
+#           their values when the baseline was taken
+#
+# The current switching states can be passed in (e.g. stateReadback.isOpen
+#   after NCO, see readback.py); otherwise they are read with
+#   GetValue('ClosedPhase')
+#
+# Example:
+#   baselineState = BaselineState(switchingSnapshot, [ncoParameters])
+#   ... nco.Run(networks), readDeviceStates(...) ...
+#   print(baselineState.restore(currentIsOpen=stateReadback.isOpen).report())
+
+
+import time
+
+import numpy as np
+
+
+class RestoreResult:
+    """Outcome of BaselineState.restore."""
+
+    def __init__(self, switchWrites, valueWrites, parameterWrites, elapsed):
+        self.switchWrites = switchWrites
+        self.valueWrites = valueWrites
+        self.parameterWrites = parameterWrites
+        self.elapsed = elapsed
+
+    @property
+    def writes(self):
+        return self.switchWrites + self.valueWrites + self.parameterWrites
+
+    def report(self):
+        return ('Restored the baseline in ' + format(self.elapsed, '.3f') + ' s: '
+                + str(self.switchWrites) + ' switching devices, ' + str(self.valueWrites)
+                + ' device values, ' + str(self.parameterWrites) + ' simulation parameters')
+
+
+class BaselineState:
+    """In-memory copy of the switching states (and other values) to restore."""
+
+    def __init__(self, snapshot, parameterSets=()):
+        self.snapshot = snapshot
+        self.closedPhases = snapshot.closedPhases.copy()
+        self.deviceValues = {}
+        self.parameterValues = []
+        for parameters in parameterSets:
+            if parameters.values is None:
+                parameters.read()
+            self.parameterValues.append((parameters, dict(parameters.values)))
+
+    @property
+    def isOpen(self):
+        """Boolean array, True where the device is open in the baseline."""
+        return self.closedPhases == 'None'
+
+    def trackDeviceValues(self, positions, keys):
+        """Also keep the values of keys (e.g. 'NormalStatus') of the devices at positions."""
+        for position in positions:
+            device = self.snapshot.devices[int(position)]
+            for key in keys:
+                self.deviceValues[(int(position), key)] = device.GetValue(key)
+
+    def restore(self, currentIsOpen=None):
+        """
+        Write back everything that differs from the baseline.
+
+        currentIsOpen is the current open state of every snapshot device, if
+        known; otherwise the ClosedPhase of every device is read.
+        """
+        startTime = time.perf_counter()
+        devices = self.snapshot.devices
+        if currentIsOpen is None:
+            currentIsOpen = np.array([device.GetValue('ClosedPhase') == 'None' for device in devices],
+                                     dtype=bool)
+        changed = np.flatnonzero(np.asarray(currentIsOpen, dtype=bool) != self.isOpen)
+        for position in changed:
+            devices[position].SetValue(self.closedPhases[position], 'ClosedPhase')
+        self.snapshot.closedPhases[:] = self.closedPhases
+
+        valueWrites = 0
+        for (position, key), value in self.deviceValues.items():
+            if devices[position].GetValue(key) != value:
+                devices[position].SetValue(value, key)
+                valueWrites += 1
+
+        parameterWrites = 0
+        for parameters, values in self.parameterValues:
+            parameterWrites += len(parameters.apply(values).written)
+
+        return RestoreResult(len(changed), valueWrites, parameterWrites,
+                             time.perf_counter() - startTime)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Feeder-Sharded EPRI DRIVE             ###
+
+
+# DRIVE.Run(feeders) analyzes the feeders one after the other, so the run time
+#   grows with the number of feeders.  runShardedDrive() splits the feeder
+#   list into shards and runs each shard with runScenarios() in its own worker
+#   process and CYME session, then merges the per-feeder HC results
+#
+# Each worker opens a fresh copy of the study, so any changes made in the
+#   calling session (for example by NCO) are not seen by the workers.  Pass
+#   the switching device CSV of the configuration to analyze as
+#   switchStatesFile and each worker applies it before running DRIVE
+#
+# Example:
+#   hcResults = runShardedDrive(feeders, studyFilePath, saveResultsFolder,
+#                               nShards=4, driveSettings=driveSettings,
+#                               switchStatesFile=filePathSwitchAfter)
+
+
+import collections
+import functools
+import os
+
+import numpy as np
+
+from .backend import getCympy
+from .driveprofiles import applyDriveSettings
+from .hcreport import loadHCReport, saveHCReport
+from .scenarios import runScenarios
+from .sections import SectionPhaseCache
+from .snapshot import takeSnapshot
+from .study import openStudy
+from .switching import applySwitchStates, readSwitchStatesCSV
+
+
+DriveShard = collections.namedtuple('DriveShard', ['name', 'feeders'])
+DriveShard.__doc__ = 'A named subset of the feeders to run EPRI DRIVE on.'
+
+
+def shardFeeders(feeders, nShards):
+    """Split feeders into at most nShards contiguous, nearly equal DriveShards."""
+    feeders = list(feeders)
+    nShards = max(1, min(int(nShards), len(feeders)))
+    return [DriveShard('Shard' + str(shardCtr + 1), [feeders[feederCtr] for feederCtr in shard])
+            for shardCtr, shard in enumerate(np.array_split(np.arange(len(feeders)), nShards))]
+
+
+def runDriveShard(cympyLib, studyFilePath, shard, outputFolder, driveSettings=None,
+                  switchStatesFile=None):
+    """
+    Open the study, optionally apply a switching device CSV, and run DRIVE on
+    the feeders of one shard.
+
+    The HC report is saved to outputFolder as HCReport_<shard name>.  Returns
+    the HC of each feeder in the shard with a 'Shard' column.
+    """
+    cympyLib = getCympy(cympyLib)
+    phaseCache = SectionPhaseCache(cympyLib)
+    openStudy(studyFilePath, cympyLib, caches=[phaseCache])
+    if switchStatesFile is not None:
+        snapshot = takeSnapshot(cympyLib)
+        phaseCache.populate(snapshot.sectionIDs)
+        deviceIDs, statuses, typeNames = readSwitchStatesCSV(switchStatesFile)
+        applySwitchStates(snapshot, deviceIDs, statuses, typeNames, phaseCache)
+
+    DRIVE = cympyLib.sim.EPRIDrive()
+    applyDriveSettings(DRIVE, driveSettings)
+    DRIVE.Run(shard.feeders)
+    savePathHC = saveHCReport(shard.feeders, os.path.join(outputFolder, 'HCReport_' + shard.name),
+                              cympyLib)
+    hcResults = loadHCReport(savePathHC, shard.feeders)
+    hcResults.insert(0, 'Shard', shard.name)
+    return hcResults
+
+
+def runShardedDrive(feeders, studyFilePath, outputFolder, nShards=None, driveSettings=None,
+                    switchStatesFile=None, backendFactory=None, maxWorkers=None,
+                    licenseServer=None):
+    """
+    Run EPRI DRIVE on feeders split into nShards worker processes.
+
+    nShards defaults to maxWorkers, or the number of cores.  Returns the HC of
+    every feeder in the order of feeders; rows of failed shards have Status
+    'Failed'.
+    """
+    feeders = list(feeders)
+    if nShards is None:
+        nShards = maxWorkers or os.cpu_count() or 1
+    shards = shardFeeders(feeders, nShards)
+    shardFunction = functools.partial(runDriveShard, outputFolder=outputFolder,
+                                      driveSettings=driveSettings,
+                                      switchStatesFile=switchStatesFile)
+    return runScenarios(shards, shardFunction, studyFilePath, backendFactory=backendFactory,
+                        maxWorkers=maxWorkers if maxWorkers is not None else len(shards),
+                        licenseServer=licenseServer)
+
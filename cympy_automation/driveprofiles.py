@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               EPRI DRIVE Parameter Profiles             ###
+
+
+# The scripts used to set about 50 EPRIDriveParameters with one
+#   DRIVE.SetValue(...) line each, with the protection settings switched on
+#   and off by commenting blocks in and out.  The settings are now named
+#   profiles in a JSON file (drive_profiles.json in this folder by default):
+#       {
+#           "base":            {"settings": {"IncludeExistingDER": true, ...}},
+#           "no-protection":   {"extends": "base", "settings": {...}},
+#           "with-protection": {"extends": "base", "settings": {...}}
+#       }
+#   A profile includes the settings of the profile it extends, and values
+#   that depend on the study (e.g. the load model IDs) are passed as overrides.
+#   An override of None removes a setting of the profile, so that parameter is
+#   left as it is in the study
+#
+# applyDriveProfile() reads each parameter with DRIVE.GetValue and only calls
+#   DRIVE.SetValue where the value differs, so applying the same profile again
+#   in the same session (e.g. inside a loop) makes no writes
+#
+# Each profile has a hash of its settings, which identifies the DRIVE settings
+#   in result caches (see hccache.py) and in saved results
+#
+# Example:
+#   driveProfile = loadDriveProfile('no-protection', overrides={'PeakLoadModelID': int(peakLoadID)})
+#   profileResult = applyDriveProfile(DRIVE, driveProfile)
+#   print(profileResult.report())
+
+
+import hashlib
+import json
+import os
+import time
+
+
+DEFAULT_PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'drive_profiles.json')
+
+
+class ParameterProfile:
+    """Named set of simulation parameter values."""
+
+    def __init__(self, name, settings):
+        self.name = name
+        self.settings = dict(settings)
+
+    @property
+    def hash(self):
+        """SHA-256 hash of the settings (independent of their order)."""
+        content = json.dumps(self.settings, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def withOverrides(self, overrides):
+        """Copy of the profile with some values replaced or added; None removes a value."""
+        settings = dict(self.settings)
+        settings.update(overrides or {})
+        settings = {key: value for key, value in settings.items() if value is not None}
+        return type(self)(self.name, settings)
+
+    def __repr__(self):
+        return type(self).__name__ + '(' + repr(self.name) + ', ' + str(len(self.settings)) + ' settings, ' + self.hash[:12] + ')'
+
+
+class DriveProfile(ParameterProfile):
+    """Named set of EPRIDriveParameters values."""
+
+
+def listDriveProfiles(filePath=DEFAULT_PROFILE_FILE):
+    """Names of the profiles in a profile file."""
+    with open(filePath, encoding='utf-8') as profileFile:
+        return list(json.load(profileFile))
+
+
+def loadDriveProfile(name, filePath=DEFAULT_PROFILE_FILE, overrides=None):
+    """Load a profile, including the profiles it extends, and apply overrides."""
+    return loadProfile(name, filePath, overrides, DriveProfile)
+
+
+def loadProfile(name, filePath, overrides=None, profileClass=ParameterProfile):
+    """Load a profile of any profile file as a profileClass object."""
+    with open(filePath, encoding='utf-8') as profileFile:
+        profiles = json.load(profileFile)
+    chain = []
+    currName = name
+    while currName is not None:
+        if currName not in profiles:
+            raise KeyError('Profile ' + repr(currName) + ' is not in ' + filePath)
+        if currName in chain:
+            raise ValueError('Profile ' + repr(name) + ' extends itself')
+        chain.append(currName)
+        currName = profiles[currName].get('extends')
+    settings = {}
+    for currName in reversed(chain):
+        settings.update(profiles[currName].get('settings', {}))
+    return profileClass(name, settings).withOverrides(overrides)
+
+
+def _sameValue(currentValue, targetValue):
+    """Compare a GetValue string with a target value of any type."""
+    currentText = str(currentValue).strip()
+    if isinstance(targetValue, bool):
+        return currentText.lower() in (('true', '1') if targetValue else ('false', '0'))
+    if isinstance(targetValue, (int, float)):
+        try:
+            return float(currentText.replace(',', '.')) == float(targetValue)
+        except ValueError:
+            return False
+    return currentText == str(targetValue)
+
+
+class ProfileApplyResult:
+    """Outcome of applyDriveProfile."""
+
+    def __init__(self, profile, written, unchanged, elapsed):
+        self.profile = profile
+        self.written = written
+        self.unchanged = unchanged
+        self.elapsed = elapsed
+
+    def report(self):
+        return ('Applied ' + type(self.profile).__name__ + ' ' + repr(self.profile.name) + ' (' + self.profile.hash[:12]
+                + ') in ' + format(self.elapsed, '.3f') + ' s: ' + str(len(self.written))
+                + ' SetValue calls, ' + str(len(self.unchanged)) + ' already set')
+
+
+def applyDriveProfile(DRIVE, profile, onlyChanges=True):
+    """
+    Set the parameters of profile on DRIVE (or any simulation), skipping
+    values already set.
+
+    With onlyChanges=False every value is written without reading it first.
+    """
+    startTime = time.perf_counter()
+    written = []
+    unchanged = []
+    for key, value in profile.settings.items():
+        if onlyChanges:
+            try:
+                currentValue = DRIVE.GetValue(key)
+            except Exception:
+                currentValue = None
+            if currentValue is not None and _sameValue(currentValue, value):
+                unchanged.append(key)
+                continue
+        DRIVE.SetValue(value, key)
+        written.append(key)
+    return ProfileApplyResult(profile, written, unchanged, time.perf_counter() - startTime)
+
+
+def applyDriveSettings(DRIVE, driveSettings):
+    """Apply a profile, or set each value of a plain settings dict."""
+    if isinstance(driveSettings, ParameterProfile):
+        return applyDriveProfile(DRIVE, driveSettings)
+    for key, value in (driveSettings or {}).items():
+        DRIVE.SetValue(value, key)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Background Report Export             ###
+
+
+# After each NCO and DRIVE run, MultipleNCO_ExampleScript.py waited for the
+#   reports to be read back (pd.read_excel / loadHCReport), the switch state
+#   CSVs to be written and the HC to be summarized before CYME could start the
+#   next objective.  Only cympy.rm.Save has to run before the next simulation,
+#   since it reads the results held by the study; everything after it works on
+#   the saved files.  ReportExporter runs that part in a background thread:
+#       - submit() queues a task (parsing a report, writing a CSV, recording a
+#           journal entry) and returns a concurrent.futures.Future at once
+#       - tasks run one at a time in the order submitted, so a journal entry is
+#           only recorded after the files of its scenario are written
+#       - with useProcesses=True, call() runs the parsing functions (e.g.
+#           loadHCReport of a large .xlsx report) in a separate process, so
+#           they do not compete with the main thread for the Python interpreter
+#       - no more than maxPending tasks are queued; submit() waits when the
+#           simulations get too far ahead of the parsing
+#   Pipeline.submit() (see pipeline.py) uses the exporter of its StudySession
+#   to run DRIVE and save the report in the foreground and parse it in the
+#   background
+#
+# Example:
+#   reportExporter = ReportExporter()
+#   session = StudySession(studyFilePath, saveResultsFolder, cympy, exporter=reportExporter)
+#   futures = [objectivePipeline.submit(session, runJournal, key) for ...]
+#   pipelineResults = [future.result() for future in futures]
+#   reportExporter.close()
+#
+# Notes:
+#   Tasks must not call cympy: CYME is only used from the main thread
+#   An exception in a task is raised by future.result() and by the next
+#       wait() or close(), even for tasks whose Future is not kept (e.g. the
+#       CSVs StudySession writes); the tasks after it still run
+#   On Windows the parsing process re-imports the script, so useProcesses=True
+#       needs the script to run under if __name__ == '__main__' (as
+#       ParallelNCO_ExampleScript does); the default thread has no such need
+
+
+import concurrent.futures
+import threading
+import time
+
+
+def completedFuture(result):
+    """A Future that already holds result."""
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+class ReportExporter:
+    """Background thread (and optional process) for report parsing and result files."""
+
+    def __init__(self, useProcesses=False, maxPending=4):
+        self.useProcesses = useProcesses
+        self.maxPending = maxPending
+        self._thread = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                             thread_name_prefix='ReportExporter')
+        self._processes = None
+        if useProcesses:
+            self._processes = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+        self._slots = threading.BoundedSemaphore(maxPending)
+        self._futures = []
+        self.tasks = 0
+        self.backgroundTime = 0.0
+        self.waitTime = 0.0
+
+    def _run(self, function, args, kwargs):
+        startTime = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.backgroundTime += time.perf_counter() - startTime
+            self._slots.release()
+
+    def submit(self, function, *args, **kwargs):
+        """Queue function(*args, **kwargs) and return its Future."""
+        startTime = time.perf_counter()
+        self._slots.acquire()
+        self.waitTime += time.perf_counter() - startTime
+        future = self._thread.submit(self._run, function, args, kwargs)
+        self.tasks += 1
+        # Finished tasks are dropped, except the failed ones: wait() raises their exception
+        self._futures = [pending for pending in self._futures
+                         if not pending.done() or pending.exception() is not None]
+        self._futures.append(future)
+        return future
+
+    def call(self, function, *args, **kwargs):
+        """
+        Call function from a task, in the parsing process with useProcesses.
+
+        function and its arguments must then be picklable (module level
+        functions such as loadHCReport, with file paths and feeder IDs).
+        """
+        if self._processes is None:
+            return function(*args, **kwargs)
+        return self._processes.submit(function, *args, **kwargs).result()
+
+    def wait(self):
+        """Wait until every queued task has run; raises the first task exception."""
+        futures = self._futures
+        self._futures = []
+        concurrent.futures.wait(futures)
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Wait for the queued tasks and stop the thread (and process)."""
+        try:
+            self.wait()
+        finally:
+            self._thread.shutdown(wait=True)
+            if self._processes is not None:
+                self._processes.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def report(self):
+        return ('Report exporter: ' + str(self.tasks) + ' background tasks, '
+                + format(self.backgroundTime, '.3f') + ' s in the background, '
+                + format(self.waitTime, '.3f') + ' s waiting for the queue')
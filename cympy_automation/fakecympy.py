@@ -0,0 +1,608 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Synthetic CymPy Stand-In             ###
+
+
+# This module provides a small, pure Python imitation of the parts of cympy
+#   that the scripts use.  It is NOT a power flow engine; it only holds a
+#   synthetic network (feeders, sections, switching devices) and mimics the
+#   object model closely enough to run and time the helpers in this package
+#   without a CYME installation or license
+#
+# Every call into the stand-in is counted in FakeCympy.callCounts, which makes
+#   it easy to check how many round-trips a helper would make against CYME
+#
+# Example:
+#   from cympy_automation import fakecympy
+#   cympyLib = fakecympy.makeSyntheticStudy(nFeeders=4, nSections=400)
+#   snapshot = takeSnapshot(cympyLib)
+
+
+import collections
+import csv
+import random
+import time
+import types
+import zlib
+
+
+# Integer designators for the device types.  The values are arbitrary (Switch
+#   matches the value noted in SingleNCO_ExampleScript.py), the helpers only
+#   ever reference them by name through cympy.enums.DeviceType
+DeviceType = types.SimpleNamespace(
+    Switch=6,
+    Breaker=8,
+    Recloser=9,
+    Fuse=10,
+    SpotLoad=14,
+    Photovoltaic=45,
+)
+
+NetworkType = types.SimpleNamespace(
+    Feeder=1,
+    Substation=2,
+    TransmissionLine=3,
+)
+
+ReportModeType = types.SimpleNamespace(
+    MSExcel=1,
+    CYMESpreadsheet=2,
+    XML=3,
+    CSV=4,
+)
+
+
+class CymError(Exception):
+    """Stand-in for cympy.err.CymError."""
+
+    def GetMessage(self):
+        return str(self)
+
+
+class FakeSection:
+    """A line section with a phase and its from/to nodes."""
+
+    def __init__(self, cympyLib, sectionID, fromNodeID, toNodeID, phase, networkID):
+        self._cympyLib = cympyLib
+        self.SectionID = sectionID
+        self.FromNodeID = fromNodeID
+        self.ToNodeID = toNodeID
+        self.NetworkID = networkID
+        self._values = {'Phase': phase, 'FromNodeID': fromNodeID,
+                        'ToNodeID': toNodeID, 'NetworkID': networkID}
+
+    def GetValue(self, key):
+        self._cympyLib.callCounts['Section.GetValue'] += 1
+        return self._values[key]
+
+    def __repr__(self):
+        return 'Section ' + str(self.SectionID)
+
+
+class FakeDevice:
+    """A device attached to a section, with GetValue/SetValue like cympy."""
+
+    def __init__(self, cympyLib, deviceNumber, deviceType, sectionID, values=None):
+        self._cympyLib = cympyLib
+        self.DeviceNumber = deviceNumber
+        self.DeviceType = deviceType
+        self.SectionID = sectionID
+        self._values = dict(values or {})
+
+    def GetValue(self, key):
+        self._cympyLib.callCounts['Device.GetValue'] += 1
+        if key == 'DeviceNumber':
+            return self.DeviceNumber
+        return self._values[key]
+
+    def SetValue(self, value, key):
+        self._cympyLib.callCounts['Device.SetValue'] += 1
+        self._values[key] = value
+
+    def GetObjType(self):
+        return self._cympyLib.deviceTypeName(self.DeviceType)
+
+    def __repr__(self):
+        return (self.GetObjType() + ' ' + str(self.DeviceNumber)
+                + ' on section ' + str(self.SectionID))
+
+
+class FakeStudy:
+    """Imitates the cympy.study module for one synthetic network."""
+
+    def __init__(self, cympyLib):
+        self._cympyLib = cympyLib
+        self.sections = {}
+        self.devices = []
+        self.networks = {}
+        self.loadModels = []
+        self.openedPath = None
+        self.parentSection = {}
+        self._baseline = []
+        self._deviceLookup = {}
+
+    def saveBaseline(self):
+        """Remember the current device values as the state of the study file."""
+        self._baseline = [dict(device._values) for device in self.devices]
+
+    def Open(self, path):
+        # Opening the study discards all unsaved changes
+        self._cympyLib.callCounts['study.Open'] += 1
+        self.openedPath = path
+        for device, values in zip(self.devices, self._baseline):
+            device._values = dict(values)
+        self._cympyLib.driveResults.clear()
+
+    def Save(self, path, *args):
+        self._cympyLib.callCounts['study.Save'] += 1
+
+    def ActivateModifications(self, flag):
+        pass
+
+    def ListNetworks(self, networkType=None):
+        self._cympyLib.callCounts['study.ListNetworks'] += 1
+        if networkType is None:
+            return list(self.networks)
+        return [networkID for networkID, currType in self.networks.items()
+                if currType == networkType]
+
+    def ListDevices(self, deviceType=None):
+        self._cympyLib.callCounts['study.ListDevices'] += 1
+        if deviceType is None:
+            return list(self.devices)
+        return [device for device in self.devices if device.DeviceType == deviceType]
+
+    def ListSections(self):
+        self._cympyLib.callCounts['study.ListSections'] += 1
+        return list(self.sections.values())
+
+    def ListLoadModels(self):
+        return list(self.loadModels)
+
+    def GetSection(self, sectionID):
+        self._cympyLib.callCounts['study.GetSection'] += 1
+        return self.sections[sectionID]
+
+    def GetDevice(self, deviceNumber, deviceType):
+        self._cympyLib.callCounts['study.GetDevice'] += 1
+        if len(self._deviceLookup) != len(self.devices):
+            self._deviceLookup = {(device.DeviceNumber, device.DeviceType): device
+                                  for device in self.devices}
+        device = self._deviceLookup.get((deviceNumber, deviceType))
+        if device is None:
+            raise CymError('Device ' + str(deviceNumber) + ' not found')
+        return device
+
+    def QueryInfoDevice(self, info, deviceNumber, deviceType):
+        self._cympyLib.callCounts['study.QueryInfoDevice'] += 1
+        device = self.GetDevice(deviceNumber, deviceType)
+        if info == 'EqState':
+            if device._values.get('ClosedPhase', 'None') == 'None':
+                return 'Open'
+            return 'Closed'
+        if info == 'LoadingMax':
+            if device._values.get('ClosedPhase', 'None') == 'None':
+                return '0'
+            return str(self._cympyLib.loadFlowResults['sections'].get(device.SectionID, 0))
+        return device._values.get(info, '')
+
+    def QueryInfoNode(self, info, nodeID):
+        self._cympyLib.callCounts['study.QueryInfoNode'] += 1
+        if info not in ('VpuMin', 'VpuMax'):
+            raise CymError('Unknown keyword ' + str(info))
+        return str(self._cympyLib.loadFlowResults['nodes'].get(nodeID, 0.0))
+
+
+HC_REPORT_NAME = 'Hosting Capacity Summary Report (Powered by EPRI DRIVE™)'
+NCO_REPORT_NAME = 'Network Configuration Optimization - Summary'
+
+
+def makeHCReportRows(feederHC):
+    """
+    Rows of a synthetic Hosting Capacity Summary Report.
+
+    feederHC maps feeder ID -> (distributed, centralized).  Each feeder gets a
+    'Network ID' row, a 'Hosting Capacity' row with the values in columns 3
+    and 5 (like the CYME report) and a few rows of other results.
+    """
+    rows = [[HC_REPORT_NAME, '', '', '', '', '']]
+    for feederID, (distributed, centralized) in feederHC.items():
+        rows.append(['Network ID', feederID, '', '', '', ''])
+        rows.append(['', 'Criteria', '', 'Distributed (kW)', '', 'Centralized (kW)'])
+        rows.append(['', 'Hosting Capacity', 'kW', distributed, 'kW', centralized])
+        rows.append(['', 'Minimum Hosting Capacity', 'kW', round(0.6 * distributed, 2), 'kW',
+                     round(0.6 * centralized, 2)])
+        rows.append(['', 'Limiting Criteria', '', 'Voltage', '', 'Thermal'])
+        rows.append(['', '', '', '', '', ''])
+    return rows
+
+
+def writeReportRows(rows, filePath, reportMode):
+    """Write report rows the way cympy.rm.Save would for the given mode."""
+    if reportMode == ReportModeType.CSV:
+        with open(filePath, 'w', newline='', encoding='utf-8') as csvFile:
+            csv.writer(csvFile).writerows(rows)
+    elif reportMode == ReportModeType.MSExcel:
+        import pandas as pd
+        pd.DataFrame(rows).to_excel(filePath, header=False, index=False)
+    else:
+        raise CymError('Report mode ' + str(reportMode) + ' is not supported by the stand-in')
+
+
+class FakeReportManager:
+    """Imitates cympy.rm; Save writes synthetic reports."""
+
+    def __init__(self, cympyLib):
+        self._cympyLib = cympyLib
+
+    def ListReports(self):
+        return [HC_REPORT_NAME, NCO_REPORT_NAME]
+
+    def Save(self, reportName, networks, reportMode, filePath):
+        self._cympyLib.callCounts['rm.Save'] += 1
+        if reportName == HC_REPORT_NAME:
+            feederHC = {feederID: self._cympyLib.hostingCapacity(feederID) for feederID in networks}
+            rows = makeHCReportRows(feederHC)
+        elif reportName == NCO_REPORT_NAME:
+            rows = [[NCO_REPORT_NAME, ''], ['Networks', len(networks)]]
+        else:
+            raise CymError('Report ' + str(reportName) + ' is not available in the stand-in')
+        writeReportRows(rows, filePath, reportMode)
+
+
+class FakeSimulation:
+    """
+    Base of the simulation stand-ins.  Parameters are kept per FakeCympy so,
+    like in CYME, a new simulation object sees the values set earlier.
+    GetValue returns strings like cympy does.
+    """
+
+    objType = ''
+    defaults = {}
+
+    def __init__(self, cympyLib):
+        self._cympyLib = cympyLib
+        self._parameters = cympyLib.simParameters.setdefault(self.objType, dict(self.defaults))
+
+    def GetObjType(self):
+        return self.objType
+
+    def GetValue(self, key):
+        self._cympyLib.callCounts[self.objType + '.GetValue'] += 1
+        if key not in self._parameters:
+            raise CymError('Unknown parameter ' + str(key))
+        return str(self._parameters[key])
+
+    def SetValue(self, value, key):
+        self._cympyLib.callCounts[self.objType + '.SetValue'] += 1
+        self._parameters[key] = value
+
+
+class FakeEPRIDrive(FakeSimulation):
+    """EPRI DRIVE stand-in; Run computes a synthetic HC for each feeder."""
+
+    objType = 'EPRIDriveParameters'
+    defaults = {'IncludeExistingDER': True, 'DERType': 'Photovoltaic', 'UseLoadModels': False,
+                'OverVoltageLimit': 105.0, 'MaxVoltageDeviation': 3.0,
+                'VerifyFlicker': False, 'MaxLargeDERPenetrationLowVoltage': 10000}
+
+    def Run(self, feeders):
+        self._cympyLib.callCounts['EPRIDrive.Run'] += 1
+        time.sleep(self._cympyLib.simulationDelay * len(feeders))
+        for feederID in feeders:
+            self._cympyLib.driveResults[feederID] = self._cympyLib.configuredHostingCapacity(feederID)
+
+
+class FakeNetworkConfigurationOptimization(FakeSimulation):
+    """
+    NCO stand-in.  Run closes one tie switch and opens a switch on the path
+    from the tie to the source of the feeder it ties to, chosen from the
+    Objective and Method so that repeated runs are deterministic.  The
+    'MinimizeOverloadExceptions' objective finds no better configuration.
+    """
+
+    objType = 'SOMParameters'
+    defaults = {'Objective': 'MinimizeLosses', 'Method': 'HeuristicLocal', 'ObjectiveLosses': True,
+                'AcceleratedSearch': False, 'InstallNewSwitch': False, 'LoadFlowParamConfigID': 0,
+                'ExcludedDeviceType': '', 'OperateRemotelyControlled': False, 'ExcludedDevices': '',
+                'AllowInitialViolation': True, 'IgnoreTieInSameTopo': False,
+                'ObjectiveOperations': False, 'ObjectiveLoadBalancing': False,
+                'ObjectiveDistance': False, 'ObjectiveVoltageExceptions': False,
+                'ObjectiveOverload': False, 'ObjectiveWeightOperations': 1.0,
+                'ObjectiveWeightLoadBalancing': 1.0, 'ObjectiveWeightDistance': 1.0,
+                'ObjectiveWeightLosses': 1.0, 'ObjectiveWeightVoltageExceptions': 1.0,
+                'ObjectiveWeightOverload': 1.0, 'EnableMinimumLoss': False, 'MinimumLoss': 0.0,
+                'EnableMinimumLoadingUnbalance': False, 'MinimumLoadingUnbalance': 0.0,
+                'EnableMinimumLengthUnbalance': False, 'MinimumLengthUnbalance': 0.0,
+                'EnableMinDistanceBetweenNewSwitch': False, 'MinDistanceBetweenNewSwitch': 0.0,
+                'EnableMaximumNumberSwitchingOperations': False,
+                'MaximumNumberSwitchingOperations': 10}
+
+    def Run(self, networks):
+        cympyLib = self._cympyLib
+        study = cympyLib.study
+        cympyLib.callCounts['NCO.Run'] += 1
+        time.sleep(cympyLib.simulationDelay * len(networks))
+        objective = str(self._parameters['Objective'])
+        if objective == 'MinimizeOverloadExceptions':
+            raise CymError('No better configuration was found for ' + objective)
+        excluded = set(str(self._parameters['ExcludedDevices']).replace(';', ',').split(','))
+        devicesBySection = {device.SectionID: device for device in study.devices
+                            if device.DeviceType == DeviceType.Switch}
+        ties = [device for device in study.devices
+                if device.DeviceType == DeviceType.Switch and device._values['ClosedPhase'] == 'None'
+                and device.DeviceNumber not in excluded]
+        rng = random.Random(zlib.crc32((objective + str(self._parameters['Method'])).encode()))
+        rng.shuffle(ties)
+        for tie in ties:
+            node = study.sections[tie.SectionID].ToNodeID
+            candidates = []
+            while node in study.parentSection:
+                sectionID = study.parentSection[node]
+                device = devicesBySection.get(sectionID)
+                if (device is not None and device.DeviceType == DeviceType.Switch
+                        and device._values['ClosedPhase'] != 'None'
+                        and device.DeviceNumber not in excluded):
+                    candidates.append(device)
+                node = study.sections[sectionID].FromNodeID
+            if candidates:
+                tie._values['ClosedPhase'] = study.sections[tie.SectionID]._values['Phase']
+                rng.choice(candidates)._values['ClosedPhase'] = 'None'
+                return
+        raise CymError('No better configuration was found for ' + objective)
+
+
+class FakeLoadFlow(FakeSimulation):
+    """
+    Load flow stand-in.  Run walks the closed sections from the feeder
+    sources: the voltage of a node drops with its distance (in sections) from
+    the source and the loading of a device grows with the number of nodes it
+    supplies (0.5 % per node, so a feeder head is about half loaded until it
+    picks up a neighbouring feeder).  De-energized nodes get 0 pu.
+    """
+
+    objType = 'LoadFlowParameters'
+
+    def Run(self):
+        cympyLib = self._cympyLib
+        study = cympyLib.study
+        cympyLib.callCounts['LoadFlow.Run'] += 1
+        depth, _, parentSection, order = cympyLib.energizedTree()
+        nodesBelow = collections.Counter()
+        sectionLoading = {}
+        for node in reversed(order):
+            if node in parentSection:
+                sectionID = parentSection[node]
+                sectionLoading[sectionID] = round(0.5 * (1 + nodesBelow[node]), 1)
+                section = study.sections[sectionID]
+                parentNode = section.FromNodeID if section.ToNodeID == node else section.ToNodeID
+                nodesBelow[parentNode] += 1 + nodesBelow[node]
+        cympyLib.loadFlowResults = {
+            'nodes': {node: round(1.03 - 0.0018 * nodeDepth, 4) for node, nodeDepth in depth.items()},
+            'sections': sectionLoading}
+
+
+class FakeCympy:
+    """Module-like object exposing study, sim, enums, err, app, rm and Describe."""
+
+    def __init__(self):
+        self.callCounts = collections.Counter()
+        self.enums = types.SimpleNamespace(DeviceType=DeviceType,
+                                           NetworkType=NetworkType,
+                                           ReportModeType=ReportModeType)
+        self.err = types.SimpleNamespace(CymError=CymError)
+        self.app = types.SimpleNamespace(ActivateRefresh=lambda flag: None)
+        self.study = FakeStudy(self)
+        self.rm = FakeReportManager(self)
+        self.simParameters = {}
+        self.driveResults = {}
+        self.loadFlowResults = {'nodes': {}, 'sections': {}}
+        self._energizedTree = (None, None)
+        self.simulationDelay = 0.0
+        self.sim = types.SimpleNamespace(
+            EPRIDrive=lambda: FakeEPRIDrive(self),
+            NetworkConfigurationOptimization=lambda: FakeNetworkConfigurationOptimization(self),
+            LoadFlow=lambda: FakeLoadFlow(self))
+
+    def Describe(self, objType):
+        # Prints the parameters of the simulation stand-ins, one per line
+        for simulationClass in (FakeEPRIDrive, FakeNetworkConfigurationOptimization, FakeLoadFlow):
+            if simulationClass.objType == objType:
+                print(objType)
+                for key, value in simulationClass.defaults.items():
+                    print('    ' + key + ' (' + type(value).__name__ + ')')
+
+    def deviceTypeName(self, deviceType):
+        for name, value in vars(DeviceType).items():
+            if value == deviceType:
+                return name
+        return str(deviceType)
+
+    def energizedTree(self):
+        """
+        Walk the closed sections from the feeder sources.  Returns the depth
+        (in sections) and the feeder of every energized node, the section each
+        node is fed through and the nodes in the order they were reached.
+        """
+        study = self.study
+        openSections = frozenset(device.SectionID for device in study.devices
+                                 if device._values.get('ClosedPhase', '') == 'None')
+        if self._energizedTree[0] == openSections:
+            return self._energizedTree[1]
+        neighbours = collections.defaultdict(list)
+        for section in study.sections.values():
+            if section.SectionID not in openSections:
+                neighbours[section.FromNodeID].append((section.ToNodeID, section.SectionID))
+                neighbours[section.ToNodeID].append((section.FromNodeID, section.SectionID))
+        depth = {node: 0 for node in neighbours if node.endswith('_SRC')}
+        feederOf = {node: node[:-len('_SRC')] for node in depth}
+        order = list(depth)
+        parentSection = {}
+        for node in order:
+            for neighbour, sectionID in neighbours[node]:
+                if neighbour not in depth:
+                    depth[neighbour] = depth[node] + 1
+                    feederOf[neighbour] = feederOf[node]
+                    parentSection[neighbour] = sectionID
+                    order.append(neighbour)
+        self._energizedTree = (openSections, (depth, feederOf, parentSection, order))
+        return depth, feederOf, parentSection, order
+
+    def configuredHostingCapacity(self, feederID):
+        """
+        Synthetic (distributed, centralized) HC of a feeder in kW.  It depends
+        on the feeder ID, falls as the feeder gets deeper (more sections from
+        the source to its furthest node) and varies with which devices of the
+        feeder are open, so a different switching configuration gives a
+        different result.
+        """
+        base = 1000 + zlib.crc32(str(feederID).encode()) % 4000
+        openIDs = sorted(str(device.DeviceNumber) for device in self.study.devices
+                         if device._values.get('ClosedPhase') == 'None'
+                         and self.study.sections[device.SectionID].NetworkID == feederID)
+        depth, feederOf, _, _ = self.energizedTree()
+        maxDepth = max([nodeDepth for node, nodeDepth in depth.items() if feederOf[node] == feederID],
+                       default=0)
+        factor = (1.3 - 0.012 * min(maxDepth, 60)
+                  + (zlib.crc32(','.join(openIDs).encode()) % 101) / 1000.0)
+        distributed = round(base * factor, 1)
+        return distributed, round(distributed * 1.8, 1)
+
+    def hostingCapacity(self, feederID):
+        """HC of the last DRIVE run of the feeder, or of the current configuration."""
+        if feederID in self.driveResults:
+            return self.driveResults[feederID]
+        return self.configuredHostingCapacity(feederID)
+
+    def resetCallCounts(self):
+        self.callCounts.clear()
+
+
+def makeSyntheticStudy(nFeeders=4, nSections=400, nSwitches=100, nReclosers=20,
+                       nFuses=40, nTies=None, seed=0, simulationDelay=0.0, nLoads=0,
+                       nBreakers=0, nDER=0):
+    """
+    Build a FakeCympy holding a radial multi-feeder network.
+
+    Each feeder is a random tree of sections hanging off a source node, with a
+    breaker on its head section.  Switches, reclosers, fuses and nBreakers
+    additional breakers are placed on distinct sections and are closed.  nTies additional open switches (part
+    of nSwitches) connect nodes of neighbouring feeders.
+
+    simulationDelay is the time in seconds that DRIVE and NCO runs sleep per
+    network, to imitate long simulations when timing schedulers.
+
+    nLoads spot loads and then nDER photovoltaic devices are placed on random
+    sections after the switching devices, so the switching device lists do
+    not depend on them.  Every section has a random 'Length' (km).
+    """
+    rng = random.Random(seed)
+    cympyLib = FakeCympy()
+    cympyLib.simulationDelay = simulationDelay
+    study = cympyLib.study
+    if nTies is None:
+        nTies = nFeeders if nFeeders > 1 else 0
+    nTies = min(nTies, nSwitches)
+    sectionsPerFeeder = max(1, nSections // nFeeders)
+    nInline = (nSwitches - nTies) + nReclosers + nFuses + nBreakers
+    if nInline > nFeeders * (sectionsPerFeeder - 1):
+        raise ValueError('Not enough sections to place all switching devices')
+
+    feederNodes = []
+    inlineSections = []
+    for feederCtr in range(nFeeders):
+        feederID = 'FEEDER' + str(feederCtr + 1)
+        study.networks[feederID] = NetworkType.Feeder
+        nodes = [feederID + '_SRC']
+        nodePhases = {nodes[0]: 'ABC'}
+        for sectionCtr in range(sectionsPerFeeder):
+            # Favour recently added nodes so that feeders grow long branches
+            fromNode = rng.choice(nodes[max(0, len(nodes) - 6):])
+            toNode = feederID + '_N' + str(sectionCtr + 1)
+            parentPhase = nodePhases[fromNode]
+            if parentPhase == 'ABC' and sectionCtr > 0 and rng.random() < 0.2:
+                phase = rng.choice(['A', 'B', 'C'])
+            else:
+                phase = parentPhase
+            sectionID = feederID + '_S' + str(sectionCtr + 1)
+            study.sections[sectionID] = FakeSection(cympyLib, sectionID, fromNode,
+                                                    toNode, phase, feederID)
+            nodes.append(toNode)
+            nodePhases[toNode] = phase
+            study.parentSection[toNode] = sectionID
+            if sectionCtr == 0:
+                study.devices.append(FakeDevice(cympyLib, feederID + '_BRK',
+                                                DeviceType.Breaker, sectionID,
+                                                {'ClosedPhase': phase}))
+            else:
+                inlineSections.append(sectionID)
+        feederNodes.append((feederID, nodes, nodePhases))
+
+    chosenSections = rng.sample(inlineSections, nInline)
+    inlineTypes = ([('SW', DeviceType.Switch)] * (nSwitches - nTies)
+                   + [('RC', DeviceType.Recloser)] * nReclosers
+                   + [('FU', DeviceType.Fuse)] * nFuses
+                   + [('BR', DeviceType.Breaker)] * nBreakers)
+    for deviceCtr, (sectionID, (prefix, deviceType)) in enumerate(zip(chosenSections, inlineTypes)):
+        phase = study.sections[sectionID]._values['Phase']
+        study.devices.append(FakeDevice(cympyLib, prefix + str(deviceCtr + 1), deviceType,
+                                        sectionID, {'ClosedPhase': phase}))
+
+    for tieCtr in range(nTies):
+        feederA, nodesA, phasesA = feederNodes[tieCtr % nFeeders]
+        feederB, nodesB, phasesB = feederNodes[(tieCtr + 1) % nFeeders]
+        threePhaseA = [node for node in nodesA[1:] if phasesA[node] == 'ABC'] or nodesA
+        threePhaseB = [node for node in nodesB[1:] if phasesB[node] == 'ABC'] or nodesB
+        sectionID = 'TIE' + str(tieCtr + 1)
+        study.sections[sectionID] = FakeSection(cympyLib, sectionID, rng.choice(threePhaseA),
+                                                rng.choice(threePhaseB), 'ABC', feederA)
+        study.devices.append(FakeDevice(cympyLib, 'SW-T' + str(tieCtr + 1), DeviceType.Switch,
+                                        sectionID, {'ClosedPhase': 'None'}))
+
+    feederSections = [sectionID for sectionID in study.sections if not sectionID.startswith('TIE')]
+    for loadCtr in range(nLoads):
+        study.devices.append(FakeDevice(cympyLib, 'LOAD' + str(loadCtr + 1), DeviceType.SpotLoad,
+                                        rng.choice(feederSections)))
+    for derCtr in range(nDER):
+        study.devices.append(FakeDevice(cympyLib, 'PV' + str(derCtr + 1), DeviceType.Photovoltaic,
+                                        rng.choice(feederSections)))
+
+    # The lengths are drawn separately, so the network does not depend on them
+    lengthRng = random.Random(seed + 1)
+    for section in study.sections.values():
+        section._values['Length'] = round(lengthRng.uniform(0.05, 0.5), 3)
+
+    study.loadModels = [types.SimpleNamespace(ID=1, Name='DEFAULT')]
+    study.saveBaseline()
+    return cympyLib
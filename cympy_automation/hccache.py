@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Hosting Capacity Result Cache             ###
+
+
+# A DRIVE run can take 20 minutes or more, and sweeps often evaluate the same
+#   switching configuration more than once (e.g. two NCO objectives that end
+#   in the same switch states).  HCResultCache stores the parsed per-feeder HC
+#   table of each DRIVE run on disk, under a key that is the SHA-256 hash of:
+#       - the study file fingerprint (hash of the .sxst contents)
+#       - the sorted open/closed state of every switching device
+#       - the DRIVE parameter values
+#       - the feeders DRIVE was run on
+#   so a repeated configuration is read back from the cache instead of
+#   running DRIVE again
+#
+# Results are saved as <cache folder>/<first 2 characters of key>/<key>.csv.
+#   Each file is written to a temporary name and renamed, so a cache folder
+#   can be shared by several worker processes (see scenarios.py)
+#
+# Example:
+#   hcCache = HCResultCache(saveResultsFolder + r'\HCCache')
+#   cacheKey = hcCache.makeKey(studyFingerprint(studyFilePath), switchingSnapshot.ids,
+#                              switchingSnapshot.types, switchingSnapshot.statuses,
+#                              driveSettings, feeders)
+#   hcResults = hcCache.get(cacheKey)
+#   if hcResults is None:
+#       ... DRIVE.Run(feeders), saveHCReport, loadHCReport ...
+#       hcCache.put(cacheKey, hcResults)
+
+
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from .driveprofiles import ParameterProfile
+
+
+# Fingerprints already computed in this process, keyed by (path, size, mtime)
+_fingerprints = {}
+
+
+def studyFingerprint(studyFilePath, blockSize=1 << 20):
+    """
+    SHA-256 hash of the contents of the study file.
+
+    If the file does not exist (e.g. with the fake backend) the path itself
+    is hashed instead.
+    """
+    if not os.path.isfile(studyFilePath):
+        return hashlib.sha256(str(studyFilePath).encode('utf-8')).hexdigest()
+    fileStat = os.stat(studyFilePath)
+    memoKey = (os.path.abspath(studyFilePath), fileStat.st_size, fileStat.st_mtime_ns)
+    if memoKey not in _fingerprints:
+        fileHash = hashlib.sha256()
+        with open(studyFilePath, 'rb') as studyFile:
+            for block in iter(lambda: studyFile.read(blockSize), b''):
+                fileHash.update(block)
+        _fingerprints[memoKey] = fileHash.hexdigest()
+    return _fingerprints[memoKey]
+
+
+def switchStateVector(deviceIDs, typeNames, statuses):
+    """
+    Sorted [type, ID, isOpen] entries of the switching devices.
+
+    Statuses may be 'Open'/'Close', 'Open'/'Closed' or ClosedPhase values, so
+    the same configuration gives the same vector however it was read.
+    """
+    return sorted([str(typeName), str(deviceID), str(status) in ('Open', 'None')]
+                  for deviceID, typeName, status in zip(deviceIDs, typeNames, statuses))
+
+
+def settingsKey(driveSettings):
+    """Canonical text of a DRIVE settings dict, or the hash of a profile."""
+    if isinstance(driveSettings, ParameterProfile):
+        return driveSettings.hash
+    if isinstance(driveSettings, str):
+        return driveSettings
+    return json.dumps(driveSettings or {}, sort_keys=True, default=str)
+
+
+class HCResultCache:
+    """Per-feeder HC results on disk, keyed by configuration hash."""
+
+    def __init__(self, cacheFolder):
+        self.cacheFolder = cacheFolder
+        self.hits = 0
+        self.misses = 0
+
+    def makeKey(self, fingerprint, deviceIDs, typeNames, statuses, driveSettings, feeders):
+        """Hash of the study, switch states, DRIVE settings and feeders."""
+        content = json.dumps([fingerprint, switchStateVector(deviceIDs, typeNames, statuses),
+                              settingsKey(driveSettings), sorted(str(feeder) for feeder in feeders)])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cacheFolder, key[:2], key + '.csv')
+
+    def __contains__(self, key):
+        return os.path.isfile(self._path(key))
+
+    def get(self, key):
+        """Cached HC table for key, or None."""
+        path = self._path(key)
+        if not os.path.isfile(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pd.read_csv(path, dtype={'Feeder': str})
+
+    def put(self, key, hcResults):
+        """Store the HC table (Feeder, Distributed, Centralized columns) for key."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fileHandle, tempPath = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fileHandle, 'w', newline='') as tempFile:
+                hcResults[['Feeder', 'Distributed', 'Centralized']].to_csv(tempFile, index=False)
+            os.replace(tempPath, path)
+        except BaseException:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+    def report(self):
+        return ('HC result cache: ' + str(self.hits) + ' hits, ' + str(self.misses)
+                + ' misses (' + self.cacheFolder + ')')
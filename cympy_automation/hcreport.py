@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Hosting Capacity Report Parser             ###
+
+
+# The scripts read the 'Hosting Capacity Summary Report' saved by
+#   cympy.rm.Save with pd.read_excel(path, header=None) and then looped over
+#   every row with hcData.loc[rowCtr,:] and np.where(...=='Hosting Capacity').
+#   parseHCReport() finds the 'Hosting Capacity' rows with a single vectorized
+#   comparison over the whole sheet and returns a per-feeder table instead of
+#   only the averages
+#
+# In the report, each 'Hosting Capacity' row holds the maximum distributed DER
+#   in column 3 and the maximum centralized DER in column 5.  If the list of
+#   feeders passed to cympy.rm.Save is given, each row is labelled with the
+#   closest feeder ID found on or above it in the sheet, or, if no feeder IDs
+#   appear in the sheet, with the feeders in the order they were reported
+#
+# Saving the report as .xlsx and reading it back with pd.read_excel is slow and
+#   memory hungry for large studies.  saveHCReport() saves the report in the
+#   first available report mode from a preference list (CSV by default, then
+#   MSExcel), and loadHCReport() reads the saved file row by row, keeping only
+#   the 'Hosting Capacity' rows:
+#       - .csv/.txt files are streamed with the csv module
+#       - .xlsx files are streamed with openpyxl in read-only mode, reading
+#           only as many columns as the first (title) row of the sheet spans
+#       - if openpyxl is not installed, pd.read_excel + parseHCReport is used
+#
+# benchmarks/bench_hcreport.py compares these paths on synthetic reports
+#
+# Notes:
+#   HC values saved as text are read with the number format of the locale
+#       (openStudy sets LC_NUMERIC from it), e.g. '1 234,5' in a French locale.
+#       A value that cannot be read raises a ValueError instead of becoming NaN
+
+
+import csv
+import itertools
+import locale
+import os
+
+import numpy as np
+import pandas as pd
+
+from .backend import getCympy
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+HC_ROW_LABEL = 'Hosting Capacity'
+DISTRIBUTED_COLUMN = 3
+CENTRALIZED_COLUMN = 5
+
+HC_REPORT_NAME = 'Hosting Capacity Summary Report (Powered by EPRI DRIVE™)'
+
+# Report modes tried by saveHCReport, in order, and the file extension of each
+REPORT_MODE_PREFERENCE = ('CSV', 'MSExcel')
+REPORT_MODE_EXTENSIONS = {'CSV': '.csv', 'MSExcel': '.xlsx'}
+
+
+def readHCReport(filePath):
+    """Read a saved HC report into a DataFrame without a header row."""
+    return pd.read_excel(filePath, header=None)
+
+
+def _feederLabels(hcData, hcRows, feeders):
+    """Feeder ID for each of the hcRows, or None where it cannot be determined."""
+    feederIDs = [str(feeder) for feeder in feeders]
+    isFeederCell = hcData.isin(feederIDs).to_numpy()
+    labelRows = isFeederCell.any(axis=1)
+    if labelRows.any():
+        firstColumn = isFeederCell.argmax(axis=1)
+        rowLabels = pd.Series(np.where(labelRows,
+                                       hcData.to_numpy()[np.arange(len(hcData)), firstColumn],
+                                       None))
+        return list(rowLabels.ffill().to_numpy()[hcRows])
+    if len(feederIDs) == len(hcRows):
+        return feederIDs
+    return [None] * len(hcRows)
+
+
+def parseHCReport(hcData, feeders=None, distributedColumn=DISTRIBUTED_COLUMN,
+                  centralizedColumn=CENTRALIZED_COLUMN):
+    """
+    Extract the hosting capacity of every feeder from a report DataFrame.
+
+    Returns a DataFrame with columns 'Feeder', 'Distributed' and
+    'Centralized' (float) and one row per 'Hosting Capacity' row.
+    """
+    hcRows = np.flatnonzero((hcData.to_numpy() == HC_ROW_LABEL).any(axis=1))
+    values = hcData.iloc[hcRows]
+    results = pd.DataFrame({
+        'Feeder': _feederLabels(hcData, hcRows, feeders) if feeders is not None else [None] * len(hcRows),
+        'Distributed': np.array([_toFloat(value) for value in values[distributedColumn]], dtype=float),
+        'Centralized': np.array([_toFloat(value) for value in values[centralizedColumn]], dtype=float),
+    })
+    return results
+
+
+def summarizeHC(hcResults, decimals=2):
+    """Average distributed and centralized HC over all feeders, as the scripts print them."""
+    maxDistAvg = np.round(np.mean(hcResults['Distributed']), decimals=decimals)
+    maxCentAvg = np.round(np.mean(hcResults['Centralized']), decimals=decimals)
+    return maxDistAvg, maxCentAvg
+
+
+def saveHCReport(feeders, filePathNoExtension, cympyLib=None, reportName=HC_REPORT_NAME,
+                 preferredModes=REPORT_MODE_PREFERENCE):
+    """
+    Save the HC report in the first report mode this CYME version supports.
+
+    Returns the path of the saved file, with the extension of the mode used.
+    """
+    cympyLib = getCympy(cympyLib)
+    for modeName in preferredModes:
+        if modeName not in REPORT_MODE_EXTENSIONS:
+            raise ValueError('Saved reports cannot be parsed for report mode ' + str(modeName))
+        reportMode = getattr(cympyLib.enums.ReportModeType, modeName, None)
+        if reportMode is not None:
+            filePath = filePathNoExtension + REPORT_MODE_EXTENSIONS[modeName]
+            cympyLib.rm.Save(reportName, feeders, reportMode, filePath)
+            return filePath
+    raise ValueError('None of the report modes ' + str(preferredModes) + ' are available')
+
+
+def _toFloat(value):
+    """
+    HC value of a report cell; empty cells are NaN.
+
+    Text is read with the decimal point and thousands separator of the
+    locale, so '1 234,5' is 1234.5 under a French LC_NUMERIC.
+    """
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    text = str(value).strip()
+    if text == '':
+        return np.nan
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        # Spaces (including non-breaking ones) are only used to group digits
+        return locale.atof(''.join(text.split()).replace('\u202f', ''))
+    except ValueError:
+        raise ValueError('Could not read the HC value ' + repr(value) + ' of the report with the '
+                         + str(locale.getlocale(locale.LC_NUMERIC)) + ' number format') from None
+
+
+def parseHCRows(rows, feeders=None, distributedColumn=DISTRIBUTED_COLUMN,
+                centralizedColumn=CENTRALIZED_COLUMN):
+    """
+    Streaming equivalent of parseHCReport for an iterable of report rows.
+
+    Only the 'Hosting Capacity' rows (and the current feeder ID) are kept in
+    memory, so rows can come straight from a file reader.
+    """
+    feederIDs = set(str(feeder) for feeder in feeders) if feeders is not None else set()
+    currentFeeder = None
+    labels = []
+    distributed = []
+    centralized = []
+    for row in rows:
+        if feederIDs:
+            for cell in row:
+                if cell is not None and str(cell) in feederIDs:
+                    currentFeeder = str(cell)
+                    break
+        if HC_ROW_LABEL in row:
+            labels.append(currentFeeder)
+            distributed.append(_toFloat(row[distributedColumn]) if len(row) > distributedColumn else np.nan)
+            centralized.append(_toFloat(row[centralizedColumn]) if len(row) > centralizedColumn else np.nan)
+    if feeders is not None and all(label is None for label in labels) and len(labels) == len(feeders):
+        labels = [str(feeder) for feeder in feeders]
+    return pd.DataFrame({'Feeder': labels,
+                         'Distributed': np.array(distributed, dtype=float),
+                         'Centralized': np.array(centralized, dtype=float)})
+
+
+def streamHCReportCSV(filePath, feeders=None, **parseOptions):
+    """Parse a CSV (or tab separated text) HC report one line at a time."""
+    with open(filePath, newline='', encoding='utf-8-sig') as csvFile:
+        sample = csvFile.read(4096)
+        csvFile.seek(0)
+        delimiter = '\t' if sample.count('\t') > sample.count(',') else ','
+        return parseHCRows(csv.reader(csvFile, delimiter=delimiter), feeders, **parseOptions)
+
+
+def streamHCReportExcel(filePath, feeders=None, distributedColumn=DISTRIBUTED_COLUMN,
+                        centralizedColumn=CENTRALIZED_COLUMN):
+    """
+    Parse an .xlsx HC report row by row with openpyxl in read-only mode.
+
+    The number of columns read is taken from the first (title) row, which
+    spans the columns of the sheet, so the Network ID label is found wherever
+    CYME puts it.  If the file does not give the size of the sheet, every
+    cell of each row is read.
+    """
+    workbook = openpyxl.load_workbook(filePath, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        headerRow = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        nColumns = None
+        if sheet.max_column is not None:
+            nColumns = max(len(headerRow), distributedColumn + 1, centralizedColumn + 1)
+        rows = itertools.chain([headerRow], sheet.iter_rows(min_row=2, max_col=nColumns,
+                                                            values_only=True))
+        return parseHCRows(rows, feeders, distributedColumn, centralizedColumn)
+    finally:
+        workbook.close()
+
+
+def loadHCReport(filePath, feeders=None, **parseOptions):
+    """Parse a saved HC report with the fastest reader for its file type."""
+    extension = os.path.splitext(filePath)[1].lower()
+    if extension in ('.csv', '.txt'):
+        return streamHCReportCSV(filePath, feeders, **parseOptions)
+    if openpyxl is not None and extension in ('.xlsx', '.xlsm'):
+        return streamHCReportExcel(filePath, feeders, **parseOptions)
+    return parseHCReport(readHCReport(filePath), feeders, **parseOptions)
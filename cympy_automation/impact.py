@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Incremental EPRI DRIVE Re-analysis             ###
+
+
+# After NCO (or a switching device CSV) changes the switching configuration,
+#   the scripts run EPRI DRIVE again on every feeder.  Only the feeders that
+#   contain a device that toggled, or that such a device ties to, can have a
+#   different hosting capacity.  FeederImpactMap finds those feeders and
+#   rerunChangedFeeders() runs DRIVE on them only, reusing the previous HC of
+#   all other feeders
+#
+# FeederImpactMap reads the from/to node and network of every section once
+#   after the study is opened (like SectionPhaseCache, pass it to openStudy
+#   in caches so it is rebuilt for a new study).  A device affects the network
+#   of its own section and every network with a section on either of its
+#   nodes, which for a tie switch includes the feeder on the other side
+#
+# Example:
+#   impactMap = FeederImpactMap(cympy)
+#   impactMap.build(switchingSnapshot)
+#   changed = changedDevices(allSwitchingStates, switchStatusAfter)
+#   hcResults2 = rerunChangedFeeders(DRIVE, feeders, impactMap.feedersOf(changed),
+#                                    hcResults, saveResultsFolder + filenameHC2, cympy)
+
+
+import collections
+import time
+
+import numpy as np
+import pandas as pd
+
+from .backend import getCympy
+from .hcreport import loadHCReport, saveHCReport
+
+
+def changedDevices(statusesBefore, statusesAfter):
+    """
+    Positions of the devices whose open/closed state differs.
+
+    Statuses can be 'Open'/'Close' (snapshot statuses), 'Open'/'Closed'
+    (QueryInfoDevice('EqState')) or ClosedPhase values ('None' is open).
+    """
+    before = np.isin(np.asarray(statusesBefore, dtype=object), ['Open', 'None'])
+    after = np.isin(np.asarray(statusesAfter, dtype=object), ['Open', 'None'])
+    return np.flatnonzero(before != after)
+
+
+class FeederImpactMap:
+    """Networks affected by each switching device of a snapshot."""
+
+    def __init__(self, cympyLib=None):
+        self._cympyLib = cympyLib
+        self._deviceNetworks = []
+        self.studyPath = None
+        self.buildTime = 0.0
+
+    def __len__(self):
+        return len(self._deviceNetworks)
+
+    def build(self, snapshot):
+        """Read the sections of the study and map every snapshot device to its networks."""
+        startTime = time.perf_counter()
+        cympyLib = getCympy(self._cympyLib)
+        sectionNetworks = {}
+        nodeNetworks = collections.defaultdict(set)
+        sectionNodes = {}
+        for section in cympyLib.study.ListSections():
+            networkID = section.GetValue('NetworkID')
+            fromNodeID = section.GetValue('FromNodeID')
+            toNodeID = section.GetValue('ToNodeID')
+            sectionNetworks[section.SectionID] = networkID
+            sectionNodes[section.SectionID] = (fromNodeID, toNodeID)
+            nodeNetworks[fromNodeID].add(networkID)
+            nodeNetworks[toNodeID].add(networkID)
+
+        self._deviceNetworks = []
+        for sectionID in snapshot.sectionIDs:
+            networks = {sectionNetworks.get(sectionID)}
+            for nodeID in sectionNodes.get(sectionID, ()):
+                networks.update(nodeNetworks[nodeID])
+            networks.discard(None)
+            self._deviceNetworks.append(frozenset(networks))
+        self.buildTime = time.perf_counter() - startTime
+
+    def feedersOf(self, positions):
+        """Sorted IDs of the networks affected by the devices at positions."""
+        networks = set()
+        for position in positions:
+            networks.update(self._deviceNetworks[int(position)])
+        return sorted(networks)
+
+    def invalidate(self, studyPath=None):
+        """Forget the map, e.g. because a (different) study was opened."""
+        self._deviceNetworks = []
+        self.studyPath = studyPath
+
+
+def rerunChangedFeeders(DRIVE, feeders, changedFeeders, priorResults, filePathNoExtension,
+                        cympyLib=None):
+    """
+    Run DRIVE only on the feeders in changedFeeders and merge with priorResults.
+
+    priorResults is the per-feeder HC table of the previous DRIVE run.  The
+    HC report of the rerun feeders is saved to filePathNoExtension (with the
+    extension of the report mode used).  Returns the HC of all feeders, in
+    the order of feeders, with a 'Rerun' column that is False for the
+    feeders whose HC was reused.
+    """
+    feederIDs = [str(feeder) for feeder in feeders]
+    changedIDs = set(str(feeder) for feeder in changedFeeders)
+    rerunFeeders = [feeder for feeder in feeders if str(feeder) in changedIDs]
+    priorByFeeder = priorResults.set_index('Feeder')
+    rerunByFeeder = priorByFeeder.iloc[0:0]
+    if len(rerunFeeders) != 0:
+        cympyLib = getCympy(cympyLib)
+        DRIVE.Run(rerunFeeders)
+        savePathHC = saveHCReport(rerunFeeders, filePathNoExtension, cympyLib)
+        rerunByFeeder = loadHCReport(savePathHC, rerunFeeders).set_index('Feeder')
+
+    results = pd.concat([priorByFeeder.drop(index=rerunByFeeder.index, errors='ignore'),
+                         rerunByFeeder]).reindex(feederIDs)
+    results['Rerun'] = results.index.isin(rerunByFeeder.index)
+    return results.rename_axis('Feeder').reset_index()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Run Journal             ###
+
+
+# When a long run stops part way (a license drop, CYME crashing on the third
+#   objective), the scenarios that already finished should not be run again.
+#   RunJournal records every completed scenario in a JSON Lines file in the
+#   results folder:
+#       - the key of the scenario, e.g. the hash of the study fingerprint,
+#           DRIVE profile, objective and method (see scenarioKey), or of the
+#           switch configuration of a sweep candidate
+#       - the output files it saved
+#       - its parsed per-feeder HC table and any other values to restore
+#           (e.g. the HC averages or the switch states after NCO)
+#   When the script is started again with the same journal, the completed
+#   scenarios are read back and skipped, and the run picks up at the first
+#   scenario that did not finish
+#
+# A scenario is recorded after its output files are saved, as one line that
+#   is written in a single call and flushed to disk (os.fsync).  A line cut
+#   short by a crash is dropped when the journal is opened again, so every
+#   scenario is either fully recorded or run again
+#
+# Example:
+#   runJournal = RunJournal(saveResultsFolder + r'\RunJournal.jsonl')
+#   key = scenarioKey(studyFingerprint(studyFilePath), driveProfile.hash, currObj, currMethod)
+#   journalEntry = runJournal.get(key)
+#   if journalEntry is None:
+#       ... nco.Run, DRIVE.Run, saveHCReport, loadHCReport ...
+#       runJournal.record(key, currObj, outputs=[savePathHC], hcResults=hcResults)
+#
+# Notes:
+#   A scenario whose recorded output files were deleted or moved is run again
+#   Delete the journal file (or use another one) to start a run from scratch
+
+
+import collections
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+JournalEntry = collections.namedtuple('JournalEntry',
+                                      ['key', 'name', 'status', 'outputs', 'hcResults',
+                                       'values', 'recordedAt'])
+JournalEntry.__doc__ = 'A completed scenario read back from a RunJournal.'
+
+
+def _toJSON(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def scenarioKey(*parts):
+    """SHA-256 hash of the parts that identify a scenario (strings, numbers, lists)."""
+    content = json.dumps(list(parts), default=_toJSON)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class RunJournal:
+    """Append-only record of the completed scenarios of a run."""
+
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self._records = {}
+        self.skipped = 0
+        self.recorded = 0
+        self.discarded = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.isfile(self.filePath):
+            return
+        with open(self.filePath, 'rb') as journalFile:
+            content = journalFile.read()
+        lines = content.split(b'\n')
+        # Every complete record ends with a newline, so anything after the last
+        #   one was cut short while being written
+        tail = lines.pop()
+        for line in lines:
+            try:
+                record = json.loads(line.decode('utf-8'))
+            except ValueError:
+                self.discarded += 1
+                continue
+            self._records[record['key']] = record
+        if len(tail) != 0:
+            self.discarded += 1
+            with open(self.filePath, 'r+b') as journalFile:
+                journalFile.truncate(len(content) - len(tail))
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def get(self, key):
+        """
+        JournalEntry of the completed scenario key, or None.
+
+        None is also returned if one of the recorded output files is missing,
+        so the scenario is run again.
+        """
+        record = self._records.get(key)
+        if record is None:
+            return None
+        if not all(os.path.isfile(outputPath) for outputPath in record['outputs']):
+            return None
+        hcResults = None
+        if record['hcResults'] is not None:
+            hcResults = pd.DataFrame(record['hcResults'])
+            hcResults['Feeder'] = hcResults['Feeder'].astype(str)
+        self.skipped += 1
+        return JournalEntry(record['key'], record['name'], record['status'],
+                            record['outputs'], hcResults, record['values'],
+                            record['recordedAt'])
+
+    def record(self, key, name, status='done', outputs=(), hcResults=None, values=None):
+        """
+        Record scenario key as completed.
+
+        Call this after the output files are saved.  hcResults is the per-feeder
+        HC table (Feeder, Distributed, Centralized columns) and values any other
+        JSON-serializable values to read back when the scenario is skipped.
+        """
+        if hcResults is not None:
+            hcResults = hcResults[['Feeder', 'Distributed', 'Centralized']].to_dict('list')
+        record = {'key': key, 'name': name, 'status': status,
+                  'outputs': [str(outputPath) for outputPath in outputs],
+                  'hcResults': hcResults, 'values': values or {}, 'recordedAt': time.time()}
+        line = json.dumps(record, default=_toJSON) + '\n'
+        folder = os.path.dirname(os.path.abspath(self.filePath))
+        os.makedirs(folder, exist_ok=True)
+        with open(self.filePath, 'ab') as journalFile:
+            journalFile.write(line.encode('utf-8'))
+            journalFile.flush()
+            os.fsync(journalFile.fileno())
+        self._records[key] = json.loads(line)
+        self.recorded += 1
+
+    def report(self):
+        return ('Run journal: ' + str(self.skipped) + ' completed scenarios skipped, '
+                + str(self.recorded) + ' recorded (' + self.filePath + ')')
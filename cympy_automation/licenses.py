@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               CYME License Handling             ###
+
+
+# Every CymPy session, i.e. every worker process of scenarios.py, holds a
+#   "CYME Scripting Tool with Python" license, and import cympy fails when all
+#   of them are in use (e.g. by other users or machines).  Instead of failing
+#   every scenario of that worker, the backend is acquired with retries:
+#       - acquireBackend() calls the backend factory (import cympy by default)
+#           and, while it fails with a license error, waits and tries again
+#           with exponential backoff and jitter, up to BackoffPolicy.maxWait
+#       - the time spent waiting for a license is returned separately, so it
+#           is not counted as simulation time
+#   runScenarios() (see scenarios.py) starts no more workers than the licenses
+#   a license server reports as available, queues the other scenarios, and
+#   reports the license wait of every scenario in the 'License Wait' column
+#
+# LocalLicenseServer is a stand-in for the CYME license server: a folder with
+#   one seat file per license, which a process checks out by locking it.  The
+#   lock is held by the operating system, so a seat is released when its
+#   process ends, even if it crashed.  With LicensedBackend it reproduces
+#   license shortages with the fake backend, and it can also limit how many
+#   licenses the scripts on one machine use at the same time
+#
+# Example:
+#   licenseServer = LocalLicenseServer(saveResultsFolder + r'\Licenses', nLicenses=2)
+#   backendFactory = LicensedBackend(licenseServer, functools.partial(fakecympy.makeSyntheticStudy))
+#   hcResults = runScenarios(scenarios, scenarioFunction, studyFilePath,
+#                            backendFactory=backendFactory, licenseServer=licenseServer)
+#
+# Notes:
+#   CymPy cannot query the real license server, so with the real cympy either
+#       set maxWorkers or use a LocalLicenseServer with the number of licenses
+#       set aside for the scripts
+#   Errors are treated as license errors if they are LicenseUnavailable or
+#       mention "license" (see isLicenseError); other errors are not retried
+
+
+import collections
+import os
+import random
+import time
+
+from .backend import getCympy
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+
+class LicenseUnavailable(Exception):
+    """No license is free."""
+
+
+BackoffPolicy = collections.namedtuple('BackoffPolicy',
+                                       ['initialDelay', 'maxDelay', 'factor', 'maxWait'])
+BackoffPolicy.__doc__ = 'Delays (s) between license attempts and the total time (s) to keep trying.'
+
+DEFAULT_BACKOFF = BackoffPolicy(initialDelay=5.0, maxDelay=120.0, factor=2.0, maxWait=3600.0)
+
+LicenseAcquisition = collections.namedtuple('LicenseAcquisition', ['cympyLib', 'wait', 'attempts'])
+LicenseAcquisition.__doc__ = 'Backend created by acquireBackend, the time (s) spent waiting and the attempts made.'
+
+
+def isLicenseError(error):
+    """True if error means that no license was available."""
+    return isinstance(error, LicenseUnavailable) or 'license' in str(error).lower()
+
+
+def acquireBackend(backendFactory=None, backoff=DEFAULT_BACKOFF, sleep=time.sleep):
+    """
+    Create the CymPy backend, retrying with backoff while no license is available.
+
+    backendFactory is called to create the backend (the real cympy is
+    imported when None).  Errors that are not license errors, and license
+    errors after backoff.maxWait seconds, are raised.
+    """
+    startTime = time.perf_counter()
+    delay = backoff.initialDelay
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            cympyLib = backendFactory() if backendFactory is not None else getCympy()
+            return LicenseAcquisition(cympyLib, time.perf_counter() - startTime, attempts)
+        except Exception as e:
+            if not isLicenseError(e) or time.perf_counter() - startTime + delay > backoff.maxWait:
+                raise
+        # The jitter keeps workers that were refused together from retrying together
+        sleep(delay * random.uniform(0.5, 1.0))
+        delay = min(delay * backoff.factor, backoff.maxDelay)
+
+
+def _lockFile(seatFile):
+    """Lock an open file without waiting; False if another process holds the lock."""
+    try:
+        if msvcrt is not None:
+            msvcrt.locking(seatFile.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(seatFile.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _unlockFile(seatFile):
+    if msvcrt is not None:
+        msvcrt.locking(seatFile.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(seatFile.fileno(), fcntl.LOCK_UN)
+
+
+class LocalLicenseServer:
+    """nLicenses seats shared by all processes that use the same folder."""
+
+    def __init__(self, folder, nLicenses):
+        self.folder = folder
+        self.nLicenses = nLicenses
+        os.makedirs(folder, exist_ok=True)
+        self._seat = None
+
+    def __getstate__(self):
+        # A checked out seat belongs to the process that locked it
+        state = self.__dict__.copy()
+        state['_seat'] = None
+        return state
+
+    def _seatPath(self, seat):
+        return os.path.join(self.folder, 'seat' + str(seat) + '.lock')
+
+    @property
+    def seat(self):
+        """Seat checked out by this process, or None."""
+        return None if self._seat is None else self._seat[0]
+
+    def checkout(self):
+        """
+        Check out a free seat for this process and return its number.
+
+        A process holds at most one seat, like a CymPy session holds one
+        license; raises LicenseUnavailable if all seats are in use.
+        """
+        if self._seat is not None:
+            return self._seat[0]
+        for seat in range(self.nLicenses):
+            seatFile = open(self._seatPath(seat), 'a+b')
+            if _lockFile(seatFile):
+                self._seat = (seat, seatFile)
+                return seat
+            seatFile.close()
+        raise LicenseUnavailable('All ' + str(self.nLicenses) + ' licenses in '
+                                 + self.folder + ' are in use')
+
+    def release(self):
+        """Release the seat of this process, if it has one."""
+        if self._seat is not None:
+            seatFile = self._seat[1]
+            self._seat = None
+            _unlockFile(seatFile)
+            seatFile.close()
+
+    def available(self):
+        """Number of seats not checked out by any process."""
+        free = 0
+        for seat in range(self.nLicenses):
+            with open(self._seatPath(seat), 'a+b') as seatFile:
+                if _lockFile(seatFile):
+                    free += 1
+                    _unlockFile(seatFile)
+        return free
+
+
+class LicensedBackend:
+    """Backend factory that checks out a LocalLicenseServer seat before creating the backend."""
+
+    def __init__(self, licenseServer, backendFactory=None):
+        self.licenseServer = licenseServer
+        self.backendFactory = backendFactory
+
+    def __call__(self):
+        self.licenseServer.checkout()
+        try:
+            return self.backendFactory() if self.backendFactory is not None else getCympy()
+        except BaseException:
+            self.licenseServer.release()
+            raise
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               NCO Parameter Profiles             ###
+
+
+# The NCO scripts printed about 30 SOMParameters with one
+#   print('Initial value - ...' + nco.GetValue(...)) line each, and set the
+#   objective and method with nco.SetValue before every run
+#
+# SimulationParameters reads all parameters of a simulation object (NCO,
+#   DRIVE, ...) in one pass and keeps the values.  The parameter names are
+#   found with cympy.Describe(objType), together with the known list
+#   (SOM_PARAMETERS for NCO), so the known parameters are read even if the
+#   Describe output cannot be captured or parsed.  apply() compares a profile (or a
+#   plain dict) with the kept values and only calls SetValue for the
+#   parameters that differ, so setting the objective and method in a sweep
+#   loop makes at most two writes and no reads
+#
+# NCO profiles are stored like the DRIVE profiles (see driveprofiles.py), in
+#   nco_profiles.json in this folder.  Profiles are named
+#   <Objective>_<Method>, as the scenarios in scenarios.py
+#
+# Example:
+#   ncoParameters = SimulationParameters(nco, cympyLib=cympy)
+#   print(ncoParameters.report('Initial value'))
+#   ncoParameters.apply(loadNCOProfile('MinimizeVoltageExceptions_Iterative'))
+
+
+import contextlib
+import io
+import os
+import re
+import time
+
+from .backend import getCympy
+from .driveprofiles import ParameterProfile, ProfileApplyResult, _sameValue, loadProfile
+
+
+DEFAULT_NCO_PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nco_profiles.json')
+
+# The SOMParameters printed by the NCO scripts
+SOM_PARAMETERS = (
+    'Objective', 'Method', 'ObjectiveLosses', 'AcceleratedSearch', 'InstallNewSwitch',
+    'LoadFlowParamConfigID', 'ExcludedDeviceType', 'OperateRemotelyControlled', 'ExcludedDevices',
+    'AllowInitialViolation', 'IgnoreTieInSameTopo', 'ObjectiveOperations', 'ObjectiveLoadBalancing',
+    'ObjectiveDistance', 'ObjectiveVoltageExceptions', 'ObjectiveOverload',
+    'ObjectiveWeightOperations', 'ObjectiveWeightLoadBalancing', 'ObjectiveWeightDistance',
+    'ObjectiveWeightLosses', 'ObjectiveWeightVoltageExceptions', 'ObjectiveWeightOverload',
+    'EnableMinimumLoss', 'MinimumLoss', 'EnableMinimumLoadingUnbalance', 'MinimumLoadingUnbalance',
+    'EnableMinimumLengthUnbalance', 'MinimumLengthUnbalance', 'EnableMinDistanceBetweenNewSwitch',
+    'MinDistanceBetweenNewSwitch', 'EnableMaximumNumberSwitchingOperations',
+    'MaximumNumberSwitchingOperations')
+
+KNOWN_PARAMETERS = {'SOMParameters': SOM_PARAMETERS}
+
+
+class NCOProfile(ParameterProfile):
+    """Named set of SOMParameters values."""
+
+
+def loadNCOProfile(name, filePath=DEFAULT_NCO_PROFILE_FILE, overrides=None):
+    """Load an NCO profile, including the profiles it extends, and apply overrides."""
+    return loadProfile(name, filePath, overrides, NCOProfile)
+
+
+def describeParameters(objType, cympyLib=None):
+    """
+    Candidate parameter names of objType from the output of cympy.Describe.
+
+    The names are the first word of each line, so the list may contain
+    headings; SimulationParameters.read drops the names that cannot be read.
+    """
+    cympyLib = getCympy(cympyLib)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        returned = cympyLib.Describe(objType)
+    text = output.getvalue() + ('' if returned is None else '\n' + str(returned))
+    names = []
+    for name in re.findall(r'^\s*([A-Za-z_]\w*)', text, re.M):
+        if name != objType and name not in names:
+            names.append(name)
+    return names
+
+
+class SimulationParameters:
+    """Values of all parameters of a simulation object, read once."""
+
+    def __init__(self, simulation, keys=None, cympyLib=None):
+        self.simulation = simulation
+        self.objType = simulation.GetObjType()
+        if keys is None:
+            # Describe may also give headings and other words that are not
+            #   parameters; read() drops those, but the known ones are always tried
+            keys = describeParameters(self.objType, cympyLib)
+            keys += [key for key in KNOWN_PARAMETERS.get(self.objType, ()) if key not in keys]
+        self.keys = list(keys)
+        self.values = None
+        self.unreadable = []
+        self.readTime = 0.0
+
+    def read(self):
+        """Read every parameter with GetValue; parameters that fail are dropped."""
+        startTime = time.perf_counter()
+        self.values = {}
+        self.unreadable = []
+        for key in self.keys:
+            try:
+                self.values[key] = self.simulation.GetValue(key)
+            except Exception:
+                self.unreadable.append(key)
+        self.keys = list(self.values)
+        self.readTime = time.perf_counter() - startTime
+        return self.values
+
+    def diff(self, target):
+        """The items of target (a profile or dict) that differ from the kept values."""
+        if self.values is None:
+            self.read()
+        settings = target.settings if isinstance(target, ParameterProfile) else dict(target)
+        return {key: value for key, value in settings.items()
+                if key not in self.values or not _sameValue(self.values[key], value)}
+
+    def apply(self, target):
+        """Write only the changed parameters of target and keep the new values."""
+        startTime = time.perf_counter()
+        profile = target if isinstance(target, ParameterProfile) else ParameterProfile('', target)
+        changes = self.diff(profile)
+        for key, value in changes.items():
+            self.simulation.SetValue(value, key)
+            self.values[key] = str(value)
+        unchanged = [key for key in profile.settings if key not in changes]
+        return ProfileApplyResult(profile, list(changes), unchanged, time.perf_counter() - startTime)
+
+    def report(self, prefix='Value'):
+        """One 'prefix - key: value' line per parameter, as the scripts printed them."""
+        if self.values is None:
+            self.read()
+        return '\n'.join(prefix + ' - ' + key + ': ' + str(value) for key, value in self.values.items())
@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Study Pipeline             ###
+
+
+# The four scripts each opened the study, looked up the load models, read the
+#   switching devices, set up DRIVE, saved the reports and parsed the HC in
+#   their own copy of the same code.  StudySession holds one open study and
+#   everything read from it that the stages reuse:
+#       - the switching device snapshot and its DeviceIndex (snapshot.py)
+#       - the SectionPhaseCache used to close devices (sections.py)
+#       - the FeederImpactMap used to rerun only the changed feeders (impact.py)
+#       - the BaselineState the study can be reset to (baseline.py)
+#       - the networks, feeders, load models, the DRIVE and NCO objects and the
+#           SOMParameters read once (ncoprofiles.py)
+#   and has one method per stage:
+#       open -> takeSnapshot -> applySwitchStates / restoreBaseline ->
+#       configureDrive -> optimize -> evaluate -> saveSwitchStates / saveStudy / report
+#   The study is only opened again by open(), so any number of stages and
+#   scenarios run in the same CYME session
+#
+# Pipeline is a list of stages with their arguments that can be built once and
+#   run on a session, e.g. once per NCO objective.  An optimize stage that
+#   finds no better configuration ends the pipeline, as the scripts skip DRIVE
+#   in that case.  With a RunJournal (see journal.py) a pipeline that already
+#   completed is skipped and its HC results are read back instead
+#
+# With a ReportExporter (see exporter.py) the session writes its CSVs in the
+#   background, and Pipeline.submit() only runs the CYME part of an evaluate
+#   stage (DRIVE and saving the report) before returning a Future: parsing the
+#   report, summarizing the HC and recording the journal entry run in the
+#   exporter while CYME already runs the next pipeline
+#
+# Example:
+#   session = StudySession(studyFilePath, saveResultsFolder, cympy)
+#   session.open()
+#   session.takeSnapshot()
+#   session.configureDrive(loadDriveProfile('no-protection'))
+#   session.evaluate('Initial')
+#   objectivePipeline = (Pipeline('MinimizeLosses_HeuristicLocal')
+#                        .then('restoreBaseline')
+#                        .then('optimize', 'MinimizeLosses_HeuristicLocal',
+#                              {'Objective': 'MinimizeLosses', 'Method': 'HeuristicLocal'})
+#                        .then('evaluate', 'MinimizeLosses_HeuristicLocal'))
+#   pipelineResult = objectivePipeline.run(session, runJournal, key)
+#   pipelineFuture = objectivePipeline.submit(session, runJournal, key)   # with an exporter
+#
+# Notes:
+#   All files are written to session.outputFolder with the names the scripts
+#       used (HCReport_<name>, OptReport_<name>.xlsx, SwitchDevicesAfter_<name>.csv)
+#   With a Profiler (see profiling.py) every stage is timed and the cympy
+#       calls are counted per stage; the exporter's work is not included
+#   With an exporter, the evaluations are added to session.evaluations by the
+#       exporter thread, under session.evaluationsLock; summary() and
+#       evaluate(changedSince=...) take the lock, and an evaluation is there
+#       once its Future is done (or after exporter.wait())
+
+
+import collections
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .backend import getCympy
+from .baseline import BaselineState
+from .driveprofiles import applyDriveProfile
+from .exporter import completedFuture
+from .hcreport import loadHCReport, saveHCReport, summarizeHC
+from .impact import FeederImpactMap, rerunChangedFeeders
+from .ncoprofiles import SimulationParameters
+from .profiling import Profiler
+from .readback import readDeviceStates
+from .sections import SectionPhaseCache
+from .snapshot import takeSnapshot
+from .study import openStudy
+from .switching import applySwitchStates, readSwitchStatesCSV
+
+
+NCO_REPORT_NAME = 'Network Configuration Optimization - Summary'
+
+# Stages a Pipeline can run (StudySession methods)
+PIPELINE_STAGES = ('open', 'takeSnapshot', 'applySwitchStates', 'restoreBaseline',
+                   'configureDrive', 'optimize', 'evaluate', 'saveSwitchStates', 'saveStudy',
+                   'report')
+
+OptimizationResult = collections.namedtuple('OptimizationResult',
+                                            ['name', 'optimized', 'message', 'reportPath',
+                                             'statesPath', 'readback'])
+OptimizationResult.__doc__ = 'Outcome of an NCO run; optimized is False if NCO found no better configuration.'
+
+Evaluation = collections.namedtuple('Evaluation',
+                                    ['name', 'hcResults', 'reportPath', 'maxDistAvg',
+                                     'maxCentAvg', 'isOpen'])
+Evaluation.__doc__ = 'Per-feeder HC of a DRIVE run, its averages and the switch states it was run on.'
+
+DriveRun = collections.namedtuple('DriveRun', ['name', 'feeders', 'reportPath', 'isOpen'])
+DriveRun.__doc__ = 'A DRIVE run whose HC report is saved but not parsed yet.'
+
+PipelineResult = collections.namedtuple('PipelineResult',
+                                        ['name', 'status', 'skipped', 'stageResults',
+                                         'hcResults', 'values'])
+PipelineResult.__doc__ = 'Results of the stages of a pipeline run, or of the journal entry it was skipped for.'
+
+
+class StudySession:
+    """One open CYME study and the indexes read from it, shared by the pipeline stages."""
+
+    def __init__(self, studyFilePath, outputFolder, cympyLib=None, profiler=None, exporter=None):
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.exporter = exporter
+        self.cympyLib = self.profiler.wrapCympy(getCympy(cympyLib))
+        self.studyFilePath = studyFilePath
+        self.outputFolder = outputFolder
+        self.sectionPhaseCache = SectionPhaseCache(self.cympyLib)
+        self.feederImpactMap = FeederImpactMap(self.cympyLib)
+        self.isOpened = False
+        # Pipeline.submit() adds the evaluations from the exporter thread
+        self.evaluationsLock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.snapshot = None
+        self.baseline = None
+        self.currentIsOpen = None
+        self.statuses = None
+        self.networks = None
+        self.feeders = None
+        self.driveProfile = None
+        self.evaluations = collections.OrderedDict()
+        self._loadModels = None
+        self._DRIVE = None
+        self._nco = None
+        self._ncoParameters = None
+
+    def _path(self, filename):
+        return os.path.join(self.outputFolder, filename)
+
+    def _writeCSV(self, df, filePath):
+        # The DataFrame is built in the foreground; only the writing is left to
+        #   the exporter
+        if self.exporter is None:
+            df.to_csv(filePath)
+        else:
+            self.exporter.submit(df.to_csv, filePath)
+        return filePath
+
+    def open(self):
+        """Open the study and list its networks; caches from a previous study are cleared."""
+        cympyLib = self.cympyLib
+        self._reset()
+        with self.profiler.stage('Open study'):
+            openStudy(self.studyFilePath, cympyLib,
+                      caches=[self.sectionPhaseCache, self.feederImpactMap])
+        with self.profiler.stage('List networks'):
+            # All networks (which may include transmission lines) for NCO, and
+            #   only the feeders for DRIVE
+            self.networks = cympyLib.study.ListNetworks()
+            self.feeders = cympyLib.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+        self.isOpened = True
+        return self
+
+    @property
+    def loadModels(self):
+        """(name, ID) of every load model of the study, listed once."""
+        if self._loadModels is None:
+            self._loadModels = [(loadModel.Name, int(loadModel.ID))
+                                for loadModel in self.cympyLib.study.ListLoadModels()]
+        return self._loadModels
+
+    def loadModel(self, index):
+        """(name, ID) of the load model at index, e.g. for the DRIVE peak and light load models."""
+        return self.loadModels[index]
+
+    def takeSnapshot(self, includeFuses=False, filename='SwitchingDevicesStates_Initial.csv'):
+        """
+        Read the switching devices, keep them as the baseline and save their states.
+
+        The CSV is not written when filename is None.
+        """
+        with self.profiler.stage('Read switching devices'):
+            self.snapshot = takeSnapshot(self.cympyLib, includeFuses=includeFuses)
+            self.sectionPhaseCache.populate(self.snapshot.sectionIDs)
+            self.baseline = BaselineState(self.snapshot)
+        self.currentIsOpen = self.baseline.isOpen
+        self.statuses = self.snapshot.statuses
+        if filename is not None:
+            self._writeCSV(self.snapshot.toDataFrame(), self._path(filename))
+        return self.snapshot
+
+    def applySwitchStates(self, switchStatesFilePath, onlyChanges=True):
+        """Set the devices to the states of a switching device CSV (see switching.py)."""
+        with self.profiler.stage('Apply switch states'):
+            deviceIDs, statuses, typeNames = readSwitchStatesCSV(switchStatesFilePath)
+            switchResult = applySwitchStates(self.snapshot, deviceIDs, statuses, typeNames,
+                                             self.sectionPhaseCache, onlyChanges=onlyChanges)
+        self.currentIsOpen = ~self.snapshot.isClosed
+        self.statuses = self.snapshot.statuses
+        return switchResult
+
+    def restoreBaseline(self):
+        """Write back the devices that differ from the study as opened (see baseline.py)."""
+        with self.profiler.stage('Restore baseline'):
+            restoreResult = self.baseline.restore(currentIsOpen=self.currentIsOpen)
+        self.currentIsOpen = self.baseline.isOpen
+        self.statuses = self.snapshot.statuses
+        return restoreResult
+
+    @property
+    def DRIVE(self):
+        """The EPRI DRIVE simulation, created once."""
+        if self._DRIVE is None:
+            self._DRIVE = self.cympyLib.sim.EPRIDrive()
+        return self._DRIVE
+
+    def configureDrive(self, driveProfile):
+        """Apply a DriveProfile; only the values that differ are written (see driveprofiles.py)."""
+        self.driveProfile = driveProfile
+        return applyDriveProfile(self.DRIVE, driveProfile)
+
+    @property
+    def nco(self):
+        """The Network Configuration Optimization simulation, created once."""
+        if self._nco is None:
+            self._nco = self.cympyLib.sim.NetworkConfigurationOptimization()
+        return self._nco
+
+    @property
+    def ncoParameters(self):
+        """SimulationParameters of the NCO, read once (see ncoprofiles.py)."""
+        if self._ncoParameters is None:
+            self._ncoParameters = SimulationParameters(self.nco, cympyLib=self.cympyLib)
+            self._ncoParameters.read()
+        return self._ncoParameters
+
+    def optimize(self, name, ncoSettings=None, operableOnly=True, reportFilename=None,
+                 statesFilename=None):
+        """
+        Run NCO with ncoSettings (an NCOProfile or dict) on all networks.
+
+        The NCO summary is saved as OptReport_<name>.xlsx and the switching
+        device states after NCO as SwitchDevicesAfter_<name>.csv, unless other
+        filenames are given.  With operableOnly only the devices NCO may
+        operate are read back (see readback.py).
+        """
+        cympyLib = self.cympyLib
+        ncoParameters = self.ncoParameters
+        if ncoSettings is not None:
+            ncoParameters.apply(ncoSettings)
+        with self.profiler.stage('Run NCO'):
+            try:
+                self.nco.Run(self.networks)
+            except cympyLib.err.CymError as e:
+                return OptimizationResult(name, False, e.GetMessage(), None, None, None)
+
+        reportPath = self._path(reportFilename or 'OptReport_' + name + '.xlsx')
+        with self.profiler.stage('Save NCO report'):
+            cympyLib.rm.Save(NCO_REPORT_NAME, self.networks, cympyLib.enums.ReportModeType.MSExcel,
+                             reportPath)
+
+        with self.profiler.stage('Read switch states'):
+            excluded = ncoParameters.values if operableOnly else {}
+            stateReadback = readDeviceStates(self.snapshot, cympyLib, operableOnly=operableOnly,
+                                             excludedDevices=excluded.get('ExcludedDevices', ''),
+                                             excludedDeviceTypes=excluded.get('ExcludedDeviceType', ''))
+        self.currentIsOpen = stateReadback.isOpen
+        self.statuses = stateReadback.states
+        statesPath = self.saveSwitchStates(statesFilename or 'SwitchDevicesAfter_' + name + '.csv')
+        return OptimizationResult(name, True, '', reportPath, statesPath, stateReadback)
+
+    def saveSwitchStates(self, filename, includeInitial=False):
+        """
+        Save the current switching device states as a CSV and return its path.
+
+        With includeInitial the states of the baseline are saved next to them,
+        as in SwitchingStates_BeforeAfter.csv.
+        """
+        df = self.snapshot.toDataFrame()
+        if includeInitial:
+            df['Status'] = np.where(self.baseline.isOpen, 'Open', 'Close').astype(object)
+            df = df.rename(columns={'Status': 'Status Initial'})
+            df.insert(2, 'Status After NCO', self.statuses)
+        else:
+            df['Status'] = self.statuses
+        return self._writeCSV(df, self._path(filename))
+
+    def _impactMap(self):
+        if len(self.feederImpactMap) == 0:
+            with self.profiler.stage('Build feeder impact map'):
+                self.feederImpactMap.build(self.snapshot)
+        return self.feederImpactMap
+
+    def evaluate(self, name, feeders=None, changedSince=None, reportFilename=None):
+        """
+        Run DRIVE, save the HC report as HCReport_<name> and parse it.
+
+        feeders defaults to all feeders.  With changedSince (the name of an
+        earlier evaluation), DRIVE is only rerun on the feeders with devices
+        that changed since then and the HC of the other feeders is reused; the
+        merged HC is saved as HCResults_<name>.csv (see impact.py), which is
+        then the reportPath of the evaluation.
+        """
+        if feeders is None:
+            feeders = self.feeders
+        if changedSince is not None:
+            prior = self._evaluation(changedSince)
+            if prior is None and self.exporter is not None:
+                # The earlier evaluation may still be parsed by the exporter
+                self.exporter.wait()
+                prior = self._evaluation(changedSince)
+            if prior is None:
+                raise KeyError('No evaluation named ' + repr(changedSince))
+            positions = np.flatnonzero(prior.isOpen != self.currentIsOpen)
+            changedFeeders = self._impactMap().feedersOf(positions)
+            with self.profiler.stage('Run DRIVE'):
+                hcResults = rerunChangedFeeders(self.DRIVE, feeders, changedFeeders,
+                                                prior.hcResults,
+                                                self._path(reportFilename or 'HCReport_' + name),
+                                                self.cympyLib)
+            reportPath = self._writeCSV(hcResults, self._path('HCResults_' + name + '.csv'))
+            return self.finishEvaluation(DriveRun(name, feeders, reportPath,
+                                                  np.array(self.currentIsOpen, dtype=bool)),
+                                         hcResults)
+        driveRun = self.runDrive(name, feeders, reportFilename)
+        with self.profiler.stage('Parse HC report'):
+            hcResults = loadHCReport(driveRun.reportPath, driveRun.feeders)
+        return self.finishEvaluation(driveRun, hcResults)
+
+    def runDrive(self, name, feeders=None, reportFilename=None):
+        """
+        Run DRIVE and save the HC report as HCReport_<name>, without parsing it.
+
+        Returns a DriveRun; finishEvaluation() turns it into an Evaluation
+        once the report is parsed, which Pipeline.submit() leaves to the exporter.
+        """
+        if feeders is None:
+            feeders = self.feeders
+        with self.profiler.stage('Run DRIVE'):
+            self.DRIVE.Run(feeders)
+        with self.profiler.stage('Save HC report'):
+            reportPath = saveHCReport(feeders, self._path(reportFilename or 'HCReport_' + name),
+                                      self.cympyLib)
+        return DriveRun(name, feeders, reportPath, np.array(self.currentIsOpen, dtype=bool))
+
+    def _evaluation(self, name):
+        with self.evaluationsLock:
+            return self.evaluations.get(name)
+
+    def finishEvaluation(self, driveRun, hcResults):
+        """Summarize the parsed HC of a DriveRun and keep it as an Evaluation."""
+        maxDistAvg, maxCentAvg = summarizeHC(hcResults)
+        evaluation = Evaluation(driveRun.name, hcResults, driveRun.reportPath, maxDistAvg,
+                                maxCentAvg, driveRun.isOpen)
+        with self.evaluationsLock:
+            self.evaluations[driveRun.name] = evaluation
+        return evaluation
+
+    def saveStudy(self, filename):
+        """Save the study with its changes as outputFolder/filename and return the path."""
+        filePath = self._path(filename)
+        with self.profiler.stage('Save study'):
+            self.cympyLib.study.Save(filePath, True, True, True)
+        return filePath
+
+    def summary(self):
+        """Average distributed and centralized HC of every evaluation, in the order run."""
+        with self.evaluationsLock:
+            evaluations = list(self.evaluations.values())
+        return pd.DataFrame([{'Name': evaluation.name, 'Distributed': evaluation.maxDistAvg,
+                              'Centralized': evaluation.maxCentAvg}
+                             for evaluation in evaluations],
+                            columns=['Name', 'Distributed', 'Centralized'])
+
+    def report(self):
+        lines = ['Study session: ' + str(self.studyFilePath),
+                 '    Switching devices: ' + str(0 if self.snapshot is None else len(self.snapshot)),
+                 '    Feeders: ' + str(0 if self.feeders is None else len(self.feeders))]
+        summary = self.summary()
+        if len(summary) != 0:
+            lines.append('Average HC of each DRIVE run:')
+            lines.append(summary.to_string(index=False))
+        return '\n'.join(lines)
+
+
+def _outputFiles(stageResult):
+    return [path for path in (getattr(stageResult, 'reportPath', None),
+                              getattr(stageResult, 'statesPath', None)) if path is not None]
+
+
+class Pipeline:
+    """Stages of a StudySession, with their arguments, run in order."""
+
+    def __init__(self, name=''):
+        self.name = name
+        self.stages = []
+
+    def then(self, stage, *args, **kwargs):
+        """Add a stage (a name in PIPELINE_STAGES) and return the pipeline, so calls can be chained."""
+        if stage not in PIPELINE_STAGES:
+            raise ValueError('Unknown pipeline stage ' + repr(stage) + '; the stages are '
+                             + ', '.join(PIPELINE_STAGES))
+        self.stages.append((stage, args, kwargs))
+        return self
+
+    def __len__(self):
+        return len(self.stages)
+
+    def run(self, session, journal=None, key=None):
+        """
+        Run the stages on session and return a PipelineResult.
+
+        With a journal and key, a pipeline already recorded as completed is
+        not run; otherwise it is recorded with the files its stages saved and
+        the HC of its last evaluation.
+        """
+        if journal is not None:
+            journalEntry = journal.get(key)
+            if journalEntry is not None:
+                return PipelineResult(self.name, journalEntry.status, True, [],
+                                      journalEntry.hcResults, journalEntry.values)
+        status, stageResults = self._runStages(session, deferParsing=False)
+        if session.exporter is not None:
+            # The journal entry is only recorded once the CSVs are written
+            session.exporter.wait()
+        return self._finish(session, journal, key, status, stageResults)
+
+    def submit(self, session, journal=None, key=None):
+        """
+        Run the CYME part of the stages and return a Future of the PipelineResult.
+
+        The HC reports of the evaluate stages are parsed, and the journal entry
+        recorded, by session.exporter, so the next pipeline can start right
+        away.  An evaluate stage with changedSince needs the HC of the earlier
+        evaluation and is run in full.  Without an exporter the pipeline is
+        run as by run().
+        """
+        if session.exporter is None:
+            return completedFuture(self.run(session, journal, key))
+        if journal is not None:
+            journalEntry = journal.get(key)
+            if journalEntry is not None:
+                return completedFuture(PipelineResult(self.name, journalEntry.status, True, [],
+                                                      journalEntry.hcResults,
+                                                      journalEntry.values))
+        status, stageResults = self._runStages(session, deferParsing=True)
+        return session.exporter.submit(self._finish, session, journal, key, status, stageResults)
+
+    def _runStages(self, session, deferParsing):
+        status = 'done'
+        stageResults = []
+        for stage, args, kwargs in self.stages:
+            if deferParsing and stage == 'evaluate' and kwargs.get('changedSince') is None:
+                stageResult = session.runDrive(*args, **kwargs)
+            else:
+                stageResult = getattr(session, stage)(*args, **kwargs)
+            stageResults.append(stageResult)
+            if isinstance(stageResult, OptimizationResult) and not stageResult.optimized:
+                status = 'noOptimization'
+                break
+        return status, stageResults
+
+    def _finish(self, session, journal, key, status, stageResults):
+        outputs = []
+        evaluation = None
+        for position, stageResult in enumerate(stageResults):
+            if isinstance(stageResult, DriveRun):
+                hcResults = session.exporter.call(loadHCReport, stageResult.reportPath,
+                                                  stageResult.feeders)
+                stageResult = session.finishEvaluation(stageResult, hcResults)
+                stageResults[position] = stageResult
+            outputs.extend(_outputFiles(stageResult))
+            if isinstance(stageResult, Evaluation):
+                evaluation = stageResult
+        hcResults = None
+        values = {}
+        if evaluation is not None:
+            hcResults = evaluation.hcResults
+            values = {'maxDistAvg': evaluation.maxDistAvg, 'maxCentAvg': evaluation.maxCentAvg}
+        if journal is not None:
+            journal.record(key, self.name, status=status, outputs=outputs, hcResults=hcResults,
+                           values=values)
+        return PipelineResult(self.name, status, False, stageResults, hcResults, values)
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Run Profiling             ###
+
+
+# After an overnight run there is no way to tell whether the time went into
+#   cympy.study.Open, reading the devices, nco.Run, DRIVE.Run, cympy.rm.Save
+#   or reading the reports back.  Profiler records:
+#       - stages: named parts of the run, timed with wall clock and CPU time,
+#           e.g.  with profiler.stage('Run DRIVE'):  (or profiler.begin and
+#           profiler.end in cell-by-cell scripts).  Stages can be nested
+#       - cympy calls: profiler.wrapCympy(cympy) returns a stand-in for the
+#           cympy module that times every call made through cympy.study,
+#           cympy.sim, cympy.rm and cympy.app, and through the objects they
+#           return (devices, simulations, ...).  Calls are counted per name
+#           (e.g. 'cympy.study.ListDevices', 'Switch.GetValue') in the
+#           innermost stage that was running
+#   At the end of the run, report() prints a summary table and save() writes
+#   the stages and calls as JSON and CSV trace files
+#
+# When the profiler is created with enabled=False, wrapCympy returns cympy
+#   itself and stage() returns a shared empty context manager, so the
+#   instrumented scripts run at the same speed as without it
+#
+# Example:
+#   profiler = Profiler(enabled=True)
+#   cympy = profiler.wrapCympy(cympy)
+#   with profiler.stage('Open study'):
+#       cympy.study.Open(studyFilePath)
+#   ...
+#   print(profiler.report())
+#   profiler.save(saveResultsFolder + r'\ProfileTrace')
+#
+# Notes:
+#   CPU time is the CPU time of this Python process; CYME work done in other
+#       processes is only seen in the wall clock time
+#   Arguments are passed on unwrapped, so wrapped objects can be given back
+#       to cympy functions
+
+
+import collections
+import contextlib
+import json
+import time
+
+import pandas as pd
+
+
+# Parts of cympy whose functions are timed; other attributes (enums, err, ...)
+#   are returned as they are
+CYMPY_NAMESPACES = ('study', 'sim', 'rm', 'app', 'eq')
+
+_PLAIN_TYPES = (str, bytes, int, float, bool, complex, type(None), dict, set, frozenset)
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def _unwrap(value):
+    if isinstance(value, _CallProxy):
+        return object.__getattribute__(value, '_target')
+    if isinstance(value, list) and len(value) != 0 and isinstance(value[0], _CallProxy):
+        return [_unwrap(item) for item in value]
+    return value
+
+
+class _CallProxy:
+    """Stand-in for a cympy module or object whose method calls are timed."""
+
+    __slots__ = ('_target', '_label', '_profiler', '_namespaces')
+
+    def __init__(self, target, label, profiler, namespaces=()):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_label', label)
+        object.__setattr__(self, '_profiler', profiler)
+        object.__setattr__(self, '_namespaces', namespaces)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name in self._namespaces:
+            return _CallProxy(value, self._label + '.' + name, self._profiler)
+        if callable(value) and not isinstance(value, type):
+            return self._profiler._timedCall(value, self._label + '.' + name)
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __repr__(self):
+        return repr(self._target)
+
+
+class Profiler:
+    """Wall/CPU timers for the stages of a run and the cympy calls made in them."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.startTime = time.time()
+        self._startWall = time.perf_counter()
+        self._stack = []
+        self._stages = []
+        # (stage, call) -> [count, wall, CPU, longest call]
+        self._calls = collections.defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+
+    def begin(self, name):
+        """Start a stage; it ends with end() (or use stage())."""
+        if self.enabled:
+            self._stack.append((name, time.perf_counter(), time.process_time()))
+
+    def end(self):
+        """End the stage started last and return its wall clock time (s)."""
+        if not self.enabled:
+            return 0.0
+        name, startWall, startCPU = self._stack.pop()
+        wall = time.perf_counter() - startWall
+        self._stages.append({'Stage': name,
+                             'Path': '/'.join([entry[0] for entry in self._stack] + [name]),
+                             'Depth': len(self._stack),
+                             'Start': startWall - self._startWall,
+                             'Wall': wall,
+                             'CPU': time.process_time() - startCPU})
+        return wall
+
+    @contextlib.contextmanager
+    def _timedStage(self, name):
+        self.begin(name)
+        try:
+            yield self
+        finally:
+            self.end()
+
+    def stage(self, name):
+        """Context manager that times the code in it as stage name."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timedStage(name)
+
+    def _addCall(self, label, wall, cpu):
+        stageName = self._stack[-1][0] if len(self._stack) != 0 else ''
+        entry = self._calls[(stageName, label)]
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += cpu
+        if wall > entry[3]:
+            entry[3] = wall
+
+    def _wrapResult(self, result):
+        if isinstance(result, _PLAIN_TYPES):
+            return result
+        if isinstance(result, (list, tuple)):
+            if len(result) == 0 or isinstance(result[0], _PLAIN_TYPES):
+                return result
+            return [self._wrapResult(item) for item in result]
+        return _CallProxy(result, type(result).__name__, self)
+
+    def _timedCall(self, function, label, wrapResults=True):
+        def timedCall(*args, **kwargs):
+            args = [_unwrap(arg) for arg in args]
+            startWall = time.perf_counter()
+            startCPU = time.process_time()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                self._addCall(label, time.perf_counter() - startWall,
+                              time.process_time() - startCPU)
+            return self._wrapResult(result) if wrapResults else result
+        return timedCall
+
+    def wrapCympy(self, cympyLib, label='cympy'):
+        """Stand-in for cympyLib that times its calls (cympyLib itself when disabled)."""
+        if not self.enabled:
+            return cympyLib
+        return _CallProxy(cympyLib, label, self, CYMPY_NAMESPACES)
+
+    def timed(self, function, label=None):
+        """function with its calls timed (e.g. pd.read_excel), or function itself when disabled."""
+        if not self.enabled:
+            return function
+        return self._timedCall(function, label or getattr(function, '__qualname__', repr(function)),
+                               wrapResults=False)
+
+    def stageTable(self):
+        """One row per stage run, in the order they ended."""
+        return pd.DataFrame(self._stages, columns=['Stage', 'Path', 'Depth', 'Start', 'Wall', 'CPU'])
+
+    def callTable(self):
+        """Number and time of the calls of each name, per stage."""
+        rows = [{'Stage': stageName, 'Call': label, 'Count': entry[0], 'Wall': entry[1],
+                 'CPU': entry[2], 'Max Wall': entry[3]}
+                for (stageName, label), entry in self._calls.items()]
+        calls = pd.DataFrame(rows, columns=['Stage', 'Call', 'Count', 'Wall', 'CPU', 'Max Wall'])
+        return calls.sort_values('Wall', ascending=False, ignore_index=True)
+
+    def summary(self):
+        """
+        Totals per stage name: runs, wall and CPU time, share of the run,
+        and the number and wall time of the cympy calls made in the stage.
+        """
+        totalWall = time.perf_counter() - self._startWall
+        stages = self.stageTable().groupby('Stage', sort=False).agg(
+            Count=('Wall', 'size'), Wall=('Wall', 'sum'), CPU=('CPU', 'sum'))
+        calls = self.callTable().groupby('Stage').agg(Calls=('Count', 'sum'),
+                                                      CallWall=('Wall', 'sum'))
+        # Stages in the order they first ended, then calls made outside of them
+        order = list(stages.index) + [name for name in calls.index if name not in stages.index]
+        summary = stages.join(calls, how='outer').reindex(order).fillna(0.0)
+        summary['Calls'] = summary['Calls'].astype(int)
+        summary['Count'] = summary['Count'].astype(int)
+        summary['% of Run'] = 100.0 * summary['Wall'] / totalWall if totalWall > 0 else 0.0
+        summary = summary.rename(columns={'CallWall': 'cympy Wall'})
+        summary.index = summary.index.where(summary.index != '', '(no stage)')
+        return summary[['Count', 'Wall', 'CPU', '% of Run', 'Calls', 'cympy Wall']]
+
+    def report(self, nCalls=10):
+        if not self.enabled:
+            return 'Profiling disabled'
+        totalWall = time.perf_counter() - self._startWall
+        lines = ['Run profile: ' + format(totalWall, '.3f') + ' s wall clock, '
+                 + str(len(self._stages)) + ' stages, '
+                 + str(sum(entry[0] for entry in self._calls.values())) + ' cympy calls',
+                 self.summary().round(3).to_string()]
+        calls = self.callTable()
+        if len(calls) != 0:
+            lines.append('Slowest cympy calls (total per stage):')
+            lines.append(calls.head(nCalls).round(4).to_string(index=False))
+        return '\n'.join(lines)
+
+    def save(self, filePathNoExtension):
+        """
+        Write the trace as <path>.json and <path>_stages.csv / <path>_calls.csv.
+
+        Returns the paths of the three files.
+        """
+        stages = self.stageTable()
+        calls = self.callTable()
+        trace = {'started': self.startTime,
+                 'wall': time.perf_counter() - self._startWall,
+                 'stages': stages.to_dict('records'),
+                 'calls': calls.to_dict('records')}
+        jsonPath = filePathNoExtension + '.json'
+        with open(jsonPath, 'w') as traceFile:
+            json.dump(trace, traceFile, indent=1)
+        stagesPath = filePathNoExtension + '_stages.csv'
+        callsPath = filePathNoExtension + '_calls.csv'
+        stages.to_csv(stagesPath, index=False)
+        calls.to_csv(callsPath, index=False)
+        return jsonPath, stagesPath, callsPath
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Switching Device State Readback             ###
+
+
+# After nco.Run(networks) the scripts query the state of every switching
+#   device with cympy.study.QueryInfoDevice("EqState", id, type).
+#   readDeviceStates() does the same for the devices of a snapshot in one
+#   batch:
+#       - the IDs and types come from the snapshot, and the DeviceType enum
+#           value of each type is looked up once instead of once per device
+#       - the states are returned as a compact boolean array (isOpen) next to
+#           the 'Open'/'Closed' strings the scripts write to CSV
+#       - with operableOnly=True only the devices NCO was allowed to operate
+#           are queried; devices listed in the NCO ExcludedDevices parameter or
+#           of a type in ExcludedDeviceType keep their state from the snapshot
+#       - the snapshot is brought up to date with the states read, so later
+#           applySwitchStates calls compare against the study after NCO; only
+#           the devices that NCO closed need a GetValue('ClosedPhase')
+#
+# Example:
+#   stateReadback = readDeviceStates(switchingSnapshot, cympy, operableOnly=True,
+#                                    excludedDevices=ncoParameters.values['ExcludedDevices'],
+#                                    excludedDeviceTypes=ncoParameters.values['ExcludedDeviceType'])
+#   switchStatusAfter = list(stateReadback.states)
+
+
+import re
+import time
+
+import numpy as np
+
+from .backend import getCympy
+
+
+def _splitList(value):
+    """Items of a comma or semicolon separated parameter value."""
+    if value is None:
+        return []
+    return [item.strip() for item in re.split(r'[,;]', str(value)) if item.strip() != '']
+
+
+def operableMask(snapshot, excludedDevices='', excludedDeviceTypes='', cympyLib=None):
+    """
+    Boolean array, True for the snapshot devices NCO may operate.
+
+    excludedDevices is the ExcludedDevices value (device IDs) and
+    excludedDeviceTypes the ExcludedDeviceType value (type names or
+    DeviceType enum values), both comma or semicolon separated.
+    """
+    excludedTypes = set(item.lower() for item in _splitList(excludedDeviceTypes))
+    typeExcluded = np.zeros(len(snapshot.typeNames), dtype=bool)
+    if excludedTypes:
+        cympyLib = getCympy(cympyLib)
+        for typeCode, typeName in enumerate(snapshot.typeNames):
+            enumValue = str(getattr(cympyLib.enums.DeviceType, typeName, ''))
+            typeExcluded[typeCode] = (typeName.lower() in excludedTypes
+                                      or enumValue.lower() in excludedTypes)
+    mask = ~typeExcluded[snapshot.typeCodes]
+    excludedIDs = set(_splitList(excludedDevices))
+    if excludedIDs:
+        mask &= ~np.isin(snapshot.ids.astype(str), list(excludedIDs))
+    return mask
+
+
+class StateReadback:
+    """States of all snapshot devices after a readback."""
+
+    def __init__(self, isOpen, queried, elapsed):
+        self.isOpen = isOpen
+        self.queried = queried
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.isOpen)
+
+    @property
+    def states(self):
+        """'Open'/'Closed' of every device, as returned by QueryInfoDevice('EqState')."""
+        return np.where(self.isOpen, 'Open', 'Closed').astype(object)
+
+    @property
+    def queries(self):
+        """Number of QueryInfoDevice calls made."""
+        return int(self.queried.sum())
+
+    def report(self):
+        return ('Read back ' + str(len(self)) + ' switching device states in '
+                + format(self.elapsed, '.3f') + ' s (' + str(self.queries)
+                + ' QueryInfoDevice calls, ' + str(len(self) - self.queries)
+                + ' devices excluded from NCO skipped)')
+
+
+def readDeviceStates(snapshot, cympyLib=None, operableOnly=False, excludedDevices='',
+                     excludedDeviceTypes='', updateSnapshot=True):
+    """
+    Query the EqState of the snapshot devices.
+
+    With operableOnly=True the devices excluded from NCO are not queried and
+    keep their state from the snapshot.  With updateSnapshot,
+    snapshot.closedPhases is set to the states read: 'None' for the devices
+    found open and the ClosedPhase of the devices found closed that were open.
+    """
+    startTime = time.perf_counter()
+    cympyLib = getCympy(cympyLib)
+    if operableOnly:
+        queried = operableMask(snapshot, excludedDevices, excludedDeviceTypes, cympyLib)
+    else:
+        queried = np.ones(len(snapshot), dtype=bool)
+
+    typeEnums = [getattr(cympyLib.enums.DeviceType, typeName) for typeName in snapshot.typeNames]
+    isOpen = ~snapshot.isClosed
+    queryInfoDevice = cympyLib.study.QueryInfoDevice
+    ids = snapshot.ids
+    typeCodes = snapshot.typeCodes
+    for position in np.flatnonzero(queried):
+        isOpen[position] = queryInfoDevice('EqState', ids[position],
+                                           typeEnums[typeCodes[position]]) == 'Open'
+    if updateSnapshot:
+        for position in np.flatnonzero(isOpen != ~snapshot.isClosed):
+            if isOpen[position]:
+                snapshot.closedPhases[position] = 'None'
+            else:
+                snapshot.closedPhases[position] = snapshot.devices[position].GetValue('ClosedPhase')
+    return StateReadback(isOpen, queried, time.perf_counter() - startTime)
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Parallel Scenario Runner             ###
+
+
+# MultipleNCO_ExampleScript.py runs every objective/method pair one after the
+#   other in a single CYME session, each followed by a full EPRI DRIVE run.
+#   runScenarios() farms the scenarios out to a pool of worker processes
+#   instead.  Each worker:
+#       - creates its own CymPy backend (the real cympy, or a picklable
+#           factory such as functools.partial(fakecympy.makeSyntheticStudy))
+#       - copies the .sxst study into its own folder so no two CYME sessions
+#           open the same file
+#       - runs the scenario function on each scenario it is given
+#   The per-feeder results of all scenarios are merged into one DataFrame
+#
+# A scenario function has the signature
+#       scenarioFunction(cympyLib, studyFilePath, scenario) -> DataFrame
+#   and must be a module level function (or a functools.partial of one) so
+#   that it can be sent to the workers.  runNCOScenario() is the NCO + DRIVE
+#   workflow of MultipleNCO_ExampleScript.py
+#
+# Notes:
+#   Each worker uses a CYME license for as long as the pool is running, so
+#       maxWorkers should not be larger than the number of licenses available.
+#       With a licenseServer (see licenses.py) the pool is sized to the free
+#       licenses, and each worker waits for its license with backoff when it
+#       starts its first scenario; the wait is reported in 'License Wait'
+#       and is not included in 'Elapsed'
+#   On Windows the workers are started by re-importing the main script, so
+#       runScenarios() must be called from under  if __name__ == '__main__':
+#       (see ParallelNCO_ExampleScript.py)
+#   With maxWorkers=1 the scenarios are run in the current process, which is
+#       easier to debug
+
+
+import collections
+import concurrent.futures
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from .backend import getCympy
+from .driveprofiles import ParameterProfile, applyDriveSettings
+from .hccache import HCResultCache, studyFingerprint
+from .licenses import DEFAULT_BACKOFF, acquireBackend
+from .pipeline import StudySession
+
+NCOScenario = collections.namedtuple('NCOScenario', ['name', 'objective', 'method'])
+NCOScenario.__doc__ = 'NCO objective/method pair; objective=None runs DRIVE on the study as opened.'
+
+
+def makeNCOScenarios(objectiveList, methodList, includeInitial=True):
+    """Scenarios for the objective and method lists of MultipleNCO_ExampleScript.py."""
+    scenarios = [NCOScenario('Initial', None, None)] if includeInitial else []
+    for currObj, currMethod in zip(objectiveList, methodList):
+        scenarios.append(NCOScenario(str(currObj) + '_' + str(currMethod), currObj, currMethod))
+    return scenarios
+
+
+# State of a worker process, set up once by _initWorker
+_worker = {}
+
+
+def _initWorker(backendFactory, studyFilePath, workFolder, backoff=DEFAULT_BACKOFF):
+    workerStudyPath = studyFilePath
+    if workFolder is not None and os.path.isfile(studyFilePath):
+        workerFolder = os.path.join(workFolder, 'worker_' + str(os.getpid()))
+        os.makedirs(workerFolder, exist_ok=True)
+        workerStudyPath = os.path.join(workerFolder, os.path.basename(studyFilePath))
+        shutil.copy2(studyFilePath, workerStudyPath)
+    # The backend (and its license) is acquired by the first scenario, so a
+    #   worker that cannot get a license fails its scenarios, not the pool
+    _worker['backendFactory'] = backendFactory
+    _worker['backoff'] = backoff
+    _worker['cympyLib'] = None
+    _worker['studyFilePath'] = workerStudyPath
+
+
+def _workerBackend():
+    """Time (s) spent waiting for the backend of this worker; 0 once it exists."""
+    if _worker['cympyLib'] is not None:
+        return 0.0
+    acquisition = acquireBackend(_worker['backendFactory'], _worker['backoff'])
+    _worker['cympyLib'] = acquisition.cympyLib
+    return acquisition.wait
+
+
+def _runTask(scenarioFunction, scenario):
+    licenseWait = _workerBackend()
+    startTime = time.perf_counter()
+    results = scenarioFunction(_worker['cympyLib'], _worker['studyFilePath'], scenario)
+    results = results.copy()
+    results['Worker'] = os.getpid()
+    results['Elapsed'] = time.perf_counter() - startTime
+    results['License Wait'] = licenseWait
+    return results
+
+
+def _failedResult(scenario, error):
+    return pd.DataFrame({'Scenario': [getattr(scenario, 'name', str(scenario))],
+                         'Status': ['Failed'], 'Message': [repr(error)]})
+
+
+def runScenarios(scenarios, scenarioFunction, studyFilePath, backendFactory=None,
+                 maxWorkers=None, workFolder=None, licenseServer=None, backoff=DEFAULT_BACKOFF):
+    """
+    Run scenarioFunction on every scenario in a pool of worker processes.
+
+    backendFactory is called once in each worker to create its CymPy backend
+    (the real cympy when None).  The study is copied into a folder per worker
+    under workFolder (a temporary folder when None).  Returns the results of
+    all scenarios concatenated in scenario order; a scenario that raises is
+    reported with Status 'Failed' instead of stopping the other scenarios.
+
+    With a licenseServer (e.g. a LocalLicenseServer, see licenses.py), no
+    more workers are started than it has licenses available.  Each worker
+    retries its backend with backoff while no license is free; the time it
+    waited is reported per scenario in the 'License Wait' column.
+    """
+    scenarios = list(scenarios)
+    if maxWorkers is None:
+        maxWorkers = min(len(scenarios), os.cpu_count() or 1)
+    if licenseServer is not None:
+        maxWorkers = max(1, min(maxWorkers, licenseServer.available()))
+    with tempfile.TemporaryDirectory() as tempFolder:
+        if workFolder is None:
+            workFolder = tempFolder
+        initArgs = (backendFactory, studyFilePath, workFolder, backoff)
+        results = []
+        if maxWorkers <= 1:
+            _initWorker(*initArgs)
+            for scenario in scenarios:
+                try:
+                    results.append(_runTask(scenarioFunction, scenario))
+                except Exception as e:
+                    results.append(_failedResult(scenario, e))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=maxWorkers,
+                                                        initializer=_initWorker,
+                                                        initargs=initArgs) as pool:
+                futures = [pool.submit(_runTask, scenarioFunction, scenario)
+                           for scenario in scenarios]
+                for scenario, future in zip(scenarios, futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append(_failedResult(scenario, e))
+    return pd.concat(results, ignore_index=True, sort=False)
+
+
+# StudySession of the study last opened by runNCOScenario in this process
+_openedStudy = {}
+
+
+def _startFromBaseline(cympyLib, studyFilePath, outputFolder, reuseStudy):
+    """StudySession of the study as saved, reopening it only when needed."""
+    key = (id(cympyLib), studyFilePath)
+    if reuseStudy and _openedStudy.get('key') == key:
+        session = _openedStudy['session']
+        session.restoreBaseline()
+    else:
+        session = StudySession(studyFilePath, outputFolder, cympyLib)
+        session.open()
+        session.takeSnapshot(filename=None)
+        _openedStudy['key'] = key
+        _openedStudy['session'] = session
+    session.outputFolder = outputFolder
+    return session
+
+
+def runNCOScenario(cympyLib, studyFilePath, scenario, outputFolder, driveSettings=None,
+                   cacheFolder=None, reuseStudy=True, loadModelIndexes=None):
+    """
+    Open the study, run NCO for the scenario and then EPRI DRIVE on all feeders.
+
+    driveSettings is a DriveProfile (or a dict of EPRIDriveParameters values)
+    applied before DRIVE is run.  loadModelIndexes is the (peak, light)
+    position of the DRIVE load models in cympy.study.ListLoadModels(), as in
+    session.loadModel(4) and (5) of the other scripts; their IDs are read
+    from the study of the worker and set as PeakLoadModelID and
+    MinLoadModelID of driveSettings.  The NCO summary, switching device states
+    and HC report are saved to outputFolder with the same names as in
+    MultipleNCO_ExampleScript.py.
+    Returns the HC of each feeder with the scenario name, objective, method
+    and status ('Initial', 'Optimized' or 'No optimization').
+
+    With a cacheFolder, the HC of a switching configuration already analyzed
+    with the same driveSettings is read from an HCResultCache instead of
+    running DRIVE (the 'Cached' column is True and no HC report is saved).
+
+    With reuseStudy=True, the StudySession of a previous scenario in the same
+    process (see pipeline.py) is reused instead of opening the study again;
+    the switching devices changed by that scenario are restored to the
+    baseline instead (see baseline.py).
+    """
+    cympyLib = getCympy(cympyLib)
+    session = _startFromBaseline(cympyLib, studyFilePath, outputFolder, reuseStudy)
+    snapshot = session.snapshot
+    suffix = str(scenario.objective) + '_' + str(scenario.method)
+    if loadModelIndexes is not None:
+        peakLoadName, peakLoadID = session.loadModel(loadModelIndexes[0])
+        lightLoadName, lightLoadID = session.loadModel(loadModelIndexes[1])
+        loadModelIDs = {'PeakLoadModelID': peakLoadID, 'MinLoadModelID': lightLoadID}
+        if isinstance(driveSettings, ParameterProfile):
+            driveSettings = driveSettings.withOverrides(loadModelIDs)
+        else:
+            driveSettings = dict(driveSettings or {}, **loadModelIDs)
+
+    status = 'Initial'
+    message = ''
+    if scenario.objective is not None:
+        optimization = session.optimize(suffix, {'Objective': scenario.objective,
+                                                 'Method': scenario.method},
+                                        operableOnly=False)
+        status = 'Optimized' if optimization.optimized else 'No optimization'
+        message = optimization.message
+
+    if status == 'No optimization':
+        return pd.DataFrame({'Scenario': [scenario.name], 'Objective': [scenario.objective],
+                             'Method': [scenario.method], 'Status': [status],
+                             'Message': [message]})
+
+    hcResults = None
+    if cacheFolder is not None:
+        hcCache = HCResultCache(cacheFolder)
+        cacheKey = hcCache.makeKey(studyFingerprint(studyFilePath), snapshot.ids, snapshot.types,
+                                   session.statuses, driveSettings, session.feeders)
+        hcResults = hcCache.get(cacheKey)
+
+    cached = hcResults is not None
+    if not cached:
+        applyDriveSettings(session.DRIVE, driveSettings)
+        hcResults = session.evaluate('Initial' if status == 'Initial' else suffix).hcResults.copy()
+        if cacheFolder is not None:
+            hcCache.put(cacheKey, hcResults)
+
+    hcResults.insert(0, 'Scenario', scenario.name)
+    hcResults.insert(1, 'Objective', scenario.objective)
+    hcResults.insert(2, 'Method', scenario.method)
+    hcResults.insert(3, 'Status', status)
+    hcResults.insert(4, 'Message', message)
+    hcResults['Cached'] = cached
+    if isinstance(driveSettings, ParameterProfile):
+        hcResults['DRIVE Profile'] = driveSettings.name
+        hcResults['DRIVE Profile Hash'] = driveSettings.hash
+    return hcResults
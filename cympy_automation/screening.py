@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Load Flow Screening             ###
+
+
+# SetSwitchesRunDrive_Script.py ran cympy.sim.LoadFlow() and discarded the
+#   result.  A load flow takes seconds where a DRIVE run takes minutes, so
+#   LoadFlowScreen uses it to reject switching configurations that already
+#   violate the planning limits before DRIVE is run on them:
+#       - run() runs the load flow on the configuration in the study
+#       - the minimum and maximum voltage (pu) of the monitored nodes are read
+#           with cympy.study.QueryInfoNode, and the loading (%) of the closed
+#           switching devices with cympy.study.QueryInfoDevice
+#       - the configuration passes if no energized node is outside
+#           [minVoltage, maxVoltage] and no device is above maxLoading
+#   The screen counts the configurations it rejected, i.e. the DRIVE runs
+#   avoided, and runSweepDrive (see sweep.py) only runs DRIVE on the
+#   configurations that pass
+#
+# Example:
+#   loadFlowScreen = LoadFlowScreen(switchingSnapshot, topology.nodeIDs, cympyLib=cympy)
+#   screenResult = loadFlowScreen.run()
+#   print(screenResult.report())
+#
+# Notes:
+#   The result keywords (VOLTAGE_KEYWORDS, LOADING_KEYWORD) are those listed in
+#       the CymPy keyword documentation for load flow results; pass others if
+#       your CYME version names them differently
+#   Nodes with a voltage of 0 are de-energized and are not checked; islanding
+#       is caught by the radiality check (see topology.py)
+#   Monitoring fewer nodes (e.g. the feeder ends) makes each screen faster
+
+
+import collections
+import time
+
+import numpy as np
+
+from .backend import getCympy
+
+
+VOLTAGE_KEYWORDS = ('VpuMin', 'VpuMax')
+LOADING_KEYWORD = 'LoadingMax'
+
+ScreeningLimits = collections.namedtuple('ScreeningLimits',
+                                         ['minVoltage', 'maxVoltage', 'maxLoading'])
+ScreeningLimits.__doc__ = 'Voltage limits (pu) and loading limit (%) a configuration must meet.'
+
+DEFAULT_LIMITS = ScreeningLimits(0.95, 1.05, 100.0)
+
+
+def _toFloat(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ScreeningResult:
+    """Load flow extremes and violations of one configuration."""
+
+    def __init__(self, limits, minVoltage, maxVoltage, loading, nodeIDs, deviceIDs, elapsed):
+        self.limits = limits
+        self.minVoltage = minVoltage
+        self.maxVoltage = maxVoltage
+        self.loading = loading
+        self.nodeIDs = nodeIDs
+        self.deviceIDs = deviceIDs
+        self.elapsed = elapsed
+
+    @property
+    def undervoltageNodes(self):
+        energized = self.minVoltage > 0
+        return list(self.nodeIDs[energized & (self.minVoltage < self.limits.minVoltage)])
+
+    @property
+    def overvoltageNodes(self):
+        return list(self.nodeIDs[self.maxVoltage > self.limits.maxVoltage])
+
+    @property
+    def overloadedDevices(self):
+        return list(self.deviceIDs[self.loading > self.limits.maxLoading])
+
+    @property
+    def violations(self):
+        return (len(self.undervoltageNodes) + len(self.overvoltageNodes)
+                + len(self.overloadedDevices))
+
+    @property
+    def passed(self):
+        return self.violations == 0
+
+    def report(self):
+        lowest = np.nanmin(self.minVoltage[self.minVoltage > 0], initial=np.inf)
+        highest = np.nanmax(self.maxVoltage, initial=-np.inf)
+        lines = ['Load flow screening ' + ('passed' if self.passed else 'failed') + ' in '
+                 + format(self.elapsed, '.3f') + ' s',
+                 '    Voltage range (pu): ' + format(lowest, '.4f') + ' - ' + format(highest, '.4f'),
+                 '    Maximum loading (%): ' + format(np.nanmax(self.loading, initial=0.0), '.1f')]
+        for label, items in (('Undervoltage nodes', self.undervoltageNodes),
+                             ('Overvoltage nodes', self.overvoltageNodes),
+                             ('Overloaded devices', self.overloadedDevices)):
+            if len(items) != 0:
+                lines.append('    ' + label + ': ' + str(len(items)))
+        return '\n'.join(lines)
+
+
+class LoadFlowScreen:
+    """Runs a load flow and checks the configuration in the study against limits."""
+
+    def __init__(self, snapshot, nodeIDs=None, limits=DEFAULT_LIMITS, cympyLib=None,
+                 voltageKeywords=VOLTAGE_KEYWORDS, loadingKeyword=LOADING_KEYWORD):
+        self.snapshot = snapshot
+        self.nodeIDs = None if nodeIDs is None else np.asarray(nodeIDs, dtype=object)
+        self.limits = limits
+        self.voltageKeywords = voltageKeywords
+        self.loadingKeyword = loadingKeyword
+        self._cympyLib = cympyLib
+        self.screened = 0
+        self.passed = 0
+        self.elapsed = 0.0
+
+    @property
+    def rejected(self):
+        """Number of configurations that failed, i.e. DRIVE runs avoided."""
+        return self.screened - self.passed
+
+    def _monitoredNodes(self, cympyLib):
+        if self.nodeIDs is None:
+            # All nodes of the study, read from the sections the first time
+            nodeIDs = {}
+            for section in cympyLib.study.ListSections():
+                nodeIDs[section.GetValue('FromNodeID')] = None
+                nodeIDs[section.GetValue('ToNodeID')] = None
+            self.nodeIDs = np.array(list(nodeIDs), dtype=object)
+        return self.nodeIDs
+
+    def run(self, isOpen=None):
+        """
+        Run the load flow on the current configuration and return its ScreeningResult.
+
+        isOpen is the open state of every snapshot device in the study, if it
+        differs from the snapshot (e.g. SweepCandidate.isOpen); the loading is
+        read for the closed devices.
+        """
+        startTime = time.perf_counter()
+        cympyLib = getCympy(self._cympyLib)
+        nodeIDs = self._monitoredNodes(cympyLib)
+        cympyLib.sim.LoadFlow().Run()
+
+        study = cympyLib.study
+        minKeyword, maxKeyword = self.voltageKeywords
+        minVoltage = np.array([_toFloat(study.QueryInfoNode(minKeyword, nodeID))
+                               for nodeID in nodeIDs], dtype=float)
+        maxVoltage = np.array([_toFloat(study.QueryInfoNode(maxKeyword, nodeID))
+                               for nodeID in nodeIDs], dtype=float)
+
+        snapshot = self.snapshot
+        enumValues = [getattr(cympyLib.enums.DeviceType, typeName)
+                      for typeName in snapshot.typeNames]
+        isClosed = snapshot.isClosed if isOpen is None else ~np.asarray(isOpen, dtype=bool)
+        loading = np.zeros(len(snapshot), dtype=float)
+        for position in np.flatnonzero(isClosed):
+            loading[position] = _toFloat(study.QueryInfoDevice(
+                self.loadingKeyword, snapshot.ids[position],
+                enumValues[snapshot.typeCodes[position]]))
+
+        elapsed = time.perf_counter() - startTime
+        result = ScreeningResult(self.limits, minVoltage, maxVoltage, loading, nodeIDs,
+                                 snapshot.ids, elapsed)
+        self.screened += 1
+        self.passed += int(result.passed)
+        self.elapsed += elapsed
+        return result
+
+    def report(self):
+        return ('Load flow screening: ' + str(self.screened) + ' configurations screened, '
+                + str(self.passed) + ' passed, ' + str(self.rejected)
+                + ' rejected (DRIVE runs avoided) in ' + format(self.elapsed, '.3f') + ' s')
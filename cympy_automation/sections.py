@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Section Phase Cache             ###
+
+
+# To close a switching device the scripts need the phase of the section it is
+#   on, e.g. ClosedPhase = 'ABC' for a three phase section.  Originally this
+#   meant a cympy.study.GetSection(...) and a GetValue('Phase') call every time
+#   a device was closed.  Section phases do not change between switching
+#   configurations, so SectionPhaseCache reads them once, right after the study
+#   is opened, and keeps them until the study is opened again
+#
+# Example:
+#   phaseCache = SectionPhaseCache(cympy)
+#   phaseCache.populate(switchingSnapshot.sectionIDs)
+#   device.SetValue(phaseCache.get(device.SectionID), 'ClosedPhase')
+
+
+import time
+
+from .backend import getCympy
+
+
+class SectionPhaseCache:
+    """Phase of each section, keyed by SectionID."""
+
+    def __init__(self, cympyLib=None):
+        self._cympyLib = cympyLib
+        self._phases = {}
+        self.studyPath = None
+        self.lookups = 0
+        self.hits = 0
+        self.populateTime = 0.0
+
+    def __len__(self):
+        return len(self._phases)
+
+    def __contains__(self, sectionID):
+        return sectionID in self._phases
+
+    def _lookup(self, sectionID):
+        cympyLib = getCympy(self._cympyLib)
+        self.lookups += 1
+        return cympyLib.study.GetSection(sectionID).GetValue('Phase')
+
+    def populate(self, sectionIDs):
+        """Read the phase of every section not already cached."""
+        startTime = time.perf_counter()
+        for sectionID in set(sectionIDs):
+            if sectionID not in self._phases:
+                self._phases[sectionID] = self._lookup(sectionID)
+        self.populateTime += time.perf_counter() - startTime
+
+    def get(self, sectionID):
+        """Phase of the section; only reads from the study on a cache miss."""
+        phase = self._phases.get(sectionID)
+        if phase is None:
+            phase = self._lookup(sectionID)
+            self._phases[sectionID] = phase
+        else:
+            self.hits += 1
+        return phase
+
+    def invalidate(self, studyPath=None):
+        """Forget all phases, e.g. because a (different) study was opened."""
+        self._phases.clear()
+        self.studyPath = studyPath
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Switching Device Snapshot             ###
+
+
+# The scripts originally walked switchList, breakerList and recloserList in
+#   three separate loops, calling GetValue('DeviceNumber') and
+#   GetValue('ClosedPhase') on every device.  takeSnapshot() replaces those
+#   loops with a single pass over all switching device types:
+#       - one ListDevices call per device type
+#       - DeviceNumber and SectionID are read from the device object
+#           attributes, which does not require a GetValue round-trip
+#       - one GetValue('ClosedPhase') per device
+#
+# The results are stored column by column in NumPy arrays (IDs, type codes,
+#   section IDs, closed phases) in the same Switch -> Breaker -> Recloser order
+#   the scripts used, so the CSV outputs keep their original layout
+
+# Notes:
+#   GetValue('ClosedPhase') returns 'None' if the device is open and
+#       'ABC', 'A', 'B', 'C', 'AB', 'AC', 'BC' if closed.  The snapshot keeps
+#       the phase string and converts it to Open/Close only when asked
+#
+# DeviceIndex (snapshot.index) is a hash index from (device ID, device type) to
+#   the position of the device in the snapshot.  It is built once and replaces
+#   the np.where(np.array(switchIDs) == currID) scans and per-row
+#   set(switchIDs) rebuilds that made applying a CSV O(N*M)
+
+
+import collections
+import time
+
+import numpy as np
+import pandas as pd
+
+from .backend import getCympy
+
+
+# Device types included by default, in the order the scripts list them
+SWITCHING_DEVICE_TYPES = ('Switch', 'Breaker', 'Recloser')
+
+
+def phaseToStatus(closedPhase):
+    """Convert a ClosedPhase value ('None', 'ABC', ...) to 'Open' or 'Close'."""
+    if closedPhase == 'None':
+        return 'Open'
+    return 'Close'
+
+
+# One entry of the DeviceIndex:
+#   typeName     - device type name, e.g. 'Switch'
+#   position     - position of the device in the snapshot columns
+#   listPosition - position within the devices of the same type (i.e. in switchList)
+#   device       - the cympy device object
+DeviceEntry = collections.namedtuple('DeviceEntry',
+                                     ['typeName', 'position', 'listPosition', 'device'])
+
+
+class DeviceIndex:
+    """
+    Constant time lookup of switching devices by (ID, type).
+
+    IDs are compared as strings, so IDs that pandas parsed as numbers from a
+    CSV still match the DeviceNumber strings returned by cympy.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.typeNames = snapshot.typeNames
+        self._positions = {}
+        self._listPositions = {}
+        typeCounts = [0] * len(self.typeNames)
+        for position, (deviceID, typeCode) in enumerate(zip(snapshot.ids, snapshot.typeCodes)):
+            key = (str(deviceID), self.typeNames[typeCode])
+            self._positions[key] = position
+            self._listPositions[key] = typeCounts[typeCode]
+            typeCounts[typeCode] += 1
+
+    def __len__(self):
+        return len(self._positions)
+
+    def contains(self, deviceID, typeName):
+        return (str(deviceID), typeName) in self._positions
+
+    def position(self, deviceID, typeName):
+        """Position of the device in the snapshot, or None if it is not in the study."""
+        return self._positions.get((str(deviceID), typeName))
+
+    def entry(self, deviceID, typeName):
+        """DeviceEntry for the device, or None if it is not in the study."""
+        key = (str(deviceID), typeName)
+        position = self._positions.get(key)
+        if position is None:
+            return None
+        return DeviceEntry(typeName, position, self._listPositions[key],
+                           self.snapshot.devices[position])
+
+    def validate(self, deviceIDs, typeNames):
+        """
+        Match rows of a switching device CSV against the study.
+
+        Returns (positions, missingDevices, unknownTypes) where positions has
+        one entry per row: the snapshot position, or -1 for rows that were
+        excluded because the type is unknown or the ID is not in the study.
+        """
+        positions = np.full(len(deviceIDs), -1, dtype=np.int64)
+        missingDevices = []
+        unknownTypes = []
+        for rowCtr, (deviceID, typeName) in enumerate(zip(deviceIDs, typeNames)):
+            if typeName not in self.typeNames:
+                unknownTypes.append(deviceID)
+                continue
+            position = self._positions.get((str(deviceID), typeName))
+            if position is None:
+                missingDevices.append(deviceID)
+            else:
+                positions[rowCtr] = position
+        return positions, missingDevices, unknownTypes
+
+
+class SwitchingDeviceSnapshot:
+    """
+    Column-oriented table of switching devices captured in one pass.
+
+    ids, sectionIDs and closedPhases are object arrays, typeCodes is an int8
+    array indexing into typeNames.  devices holds the cympy device objects in
+    the same order.
+    """
+
+    def __init__(self, typeNames, devices, ids, typeCodes, sectionIDs, closedPhases,
+                 timings=None, callCounts=None):
+        self.typeNames = tuple(typeNames)
+        self.devices = list(devices)
+        self.ids = ids
+        self.typeCodes = typeCodes
+        self.sectionIDs = sectionIDs
+        self.closedPhases = closedPhases
+        self.timings = dict(timings or {})
+        self.callCounts = dict(callCounts or {})
+        self._index = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def types(self):
+        """Device type name of every device."""
+        return np.array(self.typeNames, dtype=object)[self.typeCodes]
+
+    @property
+    def isClosed(self):
+        """Boolean array, True where the device is closed on any phase."""
+        return self.closedPhases != 'None'
+
+    @property
+    def statuses(self):
+        """'Open'/'Close' of every device, as written to the CSV files."""
+        return self.statusOf(~self.isClosed)
+
+    def statusOf(self, isOpen):
+        """'Open'/'Close' of every device in the configuration isOpen, as in statuses."""
+        return np.where(isOpen, 'Open', 'Close').astype(object)
+
+    @property
+    def index(self):
+        """DeviceIndex of this snapshot, built on first use."""
+        if self._index is None:
+            self._index = DeviceIndex(self)
+        return self._index
+
+    def typeMask(self, typeName):
+        """Boolean array selecting the devices of one type."""
+        if typeName not in self.typeNames:
+            return np.zeros(len(self), dtype=bool)
+        return self.typeCodes == self.typeNames.index(typeName)
+
+    def listDevices(self, typeName):
+        """cympy device objects of one type, like cympy.study.ListDevices."""
+        return [self.devices[ii] for ii in np.flatnonzero(self.typeMask(typeName))]
+
+    def listIDs(self, typeName):
+        """Device IDs of one type, in study order."""
+        return list(self.ids[self.typeMask(typeName)])
+
+    def toDataFrame(self):
+        """DataFrame with the 'Switch ID', 'Status' and 'Type' CSV columns."""
+        df = pd.DataFrame()
+        df['Switch ID'] = self.ids
+        df['Status'] = self.statuses
+        df['Type'] = self.types
+        return df
+
+    def timingReport(self):
+        """Printable summary of how long the snapshot took and how many calls it made."""
+        lines = ['Switching device snapshot: ' + str(len(self)) + ' devices']
+        for typeName in self.typeNames:
+            lines.append('    ' + typeName + ': ' + str(int(self.typeMask(typeName).sum())))
+        for stage, seconds in self.timings.items():
+            lines.append('    ' + stage + ': ' + format(seconds, '.3f') + ' s')
+        for call, count in self.callCounts.items():
+            lines.append('    ' + call + ' calls: ' + str(count))
+        return '\n'.join(lines)
+
+
+def takeSnapshot(cympyLib=None, includeFuses=False, deviceTypes=None):
+    """
+    Read ID, type, section ID and closed phase of all switching devices.
+
+    deviceTypes overrides the default Switch/Breaker/Recloser list (names of
+    cympy.enums.DeviceType members); includeFuses appends 'Fuse' to it.
+    """
+    cympyLib = getCympy(cympyLib)
+    if deviceTypes is None:
+        deviceTypes = SWITCHING_DEVICE_TYPES
+    deviceTypes = tuple(deviceTypes)
+    if includeFuses and 'Fuse' not in deviceTypes:
+        deviceTypes = deviceTypes + ('Fuse',)
+
+    startTime = time.perf_counter()
+    deviceLists = [cympyLib.study.ListDevices(getattr(cympyLib.enums.DeviceType, typeName))
+                   for typeName in deviceTypes]
+    listTime = time.perf_counter()
+
+    nDevices = sum(len(deviceList) for deviceList in deviceLists)
+    devices = []
+    ids = np.empty(nDevices, dtype=object)
+    typeCodes = np.empty(nDevices, dtype=np.int8)
+    sectionIDs = np.empty(nDevices, dtype=object)
+    closedPhases = np.empty(nDevices, dtype=object)
+    deviceCtr = 0
+    for typeCode, deviceList in enumerate(deviceLists):
+        for device in deviceList:
+            ids[deviceCtr] = device.DeviceNumber
+            typeCodes[deviceCtr] = typeCode
+            sectionIDs[deviceCtr] = device.SectionID
+            closedPhases[deviceCtr] = device.GetValue('ClosedPhase')
+            devices.append(device)
+            deviceCtr += 1
+    readTime = time.perf_counter()
+
+    timings = {'ListDevices': listTime - startTime,
+               'Read states': readTime - listTime}
+    callCounts = {'ListDevices': len(deviceTypes),
+                  'GetValue': nDevices}
+    return SwitchingDeviceSnapshot(deviceTypes, devices, ids, typeCodes, sectionIDs,
+                                   closedPhases, timings, callCounts)
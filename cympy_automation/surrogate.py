@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Surrogate Hosting Capacity Model             ###
+
+
+# A switch sweep (see sweep.py) can produce far more radial candidates than
+#   there is time to run EPRI DRIVE on.  HCSurrogate estimates the HC of every
+#   feeder of a configuration from cheap features of the feeder in that
+#   configuration, so only the most promising candidates are sent to DRIVE:
+#       - the features come from NetworkTopology.feederSummary (see
+#           topology.py): number of nodes, load, DER already connected, the
+#           total length of the feeder's sections, and the maximum and mean
+#           distance from the source along the sections
+#       - the model is a ridge regression of the distributed and centralized
+#           HC on those features plus one constant per feeder, fitted to the
+#           results of earlier DRIVE runs
+#       - rankCandidates() scores the candidates one at a time as they are
+#           generated and only keeps the topK with the highest mean predicted HC
+#
+# The training data are the results saved by the scripts: each
+#   HCReport_<name> report is paired with the SwitchDevicesAfter_<name>.csv
+#   switch states saved next to it (HCReport_Initial with the switch states of
+#   the topology).  loadSavedResults() reads them without CYME, so the model can
+#   be trained and checked offline, e.g. with meanAbsoluteError() on results
+#   that were left out of the training
+#
+# Example:
+#   surrogate = trainSurrogate(saveResultsFolder, topology)
+#   topCandidates = rankCandidates(sweep.candidates(), surrogate, topK=10)
+#   for hcResults in runSweepDrive(topCandidates, ...):
+#
+# Notes:
+#   The estimates are only as good as the configurations the model has seen;
+#       the DRIVE results of the top candidates are the ground truth and can
+#       be added with addResults() before the next sweep
+#   The DER feature is 0 unless the topology was extracted with derDeviceType
+#       (see cachedTopology in SwitchSweep_ExampleScript.py)
+
+
+import glob
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+
+from .hcreport import loadHCReport
+
+
+FEATURE_COLUMNS = ('Nodes', 'Load', 'DER', 'Length', 'MaxDistance', 'MeanDistance')
+TARGET_COLUMNS = ('Distributed', 'Centralized')
+
+
+class HCSurrogate:
+    """Ridge regression of per-feeder HC on the feeder summary of a configuration."""
+
+    def __init__(self, topology, ridge=0.1, featureColumns=FEATURE_COLUMNS):
+        self.topology = topology
+        self.ridge = ridge
+        self.featureColumns = list(featureColumns)
+        self.feeders = list(topology.sourceFeeders())
+        self._rows = []
+        self.coefficients = None
+        self._mean = None
+        self._scale = None
+
+    @property
+    def nObservations(self):
+        """Number of (configuration, feeder) HC results added."""
+        return len(self._rows)
+
+    def addResults(self, isOpen, hcResults):
+        """Add the per-feeder HC of a configuration (a loadHCReport table)."""
+        summary = self.topology.feederSummary(isOpen)
+        hcResults = hcResults.dropna(subset=['Feeder'] + list(TARGET_COLUMNS))
+        merged = summary.merge(hcResults[['Feeder'] + list(TARGET_COLUMNS)], on='Feeder')
+        self._rows.extend(merged.to_dict('records'))
+
+    def _design(self, summary):
+        features = (summary[self.featureColumns].to_numpy(dtype=float) - self._mean) / self._scale
+        feederColumns = (summary['Feeder'].to_numpy()[:, None]
+                         == np.array(self.feeders, dtype=object)[None, :]).astype(float)
+        return np.hstack([np.ones((len(summary), 1)), feederColumns, features])
+
+    def fit(self):
+        """Fit the model to all results added so far."""
+        if self.nObservations == 0:
+            raise ValueError('No HC results have been added to the surrogate model')
+        data = pd.DataFrame(self._rows)
+        features = data[self.featureColumns].to_numpy(dtype=float)
+        self._mean = features.mean(axis=0)
+        self._scale = features.std(axis=0)
+        self._scale[self._scale == 0] = 1.0
+        design = self._design(data)
+        penalty = self.ridge * np.eye(design.shape[1])
+        penalty[0, 0] = 0.0
+        self.coefficients = np.linalg.solve(design.T @ design + penalty,
+                                            design.T @ data[list(TARGET_COLUMNS)].to_numpy(dtype=float))
+        return self
+
+    def predict(self, isOpen=None):
+        """Estimated 'Distributed' and 'Centralized' HC of every feeder of a configuration."""
+        if self.coefficients is None:
+            self.fit()
+        summary = self.topology.feederSummary(isOpen)
+        estimates = self._design(summary) @ self.coefficients
+        predictions = pd.DataFrame({'Feeder': summary['Feeder']})
+        for columnCtr, column in enumerate(TARGET_COLUMNS):
+            predictions[column] = estimates[:, columnCtr]
+        return predictions
+
+    def score(self, isOpen=None, column='Distributed'):
+        """Mean estimated HC over the feeders, used to rank configurations."""
+        return float(self.predict(isOpen)[column].mean())
+
+    def meanAbsoluteError(self, isOpen, hcResults):
+        """Mean absolute error of the estimates against DRIVE results, per HC column."""
+        merged = self.predict(isOpen).merge(hcResults, on='Feeder', suffixes=('', ' DRIVE'))
+        return {column: float(np.mean(np.abs(merged[column] - merged[column + ' DRIVE'])))
+                for column in TARGET_COLUMNS}
+
+
+def _readSwitchStates(filePath, topology):
+    """Open state of the topology devices from a switching device CSV."""
+    df = pd.read_csv(filePath, dtype={'Switch ID': str})
+    positions = {key: position for position, key
+                 in enumerate(zip(topology.deviceIDs, topology.deviceTypes))}
+    isOpen = topology.isOpen.copy()
+    for deviceID, status, typeName in zip(df['Switch ID'], df['Status'], df['Type']):
+        position = positions.get((str(deviceID), str(typeName)))
+        if position is not None:
+            isOpen[position] = status in ('Open', 'None')
+    return isOpen
+
+
+def loadSavedResults(resultsFolder, topology):
+    """
+    Saved (name, isOpen, hcResults) of every HC report in resultsFolder.
+
+    HCReport_Initial is paired with the switch states of topology and every
+    other HCReport_<name> with SwitchDevicesAfter_<name>.csv; reports without
+    switch states are skipped.
+    """
+    feeders = list(topology.sourceFeeders())
+    results = []
+    for reportPath in sorted(glob.glob(os.path.join(resultsFolder, 'HCReport_*'))):
+        name, extension = os.path.splitext(os.path.basename(reportPath)[len('HCReport_'):])
+        if extension.lower() not in ('.csv', '.txt', '.xlsx', '.xlsm'):
+            continue
+        if name == 'Initial':
+            isOpen = topology.isOpen
+        else:
+            statesPath = os.path.join(resultsFolder, 'SwitchDevicesAfter_' + name + '.csv')
+            if not os.path.isfile(statesPath):
+                continue
+            isOpen = _readSwitchStates(statesPath, topology)
+        results.append((name, isOpen, loadHCReport(reportPath, feeders)))
+    return results
+
+
+def trainSurrogate(resultsFolder, topology, ridge=0.1):
+    """HCSurrogate fitted to the results saved in resultsFolder (unfitted if there are none)."""
+    surrogate = HCSurrogate(topology, ridge)
+    for _, isOpen, hcResults in loadSavedResults(resultsFolder, topology):
+        surrogate.addResults(isOpen, hcResults)
+    if surrogate.nObservations != 0:
+        surrogate.fit()
+    return surrogate
+
+
+def rankCandidates(candidates, surrogate, topK, column='Distributed'):
+    """
+    The topK candidates with the highest mean estimated HC, best first.
+
+    The candidates are scored as they are generated and only the topK best
+    so far are kept; of candidates with the same score the first is kept.
+    """
+    best = []
+    if topK <= 0:
+        return best
+    for candidateCtr, candidate in enumerate(candidates):
+        entry = (surrogate.score(candidate.isOpen, column), -candidateCtr, candidate)
+        if len(best) < topK:
+            heapq.heappush(best, entry)
+        elif entry[:2] > best[0][:2]:
+            heapq.heapreplace(best, entry)
+    return [candidate for _, _, candidate in sorted(best, key=lambda entry: entry[:2],
+                                                    reverse=True)]
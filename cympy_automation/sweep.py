@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Switch Configuration Sweep             ###
+
+
+# NCO only returns the configuration its heuristic settles on, and
+#   SetSwitchesRunDrive_Script.py analyzes one hand-written CSV.  SwitchSweep
+#   enumerates candidate switching configurations instead: every combination
+#   of up to maxSwaps tie swaps, where a tie swap closes an open operable
+#   device and opens a closed one
+#
+# Closing a tie forms one loop: the sections from both ends of the tie up to
+#   where their paths to the sources meet (through the sources, if the tie
+#   joins two feeders).  Only opening a device on that loop gives a radial
+#   configuration, so each tie is only paired with the closed operable
+#   devices on its loop path, found by walking the NetworkTopology (see
+#   topology.py) from the two ends of the tie.  For several swaps the ties
+#   are closed in turn, each paired with the devices on its loop in the
+#   configuration left by the swaps before it
+#
+# Every candidate is still checked by RadialityChecker, without any CYME call:
+#       - build() takes the sections and sources from a NetworkTopology
+#           (see topology.py), extracted from the study if not given
+#       - the sections without switching devices never change, so they are
+#           merged into connected components (union-find) up front, with all
+#           source nodes joined into one root
+#       - check() only has to join those components through the closed
+#           switching device sections, so each candidate costs about one step
+#           per switching device
+#   A candidate is radial if no loop is formed and no more nodes are cut off
+#   from the sources than in the study as opened
+#
+# runSweepDrive() streams the surviving candidates to EPRI DRIVE one at a
+#   time: it writes only the devices of the candidate, runs DRIVE on the
+#   feeders they affect (see impact.py), and sets them back before the next
+#   candidate.  Given a LoadFlowScreen (see screening.py), it first runs a load
+#   flow and skips DRIVE for candidates with voltage or loading violations
+#
+# Example:
+#   checker = RadialityChecker(cympy)
+#   checker.build(switchingSnapshot)
+#   sweep = SwitchSweep(switchingSnapshot, checker, maxSwaps=1)
+#   for hcResults in runSweepDrive(sweep.candidates(), switchingSnapshot, DRIVE, feeders,
+#                                  hcResults1, saveResultsFolder, impactMap, sectionPhaseCache):
+#       ...
+#   print(sweep.report())
+#
+# Notes:
+#   Source nodes are taken to be the nodes that are never the to-node of a
+#       section, which holds for feeders drawn from their source.  Pass
+#       sourceNodes to RadialityChecker if that is not the case
+#   The number of candidates grows quickly with maxSwaps; limit the devices
+#       with operable (e.g. operableMask from readback.py) or maxCandidates
+#   A tie with an end that is not energized in the configuration forms no
+#       loop and is not used
+
+
+import collections
+import os
+import time
+
+import numpy as np
+
+from .backend import getCympy
+from .hccache import switchStateVector
+from .impact import rerunChangedFeeders
+from .journal import scenarioKey
+from .topology import RadialityResult, extractTopology
+
+
+SweepCandidate = collections.namedtuple('SweepCandidate', ['name', 'closePositions',
+                                                           'openPositions', 'isOpen'])
+SweepCandidate.__doc__ = 'Switching configuration: devices to close and open, and the open state of all.'
+
+
+def _find(parent, node):
+    root = node
+    while parent[root] != root:
+        root = parent[root]
+    while parent[node] != root:
+        parent[node], node = root, parent[node]
+    return root
+
+
+class RadialityChecker:
+    """Loop and islanding check of switching configurations of a snapshot."""
+
+    def __init__(self, cympyLib=None, sourceNodes=None):
+        self._cympyLib = cympyLib
+        self.sourceNodes = sourceNodes
+        self.baseLoops = 0
+        self.buildTime = 0.0
+        self._edgeFrom = np.zeros(0, dtype=np.int64)
+        self._edgeTo = np.zeros(0, dtype=np.int64)
+        self._edgeOfDevice = np.zeros(0, dtype=np.int64)
+        self._componentSizes = np.zeros(0, dtype=np.int64)
+        self._rootComponent = 0
+        self.topology = None
+
+    def build(self, snapshot, topology=None):
+        """
+        Merge the sections without switching devices into components.
+
+        topology is a NetworkTopology of the study (see topology.py); it is
+        extracted from the open study if not given.
+        """
+        startTime = time.perf_counter()
+        if topology is None:
+            topology = extractTopology(snapshot, self._cympyLib, sourceNodes=self.sourceNodes,
+                                       loadDeviceType=None)
+        self.topology = topology
+
+        # Node nNodes is the common root of all sources
+        rootNode = topology.nNodes
+        parent = list(range(rootNode + 1))
+        for node in topology.sourceNodes:
+            parent[_find(parent, int(node))] = _find(parent, rootNode)
+        switched = np.zeros(topology.nSections, dtype=bool)
+        switched[topology.deviceSections[topology.deviceSections >= 0]] = True
+        self.baseLoops = 0
+        for section in np.flatnonzero(~switched):
+            fromRoot = _find(parent, int(topology.sectionFrom[section]))
+            toRoot = _find(parent, int(topology.sectionTo[section]))
+            if fromRoot == toRoot:
+                self.baseLoops += 1
+            else:
+                parent[fromRoot] = toRoot
+
+        roots = np.array([_find(parent, node) for node in range(rootNode + 1)], dtype=np.int64)
+        uniqueRoots, components = np.unique(roots, return_inverse=True)
+        self._componentSizes = np.bincount(components[:rootNode], minlength=len(uniqueRoots))
+        self._rootComponent = int(components[rootNode])
+
+        # One edge per section with switching devices, between two components
+        edgeSections = np.flatnonzero(switched)
+        edgeIndex = np.full(topology.nSections, -1, dtype=np.int64)
+        edgeIndex[edgeSections] = np.arange(len(edgeSections))
+        self._edgeFrom = components[topology.sectionFrom[edgeSections]]
+        self._edgeTo = components[topology.sectionTo[edgeSections]]
+        self._edgeOfDevice = np.where(topology.deviceSections >= 0,
+                                      edgeIndex[np.maximum(topology.deviceSections, 0)], -1)
+        self.buildTime = time.perf_counter() - startTime
+
+    @property
+    def nComponents(self):
+        return len(self._componentSizes)
+
+    def check(self, isOpen):
+        """RadialityResult of the configuration with the given open state of every device."""
+        isOpen = np.asarray(isOpen, dtype=bool)
+        known = self._edgeOfDevice >= 0
+        openDevices = np.bincount(self._edgeOfDevice[known], weights=isOpen[known],
+                                  minlength=len(self._edgeFrom))
+        parent = list(range(self.nComponents))
+        loops = self.baseLoops
+        for edgeCtr in np.flatnonzero(openDevices == 0):
+            fromRoot = _find(parent, int(self._edgeFrom[edgeCtr]))
+            toRoot = _find(parent, int(self._edgeTo[edgeCtr]))
+            if fromRoot == toRoot:
+                loops += 1
+            else:
+                parent[fromRoot] = toRoot
+        energizedRoot = _find(parent, self._rootComponent)
+        islanded = np.array([_find(parent, component) != energizedRoot
+                             for component in range(self.nComponents)], dtype=bool)
+        islandedNodes = int(self._componentSizes[islanded].sum())
+        return RadialityResult(loops == 0 and islandedNodes == 0, loops, islandedNodes)
+
+
+class SwitchSweep:
+    """
+    Radial candidate configurations made of up to maxSwaps tie swaps.
+
+    The loop paths are found in topology, by default the NetworkTopology the
+    checker was built from.
+    """
+
+    def __init__(self, snapshot, checker, operable=None, maxSwaps=1, maxCandidates=None,
+                 topology=None):
+        self.snapshot = snapshot
+        self.checker = checker
+        self.topology = topology if topology is not None else checker.topology
+        self._sectionDevices = collections.defaultdict(list)
+        for position, section in enumerate(self.topology.deviceSections.tolist()):
+            if section >= 0:
+                self._sectionDevices[section].append(position)
+        self.operable = (np.ones(len(snapshot), dtype=bool) if operable is None
+                         else np.asarray(operable, dtype=bool))
+        self.maxSwaps = maxSwaps
+        self.maxCandidates = maxCandidates
+        self.baseline = checker.check(~snapshot.isClosed)
+        self.generated = 0
+        self.pruned = 0
+        self.accepted = 0
+        self.elapsed = 0.0
+
+    def _name(self, closePositions, openPositions):
+        ids = self.snapshot.ids
+        return ('close ' + '+'.join(str(ids[position]) for position in closePositions)
+                + ' / open ' + '+'.join(str(ids[position]) for position in openPositions))
+
+    def _loopDevices(self, isOpen):
+        """
+        Function giving, for the position of an open device, the positions of
+        the devices on the loop that closing it would form in configuration isOpen.
+        """
+        topology = self.topology
+        sourceOf, parentSection, order = topology.traverse(isOpen)
+        parentNode = np.full(topology.nNodes, -1, dtype=np.int64)
+        parentNode[order] = topology.parentNodes(parentSection, order)
+        sourceOf = sourceOf.tolist()
+        parentSection = parentSection.tolist()
+        parentNode = parentNode.tolist()
+
+        def pathSections(node):
+            sections = set()
+            while parentSection[node] >= 0:
+                sections.add(parentSection[node])
+                node = parentNode[node]
+            return sections
+
+        def loopDevices(position):
+            section = int(topology.deviceSections[position])
+            if section < 0:
+                return []
+            fromNode = int(topology.sectionFrom[section])
+            toNode = int(topology.sectionTo[section])
+            if sourceOf[fromNode] < 0 or sourceOf[toNode] < 0:
+                return []
+            # The sections above the node where the two paths meet are not on the loop
+            loopSections = pathSections(fromNode) ^ pathSections(toNode)
+            return sorted(devicePosition for loopSection in loopSections
+                          for devicePosition in self._sectionDevices[loopSection])
+        return loopDevices
+
+    def _swaps(self, isOpen, ties, openable, closePositions, openPositions, nSwaps):
+        """Configurations with nSwaps more tie swaps, closing the ties in increasing order."""
+        loopDevices = self._loopDevices(isOpen)
+        for tie in ties:
+            if len(closePositions) != 0 and tie <= closePositions[-1]:
+                continue
+            for position in loopDevices(tie):
+                if not openable[position] or position in openPositions:
+                    continue
+                swappedIsOpen = isOpen.copy()
+                swappedIsOpen[tie] = False
+                swappedIsOpen[position] = True
+                if nSwaps == 1:
+                    yield closePositions + (tie,), openPositions + (position,), swappedIsOpen
+                else:
+                    yield from self._swaps(swappedIsOpen, ties, openable, closePositions + (tie,),
+                                           openPositions + (position,), nSwaps - 1)
+
+    def candidates(self):
+        """Generate the radial candidates, one at a time."""
+        baseIsOpen = ~self.snapshot.isClosed
+        ties = np.flatnonzero(self.operable & baseIsOpen).tolist()
+        openable = (self.operable & ~baseIsOpen).tolist()
+        startTime = time.perf_counter()
+        for nSwaps in range(1, self.maxSwaps + 1):
+            # The same devices can be swapped with the ties paired differently
+            seen = set()
+            for closePositions, openPositions, isOpen in self._swaps(baseIsOpen, ties, openable,
+                                                                     (), (), nSwaps):
+                openPositions = tuple(sorted(openPositions))
+                if (closePositions, openPositions) in seen:
+                    continue
+                seen.add((closePositions, openPositions))
+                self.generated += 1
+                result = self.checker.check(isOpen)
+                if (result.loops > self.baseline.loops
+                        or result.islandedNodes > self.baseline.islandedNodes):
+                    self.pruned += 1
+                    continue
+                self.accepted += 1
+                self.elapsed += time.perf_counter() - startTime
+                yield SweepCandidate(self._name(closePositions, openPositions),
+                                     np.array(closePositions), np.array(openPositions), isOpen)
+                startTime = time.perf_counter()
+                if self.maxCandidates is not None and self.accepted >= self.maxCandidates:
+                    return
+        self.elapsed += time.perf_counter() - startTime
+
+    def report(self):
+        return ('Switch sweep: ' + str(self.generated) + ' configurations generated, '
+                + str(self.pruned) + ' pruned as non-radial or islanding, '
+                + str(self.accepted) + ' radial candidates (' + format(self.elapsed, '.3f')
+                + ' s spent generating and checking)')
+
+
+def runSweepDrive(candidates, snapshot, DRIVE, feeders, baseResults, outputFolder, impactMap,
+                  phaseCache, cympyLib=None, screen=None, journal=None, runKey=None):
+    """
+    Run DRIVE on each candidate configuration and yield its per-feeder HC.
+
+    baseResults is the HC of the configuration in snapshot; only the feeders
+    affected by the devices of a candidate are rerun (impactMap is a built
+    FeederImpactMap).  The devices are set back to their snapshot state after
+    each candidate.  The HC report of candidate n is saved to outputFolder as
+    HCReport_Sweep<n>, with its switch states in SwitchDevicesAfter_Sweep<n>.csv
+    (the names surrogate.loadSavedResults pairs up).
+
+    With a LoadFlowScreen (see screening.py), DRIVE is only run on the
+    candidates that pass the load flow screen; the others are skipped.
+
+    With a RunJournal (see journal.py), every candidate is recorded under the
+    hash of runKey, the screening limits and its switch states, and candidates
+    completed by an earlier run are read back from the journal instead of
+    being run again.  runKey identifies the study and the DRIVE settings,
+    e.g. (studyFingerprint(studyFilePath), driveProfile.hash), so results of
+    another study or profile are not reused.
+    """
+    if journal is not None and runKey is None:
+        raise ValueError('runSweepDrive needs a runKey (study fingerprint and DRIVE profile hash) '
+                         'to use a journal')
+    cympyLib = getCympy(cympyLib)
+    devices = snapshot.devices
+    limits = None if screen is None else list(screen.limits)
+    for candidateCtr, candidate in enumerate(candidates):
+        if journal is not None:
+            candidateKey = scenarioKey(*runKey, 'Sweep', limits, switchStateVector(
+                snapshot.ids, snapshot.types, snapshot.statusOf(candidate.isOpen)))
+            journalEntry = journal.get(candidateKey)
+            if journalEntry is not None:
+                if journalEntry.status == 'done':
+                    hcResults = journalEntry.hcResults
+                    hcResults.insert(0, 'Candidate', candidate.name)
+                    yield hcResults
+                continue
+        positions = np.concatenate([candidate.closePositions, candidate.openPositions])
+        baseClosedPhases = snapshot.closedPhases[positions].copy()
+        for position in candidate.closePositions:
+            devices[position].SetValue(phaseCache.get(snapshot.sectionIDs[position]), 'ClosedPhase')
+        for position in candidate.openPositions:
+            devices[position].SetValue('None', 'ClosedPhase')
+        try:
+            if screen is not None and not screen.run(candidate.isOpen).passed:
+                if journal is not None:
+                    journal.record(candidateKey, candidate.name, status='rejected')
+                continue
+            reportPath = os.path.join(outputFolder, 'HCReport_Sweep' + str(candidateCtr + 1))
+            hcResults = rerunChangedFeeders(DRIVE, feeders, impactMap.feedersOf(positions),
+                                            baseResults, reportPath, cympyLib)
+        finally:
+            for position, closedPhase in zip(positions, baseClosedPhases):
+                devices[position].SetValue(closedPhase, 'ClosedPhase')
+        switchStates = snapshot.toDataFrame()
+        switchStates['Status'] = snapshot.statusOf(candidate.isOpen)
+        statesPath = os.path.join(outputFolder,
+                                  'SwitchDevicesAfter_Sweep' + str(candidateCtr + 1) + '.csv')
+        switchStates.to_csv(statesPath)
+        if journal is not None:
+            journal.record(candidateKey, candidate.name, outputs=[statesPath], hcResults=hcResults)
+        hcResults.insert(0, 'Candidate', candidate.name)
+        yield hcResults
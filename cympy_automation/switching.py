@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Apply Switching Device States             ###
+
+
+# applySwitchStates() sets the switching devices in the study to the states
+#   listed in a switching device CSV (columns 'Switch ID', 'Status', 'Type').
+#
+# Every SetValue(..., 'ClosedPhase') makes CYME update the model, so by default
+#   only devices whose target state differs from the current state are written.
+#   The current state comes from the snapshot, which is kept up to date with
+#   every write, so repeated calls with different CSVs stay correct as long as
+#   the devices are only changed through this function
+#
+# Notes:
+#   'Open' is written as ClosedPhase = 'None'.  Any other status closes the
+#       device on all phases of its section (from the SectionPhaseCache)
+#   If a device appears more than once in the CSV, the last row wins
+
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from .sections import SectionPhaseCache
+
+
+class SwitchApplyResult:
+    """Outcome of applySwitchStates."""
+
+    def __init__(self, positions, targetPhases, changed, missingDevices, unknownTypes,
+                 elapsed):
+        self.positions = positions
+        self.targetPhases = targetPhases
+        self.changed = changed
+        self.missingDevices = missingDevices
+        self.unknownTypes = unknownTypes
+        self.elapsed = elapsed
+
+    @property
+    def writes(self):
+        """Number of SetValue calls that were made."""
+        return int(self.changed.sum())
+
+    @property
+    def writesAvoided(self):
+        """Number of devices skipped because they were already in the target state."""
+        return len(self.changed) - self.writes
+
+    def report(self):
+        lines = ['Applied switching device states in ' + format(self.elapsed, '.3f') + ' s',
+                 '    Devices in CSV matched to the study: ' + str(len(self.positions)),
+                 '    SetValue calls: ' + str(self.writes),
+                 '    Writes avoided (already in target state): ' + str(self.writesAvoided)]
+        if len(self.unknownTypes) != 0:
+            lines.append('    Unknown device types (excluded): ' + str(len(self.unknownTypes)))
+        if len(self.missingDevices) != 0:
+            lines.append('    Device IDs not in the study (excluded): ' + str(len(self.missingDevices)))
+        return '\n'.join(lines)
+
+
+def readSwitchStatesCSV(filePath):
+    """Read a switching device CSV into (IDs, statuses, types) columns."""
+    df = pd.read_csv(filePath, dtype={'Switch ID': str})
+    return df['Switch ID'], df['Status'], df['Type']
+
+
+def applySwitchStates(snapshot, deviceIDs, statuses, typeNames, phaseCache=None,
+                      onlyChanges=True, cympyLib=None):
+    """
+    Set the devices of snapshot to the given 'Open'/'Close' statuses.
+
+    deviceIDs, statuses and typeNames are the columns of a switching device
+    CSV.  With onlyChanges=False every matched device is written, which is
+    what the scripts originally did.  snapshot.closedPhases is updated to the
+    new states.
+    """
+    startTime = time.perf_counter()
+    if phaseCache is None:
+        phaseCache = SectionPhaseCache(cympyLib)
+        phaseCache.populate(snapshot.sectionIDs)
+
+    rowPositions, missingDevices, unknownTypes = snapshot.index.validate(deviceIDs, typeNames)
+
+    # Last row wins for devices that are listed more than once
+    targets = {}
+    for position, status in zip(rowPositions, statuses):
+        if position >= 0:
+            targets[int(position)] = status
+    positions = np.fromiter(targets, dtype=np.int64, count=len(targets))
+
+    targetPhases = np.empty(len(positions), dtype=object)
+    for targetCtr, position in enumerate(positions):
+        if targets[position] == 'Open':
+            targetPhases[targetCtr] = 'None'
+        else:
+            targetPhases[targetCtr] = phaseCache.get(snapshot.sectionIDs[position])
+
+    if onlyChanges:
+        changed = snapshot.closedPhases[positions] != targetPhases
+    else:
+        changed = np.ones(len(positions), dtype=bool)
+
+    for targetCtr in np.flatnonzero(changed):
+        position = positions[targetCtr]
+        snapshot.devices[position].SetValue(targetPhases[targetCtr], 'ClosedPhase')
+        snapshot.closedPhases[position] = targetPhases[targetCtr]
+
+    return SwitchApplyResult(positions, targetPhases, np.asarray(changed, dtype=bool),
+                             missingDevices, unknownTypes, time.perf_counter() - startTime)
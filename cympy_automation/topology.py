@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Network Topology Graph             ###
+
+
+# Questions like "is this switching configuration radial?", "which feeder
+#   feeds this device?" or "how much load is downstream of this switch?" each
+#   needed calls into CYME (GetValue on sections, QueryInfoDevice, ...).
+#   extractTopology() reads the network once and NetworkTopology answers them
+#   with NumPy arrays only, so no CYME session (or license) is needed once the
+#   topology is saved to disk:
+#       - nodes and sections, with the from/to node and network of each section
+#       - the node adjacency in CSR form (indptr/indices, plus the section of
+#           every entry), for O(V+E) traversals
+#       - the switching devices of a snapshot, in snapshot order, with their
+#           section and open state when extracted
+#       - the source (feeder head) nodes
+#       - the length of each section, read with lengthKey
+#       - the loads on each node (number of spot loads, or the sum of a load
+#           value read with loadKey), and likewise the DER already connected
+#           if derDeviceType is given
+#
+# Every query takes the open state of the switching devices (isOpen, e.g.
+#   stateReadback.isOpen or SweepCandidate.isOpen) and defaults to the state
+#   when the topology was extracted
+#
+# save() writes a compressed .npz file (no pickled objects) that records the
+#   study fingerprint and the extractTopology options, and cachedTopology()
+#   only extracts the topology again if the study file or the options have
+#   changed
+#
+# Example:
+#   topology = cachedTopology(saveResultsFolder + r'\topology.npz', studyFilePath,
+#                             switchingSnapshot, cympy)
+#   result = topology.checkRadiality(stateReadback.isOpen)
+#   feederOfDevice = topology.deviceFeeders(stateReadback.isOpen)
+#   loadBelow = topology.downstreamLoad()
+#   feederSizes = topology.feederSummary(candidate.isOpen)
+#
+# Notes:
+#   Source nodes are the nodes that are never the to-node of a section (see
+#       sweep.py); pass sourceNodes to extractTopology to override them
+#   A section whose length cannot be read with lengthKey counts as 1, so with
+#       lengthKey=None the distances are depths in sections
+
+
+import collections
+import inspect
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .backend import getCympy
+from .hccache import studyFingerprint
+
+
+RadialityResult = collections.namedtuple('RadialityResult', ['radial', 'loops', 'islandedNodes'])
+RadialityResult.__doc__ = 'Loops formed and nodes cut off from the sources by a configuration.'
+
+# extractTopology arguments recorded in NetworkTopology.extractOptions
+_EXTRACT_OPTIONS = ('sourceNodes', 'loadDeviceType', 'loadKey', 'derDeviceType', 'derKey',
+                    'lengthKey')
+
+# Arrays written by NetworkTopology.save, in order
+_SAVED_ARRAYS = ('nodeIDs', 'sectionIDs', 'sectionFrom', 'sectionTo', 'sectionNetworks',
+                 'deviceIDs', 'deviceTypes', 'deviceSections', 'isOpen', 'sourceNodes',
+                 'nodeLoads', 'nodeDER', 'sectionLengths')
+
+
+class NetworkTopology:
+    """
+    Sections, switching devices, sources and loads of a study as arrays.
+
+    Node and section references are integer positions into nodeIDs and
+    sectionIDs; a deviceSections entry of -1 means the section of the device
+    was not found.  extractOptions is the JSON text of the extractTopology
+    options the topology was read with.
+    """
+
+    def __init__(self, nodeIDs, sectionIDs, sectionFrom, sectionTo, sectionNetworks, deviceIDs,
+                 deviceTypes, deviceSections, isOpen, sourceNodes, nodeLoads, nodeDER=None,
+                 sectionLengths=None, fingerprint='', extractOptions=''):
+        self.nodeIDs = np.asarray(nodeIDs, dtype=str)
+        self.sectionIDs = np.asarray(sectionIDs, dtype=str)
+        self.sectionFrom = np.asarray(sectionFrom, dtype=np.int64)
+        self.sectionTo = np.asarray(sectionTo, dtype=np.int64)
+        self.sectionNetworks = np.asarray(sectionNetworks, dtype=str)
+        self.deviceIDs = np.asarray(deviceIDs, dtype=str)
+        self.deviceTypes = np.asarray(deviceTypes, dtype=str)
+        self.deviceSections = np.asarray(deviceSections, dtype=np.int64)
+        self.isOpen = np.asarray(isOpen, dtype=bool)
+        self.sourceNodes = np.asarray(sourceNodes, dtype=np.int64)
+        self.nodeLoads = np.asarray(nodeLoads, dtype=float)
+        self.nodeDER = (np.zeros(len(self.nodeIDs)) if nodeDER is None
+                        else np.asarray(nodeDER, dtype=float))
+        self.sectionLengths = (np.ones(len(self.sectionIDs)) if sectionLengths is None
+                               else np.asarray(sectionLengths, dtype=float))
+        self.fingerprint = fingerprint
+        self.extractOptions = extractOptions
+        self.extractTime = 0.0
+        self._buildAdjacency()
+
+    def _buildAdjacency(self):
+        nNodes = len(self.nodeIDs)
+        sectionIndex = np.arange(len(self.sectionIDs), dtype=np.int64)
+        fromNodes = np.concatenate([self.sectionFrom, self.sectionTo])
+        toNodes = np.concatenate([self.sectionTo, self.sectionFrom])
+        order = np.argsort(fromNodes, kind='stable')
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(fromNodes, minlength=nNodes))])
+        self.indices = toNodes[order]
+        self.entrySections = np.concatenate([sectionIndex, sectionIndex])[order]
+
+    @property
+    def nNodes(self):
+        return len(self.nodeIDs)
+
+    @property
+    def nSections(self):
+        return len(self.sectionIDs)
+
+    def closedSections(self, isOpen=None):
+        """Boolean array, True for the sections with no open switching device."""
+        isOpen = self.isOpen if isOpen is None else np.asarray(isOpen, dtype=bool)
+        known = self.deviceSections >= 0
+        openDevices = np.bincount(self.deviceSections[known], weights=isOpen[known],
+                                  minlength=self.nSections)
+        return openDevices == 0
+
+    def traverse(self, isOpen=None):
+        """
+        Walk the closed sections breadth first from all sources at once.
+
+        Returns (sourceOf, parentSection, order): the position in sourceNodes
+        of the source feeding each node (-1 if it is not energized), the
+        section each node is fed through (-1 for sources and de-energized
+        nodes) and the energized nodes in the order they were reached.
+        """
+        # Plain lists are much faster than NumPy arrays for element-wise access
+        closed = self.closedSections(isOpen).tolist()
+        sourceOf = [-1] * self.nNodes
+        parentSection = [-1] * self.nNodes
+        order = []
+        queue = collections.deque()
+        for sourceCtr, node in enumerate(self.sourceNodes.tolist()):
+            if sourceOf[node] < 0:
+                sourceOf[node] = sourceCtr
+                queue.append(node)
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        entrySections = self.entrySections.tolist()
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for entryCtr in range(indptr[node], indptr[node + 1]):
+                neighbour = indices[entryCtr]
+                section = entrySections[entryCtr]
+                if sourceOf[neighbour] < 0 and closed[section]:
+                    sourceOf[neighbour] = sourceOf[node]
+                    parentSection[neighbour] = section
+                    queue.append(neighbour)
+        return (np.array(sourceOf, dtype=np.int64), np.array(parentSection, dtype=np.int64),
+                np.array(order, dtype=np.int64))
+
+    def checkRadiality(self, isOpen=None):
+        """RadialityResult of a configuration, in O(V+E)."""
+        closed = self.closedSections(isOpen)
+        sourceOf, _, _ = self.traverse(isOpen)
+        energized = sourceOf >= 0
+        islandedNodes = int((~energized).sum())
+        # A radial network has one closed section per energized node that is
+        #   not a source; de-energized parts are counted separately below
+        energizedSections = closed & energized[self.sectionFrom] & energized[self.sectionTo]
+        loops = int(energizedSections.sum()) - (int(energized.sum()) - len(self.sourceNodes))
+        if islandedNodes != 0:
+            loops += self._islandLoops(closed & ~energized[self.sectionFrom], ~energized)
+        return RadialityResult(loops == 0 and islandedNodes == 0, loops, islandedNodes)
+
+    def _islandLoops(self, islandSections, islandNodes):
+        # Loops among de-energized nodes: sections - nodes + components
+        parent = np.arange(self.nNodes)
+        components = int(islandNodes.sum())
+        for section in np.flatnonzero(islandSections):
+            fromRoot = _findRoot(parent, self.sectionFrom[section])
+            toRoot = _findRoot(parent, self.sectionTo[section])
+            if fromRoot != toRoot:
+                parent[fromRoot] = toRoot
+                components -= 1
+        return int(islandSections.sum()) - int(islandNodes.sum()) + components
+
+    def sourceFeeders(self):
+        """Network of the first section leaving each source node."""
+        feeders = np.full(len(self.sourceNodes), '', dtype=object)
+        for sourceCtr, node in enumerate(self.sourceNodes):
+            entries = self.entrySections[self.indptr[node]:self.indptr[node + 1]]
+            if len(entries) != 0:
+                feeders[sourceCtr] = self.sectionNetworks[entries[0]]
+        return feeders
+
+    def nodeFeeders(self, isOpen=None):
+        """Feeder energizing each node ('' if it is not energized)."""
+        sourceOf, _, _ = self.traverse(isOpen)
+        feeders = np.append(self.sourceFeeders(), '')
+        return feeders[sourceOf]
+
+    def deviceFeeders(self, isOpen=None):
+        """
+        Feeder each switching device belongs to in the configuration.
+
+        A device is assigned the feeder of the nearer energized end of its
+        section, so an open tie switch belongs to the feeder of its from-node.
+        """
+        nodeFeeders = self.nodeFeeders(isOpen)
+        sections = np.maximum(self.deviceSections, 0)
+        feeders = np.where(nodeFeeders[self.sectionFrom[sections]] != '',
+                           nodeFeeders[self.sectionFrom[sections]],
+                           nodeFeeders[self.sectionTo[sections]])
+        return np.where(self.deviceSections >= 0, feeders, '').astype(object)
+
+    def parentNodes(self, parentSection, order):
+        """
+        Node each node of order is fed from (-1 for the sources), given the
+        parentSection and order returned by traverse().
+        """
+        fedSections = parentSection[order]
+        sections = np.maximum(fedSections, 0)
+        parentNodes = np.where(self.sectionTo[sections] == order, self.sectionFrom[sections],
+                               self.sectionTo[sections])
+        return np.where(fedSections >= 0, parentNodes, -1)
+
+    def feederSummary(self, isOpen=None):
+        """
+        Size of every feeder in the configuration, one row per source.
+
+        Columns 'Feeder', 'Nodes', 'Load', 'DER', 'Length' (of the sections the
+        feeder supplies), 'MaxDistance' and 'MeanDistance' (along the sections
+        from the source), and 'MaxDepth' and 'MeanDepth' (in sections).
+        """
+        sourceOf, parentSection, order = self.traverse(isOpen)
+        depth = [0] * self.nNodes
+        distance = [0.0] * self.nNodes
+        sectionLengths = self.sectionLengths.tolist()
+        for node, parentNode, section in zip(order.tolist(),
+                                             self.parentNodes(parentSection, order).tolist(),
+                                             parentSection[order].tolist()):
+            if parentNode >= 0:
+                depth[node] = depth[parentNode] + 1
+                distance[node] = distance[parentNode] + sectionLengths[section]
+        depth = np.array(depth, dtype=float)
+        distance = np.array(distance, dtype=float)
+        # Length of the section each node is fed through
+        fedLength = np.where(parentSection >= 0,
+                             self.sectionLengths[np.maximum(parentSection, 0)], 0.0)
+        nSources = len(self.sourceNodes)
+        energized = sourceOf >= 0
+        feederOf = sourceOf[energized]
+        nodes = np.bincount(feederOf, minlength=nSources)
+        maxDepth = np.zeros(nSources)
+        np.maximum.at(maxDepth, feederOf, depth[energized])
+        maxDistance = np.zeros(nSources)
+        np.maximum.at(maxDistance, feederOf, distance[energized])
+        return pd.DataFrame({
+            'Feeder': self.sourceFeeders(),
+            'Nodes': nodes,
+            'Load': np.bincount(feederOf, weights=self.nodeLoads[energized], minlength=nSources),
+            'DER': np.bincount(feederOf, weights=self.nodeDER[energized], minlength=nSources),
+            'Length': np.bincount(feederOf, weights=fedLength[energized], minlength=nSources),
+            'MaxDistance': maxDistance,
+            'MeanDistance': (np.bincount(feederOf, weights=distance[energized], minlength=nSources)
+                             / np.maximum(nodes, 1)),
+            'MaxDepth': maxDepth,
+            'MeanDepth': (np.bincount(feederOf, weights=depth[energized], minlength=nSources)
+                          / np.maximum(nodes, 1)),
+        })
+
+    def downstreamLoad(self, isOpen=None):
+        """
+        Load supplied through each switching device (0 for open devices).
+
+        Computed for all devices at once by summing the node loads from the
+        end of the feeders back to the sources.
+        """
+        isOpen = self.isOpen if isOpen is None else np.asarray(isOpen, dtype=bool)
+        sourceOf, parentSection, order = self.traverse(isOpen)
+        subtreeLoad = np.where(sourceOf >= 0, self.nodeLoads, 0.0)
+        # Node fed through each section, -1 where the section carries no load
+        sectionChild = np.full(self.nSections, -1, dtype=np.int64)
+        fedSections = parentSection[order]
+        fed = fedSections >= 0
+        sectionChild[fedSections[fed]] = order[fed]
+        parentNodes = self.parentNodes(parentSection, order)
+        subtreeLoad = subtreeLoad.tolist()
+        for node, parentNode in zip(order[::-1].tolist(), parentNodes[::-1].tolist()):
+            if parentNode >= 0:
+                subtreeLoad[parentNode] += subtreeLoad[node]
+        subtreeLoad = np.array(subtreeLoad)
+        children = sectionChild[np.maximum(self.deviceSections, 0)]
+        loads = np.where(children >= 0, subtreeLoad[np.maximum(children, 0)], 0.0)
+        return np.where((self.deviceSections >= 0) & ~isOpen, loads, 0.0)
+
+    def save(self, filePath):
+        """Save the topology to a compressed .npz file."""
+        np.savez_compressed(filePath, fingerprint=np.array(self.fingerprint),
+                            extractOptions=np.array(self.extractOptions),
+                            **{name: getattr(self, name) for name in _SAVED_ARRAYS})
+
+
+def _findRoot(parent, node):
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+def loadTopology(filePath):
+    """Read a NetworkTopology written by NetworkTopology.save."""
+    with np.load(filePath, allow_pickle=False) as data:
+        return NetworkTopology(*[data[name] for name in _SAVED_ARRAYS],
+                               fingerprint=str(data['fingerprint']),
+                               extractOptions=(str(data['extractOptions'])
+                                               if 'extractOptions' in data.files else ''))
+
+
+def _optionsText(options):
+    # Canonical JSON text of the extractTopology options
+    return json.dumps({name: options[name] for name in _EXTRACT_OPTIONS}, sort_keys=True,
+                      default=str)
+
+
+def _deviceTotals(cympyLib, deviceType, valueKey, sectionIndex, sectionTo, nNodes):
+    # Sum of 1 (or of GetValue(valueKey)) over the devices of a type, per node
+    totals = np.zeros(nNodes, dtype=float)
+    if deviceType is not None:
+        for device in cympyLib.study.ListDevices(getattr(cympyLib.enums.DeviceType, deviceType)):
+            position = sectionIndex.get(device.SectionID)
+            if position is not None:
+                totals[sectionTo[position]] += (1.0 if valueKey is None
+                                                else float(device.GetValue(valueKey)))
+    return totals
+
+
+def _sectionLength(section, lengthKey):
+    # Sections without a readable length count as 1
+    if lengthKey is None:
+        return 1.0
+    try:
+        return float(section.GetValue(lengthKey))
+    except Exception:
+        return 1.0
+
+
+def extractTopology(snapshot, cympyLib=None, sourceNodes=None, loadDeviceType='SpotLoad',
+                    loadKey=None, studyFilePath=None, derDeviceType=None, derKey=None,
+                    lengthKey='Length'):
+    """
+    Read the sections, sources and loads of the open study into a NetworkTopology.
+
+    The switching devices are those of snapshot.  Each load device counts as
+    1, or as float(GetValue(loadKey)) if loadKey is given, and likewise for
+    the DER devices of derDeviceType (none by default).  The section lengths
+    are read with GetValue(lengthKey).  studyFilePath is only used to record
+    the study fingerprint.
+    """
+    startTime = time.perf_counter()
+    extractOptions = _optionsText({'sourceNodes': sourceNodes, 'loadDeviceType': loadDeviceType,
+                                   'loadKey': loadKey, 'derDeviceType': derDeviceType,
+                                   'derKey': derKey, 'lengthKey': lengthKey})
+    cympyLib = getCympy(cympyLib)
+    nodeIndex = {}
+    sectionIndex = {}
+    sectionFrom = []
+    sectionTo = []
+    sectionNetworks = []
+    sectionLengths = []
+    toNodes = set()
+    for section in cympyLib.study.ListSections():
+        fromNodeID = section.GetValue('FromNodeID')
+        toNodeID = section.GetValue('ToNodeID')
+        sectionIndex[section.SectionID] = len(sectionIndex)
+        sectionFrom.append(nodeIndex.setdefault(fromNodeID, len(nodeIndex)))
+        sectionTo.append(nodeIndex.setdefault(toNodeID, len(nodeIndex)))
+        sectionNetworks.append(section.GetValue('NetworkID'))
+        sectionLengths.append(_sectionLength(section, lengthKey))
+        toNodes.add(toNodeID)
+    if sourceNodes is None:
+        sourceNodes = [nodeID for nodeID in nodeIndex if nodeID not in toNodes]
+
+    nodeLoads = _deviceTotals(cympyLib, loadDeviceType, loadKey, sectionIndex, sectionTo,
+                              len(nodeIndex))
+    nodeDER = _deviceTotals(cympyLib, derDeviceType, derKey, sectionIndex, sectionTo,
+                            len(nodeIndex))
+
+    topology = NetworkTopology(
+        list(nodeIndex), list(sectionIndex), sectionFrom, sectionTo, sectionNetworks,
+        snapshot.ids.astype(str), snapshot.types.astype(str),
+        [sectionIndex.get(sectionID, -1) for sectionID in snapshot.sectionIDs],
+        ~snapshot.isClosed, [nodeIndex[nodeID] for nodeID in sourceNodes if nodeID in nodeIndex],
+        nodeLoads, nodeDER, sectionLengths,
+        studyFingerprint(studyFilePath) if studyFilePath is not None else '', extractOptions)
+    topology.extractTime = time.perf_counter() - startTime
+    return topology
+
+
+def cachedTopology(filePath, studyFilePath, snapshot, cympyLib=None, **extractOptions):
+    """
+    Load the topology saved at filePath, or extract and save it.
+
+    The saved topology is only reused if it was extracted from a study file
+    with the same contents, with the same switching devices as snapshot and
+    with the same extractOptions (defaults included).
+    """
+    fingerprint = studyFingerprint(studyFilePath)
+    wantedOptions = inspect.signature(extractTopology).bind(snapshot, cympyLib, **extractOptions)
+    wantedOptions.apply_defaults()
+    wantedOptions = _optionsText(wantedOptions.arguments)
+    if os.path.isfile(filePath):
+        try:
+            topology = loadTopology(filePath)
+        except KeyError:
+            # Saved by an older version without all of the arrays
+            topology = None
+        if (topology is not None and topology.fingerprint == fingerprint
+                and topology.extractOptions == wantedOptions
+                and np.array_equal(topology.deviceIDs, snapshot.ids.astype(str))):
+            return topology
+    topology = extractTopology(snapshot, cympyLib, studyFilePath=studyFilePath, **extractOptions)
+    topology.save(filePath)
+    return topology
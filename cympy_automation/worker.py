@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Resident CYME Worker             ###
+
+
+# Every run of a script pays for starting Python, import cympy (and with it a
+#   license checkout) and cympy.study.Open before any simulation starts.
+#   StudyWorker is a process that does this once and then keeps the study open
+#   in a StudySession (see pipeline.py) while it takes jobs from a local queue:
+#       - 'applySwitchStates':  set the devices to a switching device CSV
+#       - 'runNCO':             run NCO with an NCO profile or settings, save
+#                                 its report and read back the switch states
+#       - 'runDrive':           run EPRI DRIVE with a DRIVE profile on all or
+#                                 some feeders and return the parsed HC
+#       - 'restoreBaseline', 'saveStudy', 'status' and 'shutdown'
+#   Each job returns a JobResult with the parsed results (dicts and DataFrames),
+#   so a job takes only the time of the simulation itself
+#
+# The jobs are sent over a local socket (multiprocessing.connection, with an
+#   authentication key).  Any number of clients can connect; their jobs are
+#   queued and run one at a time in the order received, since a CYME session
+#   runs one simulation at a time.  startWorker() starts a worker process and
+#   writes its address to CymeWorker.json in the output folder, so other
+#   scripts can connect to the running worker with connectWorker(folder)
+#
+# A worker started with startWorker() is a daemon process: it ends with the
+#   script that started it.  To keep a worker running between scripts, run
+#   runWorker() in its own process (StudyWorker_ExampleScript.py with
+#   runAsWorker = True) and shut it down with a 'shutdown' job
+#
+# Example:
+#   workerProcess, client = startWorker(studyFilePath, saveResultsFolder)
+#   client.applySwitchStates(switchStatesFilePath)
+#   jobResult = client.runDrive('Manual', 'no-protection')
+#   print(jobResult.result['hcResults'])
+#   client.shutdown()
+#
+# StudyWorker_ExampleScript.py can also be run on its own as a worker that is
+#   left running (runWorker), and then as a client of that worker
+#
+# Notes:
+#   The worker holds a CYME license until it is shut down.  It acquires it with
+#       backoff like the scenario workers do (see licenses.py)
+#   Jobs that change the switch states ('applySwitchStates', 'runNCO') start
+#       from the study as opened unless fromBaseline=False is given, so their
+#       results do not depend on the jobs run before them
+#   On Windows the worker process re-imports the main script, so startWorker()
+#       must be called from under  if __name__ == '__main__':
+#   The authentication key is saved in CymeWorker.json, which is created
+#       readable by its owner only.  On Windows the file takes the permissions
+#       of the output folder, so keep the worker's folder (the outputFolder of
+#       startWorker) apart from results shared with other users
+
+
+import collections
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import threading
+import time
+
+from .driveprofiles import DriveProfile, loadDriveProfile
+from .licenses import DEFAULT_BACKOFF, acquireBackend
+from .ncoprofiles import NCOProfile, loadNCOProfile
+from .pipeline import StudySession
+
+
+WORKER_FILE = 'CymeWorker.json'
+
+WORKER_JOBS = ('applySwitchStates', 'runNCO', 'runDrive', 'restoreBaseline', 'saveStudy',
+               'status', 'shutdown')
+
+WorkerJob = collections.namedtuple('WorkerJob', ['jobID', 'kind', 'arguments', 'submitted'])
+WorkerJob.__doc__ = 'A job sent to a StudyWorker: its kind (one of WORKER_JOBS) and keyword arguments.'
+
+JobResult = collections.namedtuple('JobResult',
+                                   ['jobID', 'kind', 'status', 'result', 'message', 'queued',
+                                    'elapsed'])
+JobResult.__doc__ = "Outcome of a job: status 'done' or 'failed', its results, and the time (s) it was queued and ran."
+
+
+class StudyWorker:
+    """One CymPy session with the study open, running jobs from a local queue."""
+
+    def __init__(self, studyFilePath, outputFolder, cympyLib=None, profiler=None):
+        self.session = StudySession(studyFilePath, outputFolder, cympyLib, profiler)
+        self.session.open()
+        self.session.takeSnapshot(filename=None)
+        self.jobsRun = 0
+        self.startTime = time.time()
+        self._jobs = queue.Queue()
+
+    def _profile(self, profile, loadFunction, profileClass, overrides):
+        if isinstance(profile, str):
+            return loadFunction(profile, overrides=overrides)
+        if isinstance(profile, dict):
+            return profileClass('', profile).withOverrides(overrides)
+        return profile.withOverrides(overrides)
+
+    def applySwitchStates(self, switchStatesFilePath, onlyChanges=True, fromBaseline=True):
+        if fromBaseline:
+            self.session.restoreBaseline()
+        switchResult = self.session.applySwitchStates(switchStatesFilePath, onlyChanges)
+        return {'matched': len(switchResult.positions), 'writes': switchResult.writes,
+                'writesAvoided': switchResult.writesAvoided,
+                'missingDevices': list(switchResult.missingDevices),
+                'unknownTypes': list(switchResult.unknownTypes)}
+
+    def runNCO(self, name, ncoProfile, overrides=None, operableOnly=True, fromBaseline=True):
+        if fromBaseline:
+            self.session.restoreBaseline()
+        profile = self._profile(ncoProfile, loadNCOProfile, NCOProfile, overrides)
+        optimization = self.session.optimize(name, profile, operableOnly=operableOnly)
+        result = {'optimized': optimization.optimized, 'message': optimization.message,
+                  'reportPath': optimization.reportPath, 'statesPath': optimization.statesPath,
+                  'changedDevices': 0}
+        if optimization.optimized:
+            changed = optimization.readback.isOpen != self.session.baseline.isOpen
+            result['changedDevices'] = int(changed.sum())
+        return result
+
+    def runDrive(self, name, driveProfile, feeders=None, overrides=None):
+        session = self.session
+        session.configureDrive(self._profile(driveProfile, loadDriveProfile, DriveProfile,
+                                             overrides))
+        if feeders is not None:
+            requested = [str(feeder) for feeder in feeders]
+            feeders = [feeder for feeder in session.feeders if str(feeder) in requested]
+            if len(feeders) != len(set(requested)):
+                unknown = sorted(set(requested) - set(str(feeder) for feeder in feeders))
+                raise ValueError('Feeders not in the study: ' + ', '.join(unknown))
+        evaluation = session.evaluate(name, feeders=feeders)
+        return {'hcResults': evaluation.hcResults, 'reportPath': evaluation.reportPath,
+                'maxDistAvg': float(evaluation.maxDistAvg),
+                'maxCentAvg': float(evaluation.maxCentAvg)}
+
+    def restoreBaseline(self):
+        return {'writes': self.session.restoreBaseline().switchWrites}
+
+    def saveStudy(self, filename):
+        return {'path': self.session.saveStudy(filename)}
+
+    def status(self):
+        return {'study': self.session.studyFilePath, 'pid': os.getpid(),
+                'devices': len(self.session.snapshot), 'feeders': len(self.session.feeders),
+                'jobsRun': self.jobsRun, 'queued': self._jobs.qsize(),
+                'uptime': time.time() - self.startTime}
+
+    def shutdown(self):
+        return {'jobsRun': self.jobsRun}
+
+    def handle(self, job):
+        """Run one job and return its JobResult; errors are reported, not raised."""
+        startTime = time.time()
+        queued = startTime - job.submitted
+        if job.kind not in WORKER_JOBS:
+            return JobResult(job.jobID, job.kind, 'failed', None,
+                             'Unknown job ' + repr(job.kind) + '; the jobs are '
+                             + ', '.join(WORKER_JOBS), queued, 0.0)
+        try:
+            result = getattr(self, job.kind)(**job.arguments)
+            status = 'done'
+            message = ''
+        except Exception as e:
+            result = None
+            status = 'failed'
+            message = repr(e)
+        self.jobsRun += 1
+        return JobResult(job.jobID, job.kind, status, result, message, queued,
+                         time.time() - startTime)
+
+    def _readJobs(self, connection):
+        # Queue the jobs of one client until it disconnects
+        try:
+            while True:
+                self._jobs.put((connection, connection.recv()))
+        except (EOFError, OSError):
+            connection.close()
+
+    def _acceptClients(self, listener):
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                continue
+            threading.Thread(target=self._readJobs, args=(connection,), daemon=True).start()
+
+    def serve(self, listener):
+        """Run the queued jobs of all clients of listener until a 'shutdown' job."""
+        threading.Thread(target=self._acceptClients, args=(listener,), daemon=True).start()
+        while True:
+            connection, job = self._jobs.get()
+            jobResult = self.handle(job)
+            try:
+                connection.send(jobResult)
+            except (OSError, EOFError):
+                pass
+            if job.kind == 'shutdown':
+                break
+        listener.close()
+
+
+class WorkerClient:
+    """Connection to a StudyWorker that submits jobs and waits for their results."""
+
+    def __init__(self, address, authkey):
+        self.address = tuple(address)
+        self._connection = multiprocessing.connection.Client(self.address, authkey=authkey)
+        self._jobCtr = 0
+
+    def submit(self, kind, **arguments):
+        """Send a job and return its JobResult once the worker has run it."""
+        self._jobCtr += 1
+        self._connection.send(WorkerJob(str(os.getpid()) + '-' + str(self._jobCtr), kind,
+                                        arguments, time.time()))
+        return self._connection.recv()
+
+    def applySwitchStates(self, switchStatesFilePath, onlyChanges=True, fromBaseline=True):
+        return self.submit('applySwitchStates', switchStatesFilePath=switchStatesFilePath,
+                           onlyChanges=onlyChanges, fromBaseline=fromBaseline)
+
+    def runNCO(self, name, ncoProfile, overrides=None, operableOnly=True, fromBaseline=True):
+        return self.submit('runNCO', name=name, ncoProfile=ncoProfile, overrides=overrides,
+                           operableOnly=operableOnly, fromBaseline=fromBaseline)
+
+    def runDrive(self, name, driveProfile, feeders=None, overrides=None):
+        return self.submit('runDrive', name=name, driveProfile=driveProfile, feeders=feeders,
+                           overrides=overrides)
+
+    def restoreBaseline(self):
+        return self.submit('restoreBaseline')
+
+    def saveStudy(self, filename):
+        return self.submit('saveStudy', filename=filename)
+
+    def status(self):
+        return self.submit('status')
+
+    def shutdown(self):
+        """Stop the worker after the jobs queued before this one."""
+        jobResult = self.submit('shutdown')
+        self.close()
+        return jobResult
+
+    def close(self):
+        self._connection.close()
+
+
+def workerFilePath(outputFolder):
+    return os.path.join(outputFolder, WORKER_FILE)
+
+
+def connectWorker(outputFolder):
+    """
+    WorkerClient of the worker started with this output folder (see startWorker).
+
+    Raises OSError if no worker is running; the CymeWorker.json of a worker
+    that ended without removing it (e.g. killed) is deleted.
+    """
+    with open(workerFilePath(outputFolder)) as workerFile:
+        workerInfo = json.load(workerFile)
+    try:
+        return WorkerClient((workerInfo['host'], workerInfo['port']),
+                            bytes.fromhex(workerInfo['authkey']))
+    except ConnectionRefusedError:
+        # The listener is created before the file is written, so the worker has ended
+        os.remove(workerFilePath(outputFolder))
+        raise
+
+
+def runWorker(studyFilePath, outputFolder, backendFactory=None, host='localhost', port=0,
+              authkey=None, backoff=DEFAULT_BACKOFF, readyConnection=None):
+    """
+    Start a StudyWorker in this process and serve jobs until it is shut down.
+
+    The backend is created with backendFactory (the real cympy when None),
+    retrying with backoff while no license is free.  The address is written
+    to CymeWorker.json in outputFolder and, if given, sent to readyConnection.
+    """
+    try:
+        authkey = authkey or os.urandom(16)
+        acquisition = acquireBackend(backendFactory, backoff)
+        worker = StudyWorker(studyFilePath, outputFolder, acquisition.cympyLib)
+        listener = multiprocessing.connection.Listener((host, port), authkey=authkey)
+    except Exception as e:
+        if readyConnection is None:
+            raise
+        readyConnection.send(('failed', repr(e)))
+        return
+    host, port = listener.address
+    # The file holds the authentication key, so only its owner may read it
+    workerFileDescriptor = os.open(workerFilePath(outputFolder),
+                                   os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(workerFilePath(outputFolder), 0o600)
+    with os.fdopen(workerFileDescriptor, 'w') as workerFile:
+        json.dump({'host': host, 'port': port, 'authkey': authkey.hex(), 'pid': os.getpid(),
+                   'study': studyFilePath, 'licenseWait': acquisition.wait}, workerFile)
+    if readyConnection is not None:
+        readyConnection.send(('ready', (host, port)))
+    try:
+        worker.serve(listener)
+    finally:
+        if os.path.isfile(workerFilePath(outputFolder)):
+            os.remove(workerFilePath(outputFolder))
+
+
+def startWorker(studyFilePath, outputFolder, backendFactory=None, backoff=DEFAULT_BACKOFF,
+                timeout=None):
+    """
+    Start a worker process and return (process, WorkerClient).
+
+    Waits until the worker has its license and the study is open, or raises
+    RuntimeError if it could not start.  backendFactory must be picklable,
+    e.g. functools.partial(fakecympy.makeSyntheticStudy).  The worker is a
+    daemon process, so it ends with this process; use runWorker for a worker
+    that keeps running.
+    """
+    authkey = os.urandom(16)
+    parentConnection, childConnection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=runWorker,
+                                      args=(studyFilePath, outputFolder, backendFactory),
+                                      kwargs={'authkey': authkey, 'backoff': backoff,
+                                              'readyConnection': childConnection},
+                                      daemon=True)
+    process.start()
+    if not parentConnection.poll(timeout):
+        process.terminate()
+        raise RuntimeError('The worker did not start within ' + str(timeout) + ' s')
+    status, value = parentConnection.recv()
+    if status != 'ready':
+        process.join()
+        raise RuntimeError('The worker could not start: ' + value)
+    return process, WorkerClient(value, authkey)
+
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Feeder-Sharded EPRI DRIVE Tests             ###
+
+
+import functools
+import os
+
+import pandas as pd
+
+from cympy_automation import fakecympy, loadHCReport, runShardedDrive, saveHCReport, shardFeeders
+
+
+backendFactory = functools.partial(fakecympy.makeSyntheticStudy, nTies=6)
+
+
+def _feeders(cympyLib):
+    return cympyLib.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+
+
+def test_shardFeedersBalancesContiguousShards():
+    feeders = ['FEEDER' + str(feederCtr) for feederCtr in range(10)]
+
+    shards = shardFeeders(feeders, 3)
+
+    assert [shard.name for shard in shards] == ['Shard1', 'Shard2', 'Shard3']
+    assert [len(shard.feeders) for shard in shards] == [4, 3, 3]
+    assert [feeder for shard in shards for feeder in shard.feeders] == feeders
+    assert [len(shard.feeders) for shard in shardFeeders(feeders, 20)] == [1] * 10
+    assert [shard.feeders for shard in shardFeeders(feeders, 0)] == [feeders]
+
+
+def test_shardedDriveMatchesOneRunOnAllFeeders(tmp_path):
+    cympyLib = backendFactory()
+    feeders = _feeders(cympyLib)
+    cympyLib.sim.EPRIDrive().Run(feeders)
+    savePathHC = saveHCReport(feeders, str(tmp_path / 'HCReport_All'), cympyLib)
+    allResults = loadHCReport(savePathHC, feeders)
+
+    for maxWorkers in (1, 2):
+        outputFolder = tmp_path / ('out' + str(maxWorkers))
+        outputFolder.mkdir()
+        hcResults = runShardedDrive(feeders, 'study.sxst', str(outputFolder), nShards=3,
+                                    backendFactory=backendFactory, maxWorkers=maxWorkers)
+
+        assert list(hcResults['Shard']) == ['Shard1', 'Shard1', 'Shard2', 'Shard3']
+        assert 'Status' not in hcResults.columns
+        pd.testing.assert_frame_equal(hcResults[['Feeder', 'Distributed', 'Centralized']],
+                                      allResults[['Feeder', 'Distributed', 'Centralized']])
+        assert sorted(os.listdir(outputFolder)) == \
+            sorted(os.path.basename(savePathHC).replace('All', shard)
+                   for shard in ('Shard1', 'Shard2', 'Shard3'))
+
+
+def test_failedShardsAreReportedPerShard(tmp_path):
+    feeders = _feeders(backendFactory())
+
+    hcResults = runShardedDrive(feeders, 'study.sxst', str(tmp_path), nShards=2,
+                                switchStatesFile=str(tmp_path / 'missing.csv'),
+                                backendFactory=backendFactory, maxWorkers=1)
+
+    assert list(hcResults['Scenario']) == ['Shard1', 'Shard2']
+    assert list(hcResults['Status']) == ['Failed', 'Failed']
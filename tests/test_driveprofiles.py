@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               DRIVE Profile Tests             ###
+
+
+from cympy_automation import applyDriveProfile, loadDriveProfile
+
+
+def test_applyDriveProfileOnlyWritesChangedValues(cympyLib):
+    DRIVE = cympyLib.sim.EPRIDrive()
+    driveProfile = loadDriveProfile('no-protection', overrides={'PeakLoadModelID': 1,
+                                                                'MinLoadModelID': 1})
+
+    first = applyDriveProfile(DRIVE, driveProfile)
+    cympyLib.resetCallCounts()
+    second = applyDriveProfile(DRIVE, driveProfile)
+
+    assert len(first.written) == len(driveProfile.settings) - len(first.unchanged)
+    assert len(second.written) == 0
+    assert cympyLib.callCounts['EPRIDriveParameters.SetValue'] == 0
+
+
+def test_noneOverrideLeavesTheParameterUnset(cympyLib):
+    driveProfile = loadDriveProfile('no-protection',
+                                    overrides={'MaxRegulatorVoltageDeviation': None})
+
+    assert 'MaxRegulatorVoltageDeviation' in loadDriveProfile('no-protection').settings
+    assert 'MaxRegulatorVoltageDeviation' not in driveProfile.settings
+    assert driveProfile.hash != loadDriveProfile('no-protection').hash
+    applyDriveProfile(cympyLib.sim.EPRIDrive(), driveProfile)
+    assert 'MaxRegulatorVoltageDeviation' not in cympyLib.simParameters['EPRIDriveParameters']
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Background Report Export Tests             ###
+
+
+import concurrent.futures
+
+import pytest
+
+from cympy_automation import ReportExporter, StudySession, fakecympy
+
+
+def _fail(message):
+    raise RuntimeError(message)
+
+
+def test_waitRaisesTheExceptionOfAFailedTask():
+    results = []
+    reportExporter = ReportExporter()
+    failedFuture = reportExporter.submit(_fail, 'CSV could not be written')
+    concurrent.futures.wait([failedFuture])
+    # The tasks submitted after it still run, and only drop the tasks that succeeded
+    for value in range(3):
+        reportExporter.submit(results.append, value)
+
+    with pytest.raises(RuntimeError, match='CSV could not be written'):
+        reportExporter.wait()
+    assert results == [0, 1, 2]
+    reportExporter.wait()
+    reportExporter.close()
+
+
+def test_closeRaisesTheExceptionOfASessionCSV(tmp_path):
+    reportExporter = ReportExporter()
+    session = StudySession('study.sxst', str(tmp_path), fakecympy.makeSyntheticStudy(nTies=6),
+                           exporter=reportExporter)
+    session.open()
+    session.takeSnapshot(filename=None)
+
+    # The Future of the CSV write is not kept by the session
+    session.saveSwitchStates('Missing/SwitchDevicesAfter.csv')
+
+    with pytest.raises(OSError):
+        reportExporter.close()
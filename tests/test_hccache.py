@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Hosting Capacity Result Cache Tests             ###
+
+
+import pandas as pd
+
+from cympy_automation import HCResultCache, loadDriveProfile, studyFingerprint
+
+
+DEVICE_IDS = ['SW1', 'SW2', 'BRK1']
+TYPE_NAMES = ['Switch', 'Switch', 'Breaker']
+STATUSES = ['Close', 'Open', 'Close']
+FEEDERS = ['FEEDER1', 'FEEDER2']
+
+
+def _hcResults():
+    return pd.DataFrame({'Feeder': ['FEEDER1', '0012'], 'Distributed': [1500.5, 2300.0],
+                         'Centralized': [2800.0, 4100.25]})
+
+
+def test_getMissesThenHitsAfterPut(tmp_path):
+    hcCache = HCResultCache(str(tmp_path))
+    cacheKey = hcCache.makeKey('study', DEVICE_IDS, TYPE_NAMES, STATUSES, {'A': 1}, FEEDERS)
+
+    assert hcCache.get(cacheKey) is None
+    hcCache.put(cacheKey, _hcResults())
+    cachedResults = hcCache.get(cacheKey)
+
+    assert cacheKey in hcCache
+    assert (hcCache.hits, hcCache.misses) == (1, 1)
+    # Feeder IDs are read back as text
+    pd.testing.assert_frame_equal(cachedResults, _hcResults())
+    assert list(tmp_path.glob('*/*.tmp')) == []
+
+
+def test_keyIgnoresOrderAndStatusSpelling():
+    hcCache = HCResultCache('unused')
+    cacheKey = hcCache.makeKey('study', DEVICE_IDS, TYPE_NAMES, STATUSES, {'A': 1, 'B': 2}, FEEDERS)
+
+    assert cacheKey == hcCache.makeKey('study', DEVICE_IDS[::-1], TYPE_NAMES[::-1],
+                                       ['Closed', 'Open', 'Closed'], {'B': 2, 'A': 1},
+                                       FEEDERS[::-1])
+    assert cacheKey == hcCache.makeKey('study', DEVICE_IDS, TYPE_NAMES, ['ABC', 'None', 'ABC'],
+                                       {'A': 1, 'B': 2}, FEEDERS)
+
+
+def test_keyChangesWithEveryInput():
+    hcCache = HCResultCache('unused')
+    inputs = ['study', DEVICE_IDS, TYPE_NAMES, STATUSES, {'A': 1}, FEEDERS]
+    changedInputs = ['other study', ['SW1', 'SW3', 'BRK1'], ['Switch', 'Breaker', 'Breaker'],
+                     ['Open', 'Open', 'Close'], {'A': 2}, ['FEEDER1']]
+    cacheKey = hcCache.makeKey(*inputs)
+
+    for position, changedInput in enumerate(changedInputs):
+        keyInputs = list(inputs)
+        keyInputs[position] = changedInput
+        assert hcCache.makeKey(*keyInputs) != cacheKey
+
+
+def test_profileSettingsAreKeyedByTheirHash():
+    hcCache = HCResultCache('unused')
+    noProtection = loadDriveProfile('no-protection')
+    withProtection = loadDriveProfile('with-protection')
+
+    def makeKey(driveSettings):
+        return hcCache.makeKey('study', DEVICE_IDS, TYPE_NAMES, STATUSES, driveSettings, FEEDERS)
+
+    assert makeKey(noProtection) == makeKey(loadDriveProfile('no-protection'))
+    assert makeKey(noProtection) != makeKey(withProtection)
+
+
+def test_studyFingerprintFollowsTheFileContents(tmp_path):
+    studyPath = tmp_path / 'study.sxst'
+    studyPath.write_bytes(b'first version')
+    firstFingerprint = studyFingerprint(str(studyPath))
+
+    studyPath.write_bytes(b'second version, longer')
+
+    assert studyFingerprint(str(studyPath)) != firstFingerprint
+    assert studyFingerprint(str(studyPath)) == studyFingerprint(str(studyPath))
+    assert studyFingerprint(str(tmp_path / 'missing.sxst')) != \
+        studyFingerprint(str(tmp_path / 'other.sxst'))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Hosting Capacity Report Tests             ###
+
+
+import locale
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cympy_automation import (fakecympy, loadHCReport, parseHCReport, parseHCRows, readHCReport,
+                              summarizeHC)
+
+
+def _legacyAverages(hcData):
+    # The row loop the scripts used before parseHCReport
+    maxDERValues_Dist = []
+    maxDERValues_Cent = []
+    for rowCtr in range(0, hcData.shape[0]):
+        currRow = hcData.loc[rowCtr, :]
+        index1 = np.where(np.array(currRow) == 'Hosting Capacity')[0]
+        if len(index1) > 0:
+            maxDERValues_Dist.append(currRow.loc[3])
+            maxDERValues_Cent.append(currRow.loc[5])
+    return (np.round(np.mean(maxDERValues_Dist), decimals=2),
+            np.round(np.mean(maxDERValues_Cent), decimals=2))
+
+
+def _writeReport(tmp_path, cympyLib, reportMode, extension):
+    feeders = cympyLib.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+    rows = fakecympy.makeHCReportRows({feederID: cympyLib.hostingCapacity(feederID)
+                                       for feederID in feeders})
+    filePath = str(tmp_path / ('HCReport' + extension))
+    fakecympy.writeReportRows(rows, filePath, reportMode)
+    return feeders, filePath
+
+
+def test_parseHCReportMatchesLegacyLoop(tmp_path, cympyLib):
+    feeders, filePath = _writeReport(tmp_path, cympyLib, fakecympy.ReportModeType.MSExcel, '.xlsx')
+    hcData = readHCReport(filePath)
+
+    hcResults = parseHCReport(hcData, feeders)
+
+    assert list(hcResults['Feeder']) == feeders
+    assert summarizeHC(hcResults) == _legacyAverages(hcData)
+    for feederID, distributed, centralized in hcResults.itertuples(index=False):
+        assert (distributed, centralized) == cympyLib.hostingCapacity(feederID)
+
+
+def test_loadHCReportSameForCSVAndExcel(tmp_path, cympyLib):
+    feeders, csvPath = _writeReport(tmp_path, cympyLib, fakecympy.ReportModeType.CSV, '.csv')
+    feeders, excelPath = _writeReport(tmp_path, cympyLib, fakecympy.ReportModeType.MSExcel, '.xlsx')
+
+    csvResults = loadHCReport(csvPath, feeders)
+    excelResults = loadHCReport(excelPath, feeders)
+
+    pd.testing.assert_frame_equal(csvResults, excelResults)
+    pd.testing.assert_frame_equal(excelResults, parseHCReport(readHCReport(excelPath), feeders))
+
+
+def test_hcValuesReadWithTheLocaleNumberFormat(monkeypatch):
+    conventions = dict(locale.localeconv(), decimal_point=',', thousands_sep='\xa0')
+    monkeypatch.setattr(locale, 'localeconv', lambda: conventions)
+    rows = [['Network ID', 'FEEDER1', '', '', '', ''],
+            ['', 'Hosting Capacity', 'kW', '1 234,5', 'kW', '2\xa0221,1']]
+
+    hcResults = parseHCRows(rows, ['FEEDER1'])
+
+    assert list(hcResults['Distributed']) == [1234.5]
+    assert list(hcResults['Centralized']) == [2221.1]
+
+
+def test_unreadableHCValueRaises():
+    rows = [['', 'Hosting Capacity', 'kW', 'n/a', 'kW', '10']]
+    with pytest.raises(ValueError, match='n/a'):
+        parseHCRows(rows)
+
+
+def test_excelReportNetworkIDBeyondTheHCColumns(tmp_path):
+    rows = [[fakecympy.HC_REPORT_NAME, '', '', '', '', '', '', '']]
+    for feederID, distributed in (('FEEDER1', 100.0), ('FEEDER2', 200.0)):
+        rows.append(['', '', '', '', '', '', 'Network ID', feederID])
+        rows.append(['', 'Hosting Capacity', 'kW', distributed, 'kW', 2 * distributed, '', ''])
+    filePath = str(tmp_path / 'HCReport.xlsx')
+    fakecympy.writeReportRows(rows, filePath, fakecympy.ReportModeType.MSExcel)
+
+    hcResults = loadHCReport(filePath, ['FEEDER2', 'FEEDER1'])
+
+    assert list(hcResults['Feeder']) == ['FEEDER1', 'FEEDER2']
+    assert list(hcResults['Centralized']) == [200.0, 400.0]
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Run Journal Tests             ###
+
+
+import numpy as np
+import pandas as pd
+
+from cympy_automation import RunJournal, scenarioKey
+
+
+SCENARIOS = ['MinimizeLosses', 'MinimizeVoltageExceptions', 'BalanceLoad']
+
+
+def _hcResults(scenarioCtr):
+    return pd.DataFrame({'Feeder': ['FEEDER1', '0012'],
+                         'Distributed': [1000.0 + scenarioCtr, 2000.5],
+                         'Centralized': [3000.25, 4000.0 + scenarioCtr]})
+
+
+def _run(journalPath, outputFolder):
+    """Run the scenarios not in the journal and return the names of those run."""
+    runJournal = RunJournal(str(journalPath))
+    ran = []
+    for scenarioCtr, name in enumerate(SCENARIOS):
+        key = scenarioKey('study', 'profile', name)
+        if runJournal.get(key) is not None:
+            continue
+        outputPath = outputFolder / ('HCReport_' + name + '.csv')
+        outputPath.write_text('report')
+        runJournal.record(key, name, outputs=[outputPath], hcResults=_hcResults(scenarioCtr),
+                          values={'isOpen': np.array([True, False])})
+        ran.append(name)
+    return ran
+
+
+def test_completedScenariosAreReadBackAndSkipped(tmp_path):
+    journalPath = tmp_path / 'RunJournal.jsonl'
+
+    assert _run(journalPath, tmp_path) == SCENARIOS
+    assert _run(journalPath, tmp_path) == []
+
+    runJournal = RunJournal(str(journalPath))
+    journalEntry = runJournal.get(scenarioKey('study', 'profile', 'BalanceLoad'))
+    assert len(runJournal) == 3
+    assert (journalEntry.name, journalEntry.status) == ('BalanceLoad', 'done')
+    assert journalEntry.values == {'isOpen': [True, False]}
+    pd.testing.assert_frame_equal(journalEntry.hcResults, _hcResults(2))
+    assert runJournal.get(scenarioKey('study', 'other profile', 'BalanceLoad')) is None
+    assert runJournal.skipped == 1
+
+
+def test_scenarioWithMissingOutputsIsRunAgain(tmp_path):
+    journalPath = tmp_path / 'RunJournal.jsonl'
+    _run(journalPath, tmp_path)
+
+    (tmp_path / 'HCReport_MinimizeVoltageExceptions.csv').unlink()
+
+    assert _run(journalPath, tmp_path) == ['MinimizeVoltageExceptions']
+
+
+def test_truncatedLastLineIsDiscarded(tmp_path):
+    journalPath = tmp_path / 'RunJournal.jsonl'
+    _run(journalPath, tmp_path)
+    content = journalPath.read_bytes()
+    lastLineStart = content.rindex(b'\n', 0, len(content) - 1) + 1
+    # Crash while the last scenario was being recorded
+    journalPath.write_bytes(content[:lastLineStart + 40])
+
+    runJournal = RunJournal(str(journalPath))
+
+    assert (len(runJournal), runJournal.discarded) == (2, 1)
+    assert journalPath.read_bytes() == content[:lastLineStart]
+    assert _run(journalPath, tmp_path) == ['BalanceLoad']
+    runJournal = RunJournal(str(journalPath))
+    assert (len(runJournal), runJournal.discarded) == (3, 0)
+    assert journalPath.read_bytes().count(b'\n') == 3
+
+
+def test_scenarioKeyDependsOnEveryPart():
+    key = scenarioKey('study', 'profile', 'Sweep', [1.05, 0.95], np.array([True, False]))
+
+    assert key == scenarioKey('study', 'profile', 'Sweep', [1.05, 0.95], [True, False])
+    assert key != scenarioKey('study', 'profile', 'Sweep', [1.05, 0.95], [False, True])
+    assert key != scenarioKey('study', 'profile', 'Sweep', None, [True, False])
+    assert key != scenarioKey('other study', 'profile', 'Sweep', [1.05, 0.95], [True, False])
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               License Handling Tests             ###
+
+
+import multiprocessing
+import types
+
+import pytest
+
+from cympy_automation import (BackoffPolicy, LicenseUnavailable, LocalLicenseServer,
+                              acquireBackend)
+from cympy_automation import licenses
+
+
+BACKOFF = BackoffPolicy(initialDelay=1.0, maxDelay=4.0, factor=2.0, maxWait=20.0)
+
+
+class FakeClock:
+    """time.perf_counter stand-in that only moves when sleep is called."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.delays = []
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.delays.append(delay)
+        self.now += delay
+
+
+class FailingFactory:
+    """Backend factory that raises error for the first nFailures calls."""
+
+    def __init__(self, error, nFailures):
+        self.error = error
+        self.nFailures = nFailures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.nFailures:
+            raise self.error
+        return 'backend'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(licenses, 'time', types.SimpleNamespace(perf_counter=clock.perf_counter))
+    return clock
+
+
+def test_backoffDelaysGrowUpToMaxDelay(clock):
+    backendFactory = FailingFactory(LicenseUnavailable('No license'), 4)
+
+    licenseAcquisition = acquireBackend(backendFactory, BACKOFF, sleep=clock.sleep)
+
+    assert licenseAcquisition.cympyLib == 'backend'
+    assert licenseAcquisition.attempts == 5
+    assert licenseAcquisition.wait == pytest.approx(sum(clock.delays))
+    # Each delay is the nominal one reduced by up to half by the jitter
+    for delay, nominalDelay in zip(clock.delays, [1.0, 2.0, 4.0, 4.0]):
+        assert 0.5 * nominalDelay <= delay <= nominalDelay
+    assert len(clock.delays) == 4
+
+
+def test_backoffGivesUpAtMaxWait(clock):
+    backendFactory = FailingFactory(RuntimeError('CYME license server: no license available'), 100)
+
+    with pytest.raises(RuntimeError, match='license'):
+        acquireBackend(backendFactory, BACKOFF, sleep=clock.sleep)
+
+    # The next delay would have gone past maxWait
+    assert clock.now <= BACKOFF.maxWait < clock.now + BACKOFF.maxDelay
+    assert backendFactory.calls == len(clock.delays) + 1
+
+
+def test_otherErrorsAreRaisedWithoutRetry(clock):
+    backendFactory = FailingFactory(ValueError('Study file not found'), 1)
+
+    with pytest.raises(ValueError):
+        acquireBackend(backendFactory, BACKOFF, sleep=clock.sleep)
+
+    assert backendFactory.calls == 1
+    assert clock.delays == []
+
+
+def _holdSeat(licenseServer, checkedOut, release):
+    """Check out a seat in another process and hold it until release is set."""
+    licenseServer.checkout()
+    checkedOut.set()
+    release.wait(30)
+    licenseServer.release()
+
+
+def test_seatsAreSharedBetweenProcesses(tmp_path):
+    licenseServer = LocalLicenseServer(str(tmp_path / 'Licenses'), nLicenses=2)
+    checkedOut = multiprocessing.Event()
+    release = multiprocessing.Event()
+    process = multiprocessing.Process(target=_holdSeat, args=(licenseServer, checkedOut, release))
+    process.start()
+    try:
+        assert checkedOut.wait(30)
+        assert licenseServer.available() == 1
+
+        seat = licenseServer.checkout()
+        assert licenseServer.seat == seat
+        assert licenseServer.available() == 0
+        # Another session in this process finds no free seat
+        with pytest.raises(LicenseUnavailable):
+            LocalLicenseServer(licenseServer.folder, nLicenses=2).checkout()
+
+        licenseServer.release()
+        assert licenseServer.seat is None
+        assert licenseServer.available() == 1
+    finally:
+        release.set()
+        process.join(30)
+    assert licenseServer.available() == 2
+
+
+def test_seatIsReleasedWhenItsProcessEnds(tmp_path):
+    licenseServer = LocalLicenseServer(str(tmp_path / 'Licenses'), nLicenses=1)
+    checkedOut = multiprocessing.Event()
+    release = multiprocessing.Event()
+    process = multiprocessing.Process(target=_holdSeat, args=(licenseServer, checkedOut, release))
+    process.start()
+    assert checkedOut.wait(30)
+    assert licenseServer.available() == 0
+
+    process.terminate()
+    process.join(30)
+
+    assert licenseServer.available() == 1
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Study Pipeline Tests             ###
+
+
+import concurrent.futures
+
+import pandas as pd
+
+from cympy_automation import (Pipeline, ReportExporter, StudySession, fakecympy,
+                              loadDriveProfile)
+
+
+NCO_SETTINGS = {'Objective': 'MinimizeLosses', 'Method': 'HeuristicLocal'}
+
+
+def _session(outputFolder, exporter=None):
+    session = StudySession('study.sxst', str(outputFolder), fakecympy.makeSyntheticStudy(nTies=6),
+                           exporter=exporter)
+    session.open()
+    session.takeSnapshot()
+    session.configureDrive(loadDriveProfile('no-protection'))
+    return session
+
+
+def _pipeline():
+    return (Pipeline('MinimizeLosses_HeuristicLocal')
+            .then('restoreBaseline')
+            .then('optimize', 'MinimizeLosses_HeuristicLocal', NCO_SETTINGS)
+            .then('evaluate', 'MinimizeLosses_HeuristicLocal'))
+
+
+def test_submittedPipelinesMatchTheForegroundRun(tmp_path):
+    (tmp_path / 'foreground').mkdir()
+    (tmp_path / 'background').mkdir()
+    session = _session(tmp_path / 'foreground')
+    session.evaluate('Initial')
+    _pipeline().run(session)
+    session.evaluate('Changed', changedSince='Initial')
+
+    with ReportExporter() as reportExporter:
+        backgroundSession = _session(tmp_path / 'background', reportExporter)
+        initialFuture = Pipeline('Initial').then('evaluate', 'Initial').submit(backgroundSession)
+        pipelineFuture = _pipeline().submit(backgroundSession)
+        # Reads the evaluations while the exporter may still be adding to them
+        backgroundSession.evaluate('Changed', changedSince='Initial')
+        concurrent.futures.wait([initialFuture, pipelineFuture])
+
+    pd.testing.assert_frame_equal(backgroundSession.summary().sort_values('Name', ignore_index=True),
+                                  session.summary().sort_values('Name', ignore_index=True))
+
+
+def test_exporterWaitsForTheEvaluationsLock(tmp_path):
+    with ReportExporter() as reportExporter:
+        session = _session(tmp_path, reportExporter)
+        with session.evaluationsLock:
+            pipelineFuture = Pipeline('Initial').then('evaluate', 'Initial').submit(session)
+            done, _ = concurrent.futures.wait([pipelineFuture], timeout=0.5)
+            assert len(done) == 0
+        pipelineResult = pipelineFuture.result(timeout=30)
+
+    assert pipelineResult.values['maxDistAvg'] == session.evaluations['Initial'].maxDistAvg
+    assert list(session.summary()['Name']) == ['Initial']
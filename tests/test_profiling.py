@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Run Profiling Tests             ###
+
+
+import json
+
+from cympy_automation import Profiler, fakecympy, takeSnapshot
+
+
+def _callCounts(profiler):
+    return {(row.Stage, row.Call): row.Count for row in profiler.callTable().itertuples()}
+
+
+def test_stagesAndCallsAreCounted(cympyLib, tmp_path):
+    profiler = Profiler()
+    wrappedCympy = profiler.wrapCympy(cympyLib)
+    nSwitches = len(cympyLib.study.ListDevices(cympyLib.enums.DeviceType.Switch))
+
+    for _ in range(2):
+        with profiler.stage('Open study'):
+            wrappedCympy.study.Open('study.sxst')
+    with profiler.stage('Switches'):
+        with profiler.stage('Read states'):
+            switches = wrappedCympy.study.ListDevices(wrappedCympy.enums.DeviceType.Switch)
+            for switch in switches:
+                switch.GetValue('ClosedPhase')
+        # Wrapped devices are unwrapped when given back to cympy
+        wrappedCympy.study.QueryInfoDevice('EqState', switches[0].DeviceNumber,
+                                           switches[0].DeviceType)
+    wrappedCympy.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+
+    assert _callCounts(profiler) == {('Open study', 'cympy.study.Open'): 2,
+                                     ('Read states', 'cympy.study.ListDevices'): 1,
+                                     ('Read states', 'FakeDevice.GetValue'): nSwitches,
+                                     ('Switches', 'cympy.study.QueryInfoDevice'): 1,
+                                     ('', 'cympy.study.ListNetworks'): 1}
+    # The calls went through to the study
+    assert cympyLib.callCounts['study.Open'] == 2
+    stages = profiler.stageTable()
+    assert list(stages['Path']) == ['Open study', 'Open study', 'Switches/Read states', 'Switches']
+    assert list(stages['Depth']) == [0, 0, 1, 0]
+    summary = profiler.summary()
+    assert list(summary.index) == ['Open study', 'Read states', 'Switches', '(no stage)']
+    assert list(summary['Count']) == [2, 1, 1, 0]
+    assert list(summary['Calls']) == [2, 1 + nSwitches, 1, 1]
+
+    jsonPath, stagesPath, callsPath = profiler.save(str(tmp_path / 'ProfileTrace'))
+    with open(jsonPath) as traceFile:
+        trace = json.load(traceFile)
+    assert len(trace['stages']) == 4
+    assert sum(call['Count'] for call in trace['calls']) == nSwitches + 5
+
+
+def test_disabledProfilerReturnsThePlainCympy(cympyLib):
+    profiler = Profiler(enabled=False)
+
+    assert profiler.wrapCympy(cympyLib) is cympyLib
+    assert profiler.timed(takeSnapshot) is takeSnapshot
+    assert profiler.stage('A') is profiler.stage('B')
+    with profiler.stage('Open study'):
+        cympyLib.study.Open('study.sxst')
+    profiler.begin('Devices')
+
+    assert profiler.end() == 0.0
+    assert len(profiler.stageTable()) == 0
+    assert len(profiler.callTable()) == 0
+    assert profiler.report() == 'Profiling disabled'
+
+
+def test_timedFunctionsAreCountedButNotWrapped():
+    profiler = Profiler()
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=2)
+    timedSnapshot = profiler.timed(takeSnapshot, 'takeSnapshot')
+
+    with profiler.stage('Snapshot'):
+        snapshot = timedSnapshot(cympyLib)
+
+    assert type(snapshot) is type(takeSnapshot(cympyLib))
+    assert _callCounts(profiler) == {('Snapshot', 'takeSnapshot'): 1}
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               State Readback Tests             ###
+
+
+import numpy as np
+
+from cympy_automation import StudySession, readDeviceStates, takeSnapshot
+
+
+def test_readbackUpdatesTheSnapshot(cympyLib):
+    snapshot = takeSnapshot(cympyLib)
+    initialPhases = snapshot.closedPhases.copy()
+    cympyLib.sim.NetworkConfigurationOptimization().Run(cympyLib.study.ListNetworks())
+
+    stateReadback = readDeviceStates(snapshot, cympyLib)
+
+    assert (initialPhases != snapshot.closedPhases).sum() == 2
+    assert np.array_equal(stateReadback.isOpen, ~snapshot.isClosed)
+    assert np.array_equal(snapshot.closedPhases, takeSnapshot(cympyLib).closedPhases)
+
+
+def test_applyStatesAfterOptimizeUndoesTheNCOChanges(tmp_path, cympyLib):
+    session = StudySession('study.sxst', str(tmp_path), cympyLib)
+    session.open()
+    session.takeSnapshot()
+    initialPath = str(tmp_path / 'SwitchingDevicesStates_Initial.csv')
+    initialPhases = session.snapshot.closedPhases.copy()
+
+    optimization = session.optimize('MinimizeLosses_HeuristicLocal',
+                                    {'Objective': 'MinimizeLosses', 'Method': 'HeuristicLocal'})
+    assert optimization.optimized
+    switchResult = session.applySwitchStates(initialPath, onlyChanges=True)
+
+    assert switchResult.writes == 2
+    assert np.array_equal(takeSnapshot(cympyLib).closedPhases, initialPhases)
+    assert np.array_equal(session.snapshot.closedPhases, initialPhases)
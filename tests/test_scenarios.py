@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Scenario Runner Tests             ###
+
+
+import functools
+import os
+import types
+
+import pandas as pd
+
+from cympy_automation import (NCOScenario, fakecympy, loadDriveProfile, makeNCOScenarios,
+                              runNCOScenario, runScenarios, takeSnapshot)
+
+
+OBJECTIVES = ['MinimizeLosses', 'MinimizeVoltageExceptions', 'MinimizeOverloadExceptions',
+              'BalanceLoad']
+METHODS = ['HeuristicLocal', 'HeuristicZones', 'HeuristicZones', 'HeuristicLocal']
+
+# Columns that depend on the process and timing, not on the scenario
+RUN_COLUMNS = ['Worker', 'Elapsed', 'License Wait']
+
+
+def _run(tmp_path, maxWorkers):
+    outputFolder = tmp_path / ('out' + str(maxWorkers))
+    outputFolder.mkdir()
+    return runScenarios(makeNCOScenarios(OBJECTIVES, METHODS),
+                        functools.partial(runNCOScenario, outputFolder=str(outputFolder)),
+                        'study.sxst',
+                        backendFactory=functools.partial(fakecympy.makeSyntheticStudy, nTies=6),
+                        maxWorkers=maxWorkers, workFolder=str(tmp_path))
+
+
+def test_processPoolMatchesSequentialRun(tmp_path):
+    sequential = _run(tmp_path, 1)
+    pooled = _run(tmp_path, 2)
+
+    assert (pooled['Worker'] != os.getpid()).all()
+    assert set(sequential['Status']) == {'Initial', 'Optimized', 'No optimization'}
+    pd.testing.assert_frame_equal(pooled.drop(columns=RUN_COLUMNS),
+                                  sequential.drop(columns=RUN_COLUMNS))
+
+
+def test_runNCOScenarioStartsEachScenarioFromTheBaseline(tmp_path):
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=6)
+    baselinePhases = takeSnapshot(cympyLib).closedPhases.copy()
+    initial = NCOScenario('Initial', None, None)
+    losses = NCOScenario('MinimizeLosses_HeuristicLocal', 'MinimizeLosses', 'HeuristicLocal')
+    voltage = NCOScenario('MinimizeVoltageExceptions_HeuristicZones',
+                          'MinimizeVoltageExceptions', 'HeuristicZones')
+
+    before = runNCOScenario(cympyLib, 'study.sxst', initial, str(tmp_path))
+    afterLosses = runNCOScenario(cympyLib, 'study.sxst', losses, str(tmp_path))
+    assert not (takeSnapshot(cympyLib).closedPhases == baselinePhases).all()
+    afterVoltage = runNCOScenario(cympyLib, 'study.sxst', voltage, str(tmp_path))
+    again = runNCOScenario(cympyLib, 'study.sxst', initial, str(tmp_path))
+
+    # The study was not reopened, but the changes of each NCO run were undone
+    assert cympyLib.callCounts['study.Open'] == 1
+    assert (takeSnapshot(cympyLib).closedPhases == baselinePhases).all()
+    pd.testing.assert_frame_equal(again, before)
+
+    # A scenario gives the same HC as in a study where it is run first
+    freshStudy = fakecympy.makeSyntheticStudy(nTies=6)
+    (tmp_path / 'alone').mkdir()
+    alone = runNCOScenario(freshStudy, 'study.sxst', voltage, str(tmp_path / 'alone'))
+    pd.testing.assert_frame_equal(afterVoltage, alone)
+    assert not afterLosses['Distributed'].equals(before['Distributed'])
+
+
+def test_loadModelIndexesAreResolvedInTheStudy(tmp_path):
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=6)
+    cympyLib.study.loadModels = [types.SimpleNamespace(ID=100 + loadCtr, Name='Model' + str(loadCtr))
+                                 for loadCtr in range(6)]
+
+    hcResults = runNCOScenario(cympyLib, 'study.sxst', NCOScenario('Initial', None, None),
+                               str(tmp_path), driveSettings=loadDriveProfile('no-protection'),
+                               loadModelIndexes=(4, 5))
+
+    driveParameters = cympyLib.simParameters['EPRIDriveParameters']
+    assert driveParameters['PeakLoadModelID'] == 104
+    assert driveParameters['MinLoadModelID'] == 105
+    expectedProfile = loadDriveProfile('no-protection', overrides={'PeakLoadModelID': 104,
+                                                                   'MinLoadModelID': 105})
+    assert (hcResults['DRIVE Profile Hash'] == expectedProfile.hash).all()
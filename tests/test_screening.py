@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Load Flow Screening Tests             ###
+
+
+from cympy_automation import (DEFAULT_LIMITS, LoadFlowScreen, RadialityChecker, ScreeningLimits,
+                              SectionPhaseCache, SwitchSweep, extractTopology, fakecympy,
+                              takeSnapshot)
+
+
+def _screenCandidates(limits, maxSwaps):
+    """ScreeningResult of every sweep candidate of the SwitchSweep demo study, by name."""
+    cympyLib = fakecympy.makeSyntheticStudy(nFeeders=4, nSwitches=40)
+    snapshot = takeSnapshot(cympyLib)
+    topology = extractTopology(snapshot, cympyLib)
+    checker = RadialityChecker(cympyLib)
+    checker.build(snapshot, topology)
+    phaseCache = SectionPhaseCache(cympyLib)
+    phaseCache.populate(snapshot.sectionIDs)
+    loadFlowScreen = LoadFlowScreen(snapshot, topology.nodeIDs, limits, cympyLib)
+
+    screenResults = {'initial': loadFlowScreen.run()}
+    for candidate in SwitchSweep(snapshot, checker, maxSwaps=maxSwaps).candidates():
+        for position in candidate.closePositions:
+            snapshot.devices[position].SetValue(phaseCache.get(snapshot.sectionIDs[position]),
+                                                'ClosedPhase')
+        for position in candidate.openPositions:
+            snapshot.devices[position].SetValue('None', 'ClosedPhase')
+        screenResults[candidate.name] = loadFlowScreen.run(candidate.isOpen)
+        for position in list(candidate.closePositions) + list(candidate.openPositions):
+            snapshot.devices[position].SetValue(snapshot.closedPhases[position], 'ClosedPhase')
+    return screenResults
+
+
+def test_configurationsWithinLimitsPass():
+    screenResults = _screenCandidates(DEFAULT_LIMITS, 1)
+
+    assert all(screenResult.passed for screenResult in screenResults.values())
+    assert screenResults['close SW-T3 / open SW30'].overloadedDevices == []
+
+
+def test_configurationsOutsideLimitsAreRejected():
+    screenResults = _screenCandidates(DEFAULT_LIMITS, 2)
+
+    # Two feeders moved onto the third overload its breaker
+    overloaded = screenResults['close SW-T1+SW-T2 / open FEEDER1_BRK+FEEDER2_BRK']
+    assert not overloaded.passed
+    assert overloaded.overloadedDevices == ['FEEDER3_BRK']
+    assert screenResults['close SW-T1+SW-T3 / open SW30+FEEDER1_BRK'].passed
+
+
+def test_voltageLimitsRejectTheLowestNodes():
+    initial = _screenCandidates(ScreeningLimits(0.975, 1.05, 100.0), 1)['initial']
+
+    assert not initial.passed
+    assert len(initial.undervoltageNodes) != 0
+    assert all(voltage >= 0.97 for voltage in initial.minVoltage)
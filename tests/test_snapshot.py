@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Snapshot and Device Index Tests             ###
+
+
+import numpy as np
+
+from cympy_automation import takeSnapshot
+
+
+def test_takeSnapshotReadsEachDeviceOnce(cympyLib):
+    cympyLib.resetCallCounts()
+    snapshot = takeSnapshot(cympyLib)
+
+    nDevices = sum(len(cympyLib.study.ListDevices(getattr(cympyLib.enums.DeviceType, typeName)))
+                   for typeName in snapshot.typeNames)
+    assert len(snapshot) == nDevices
+    assert cympyLib.callCounts['Device.GetValue'] == nDevices
+    assert snapshot.callCounts['GetValue'] == nDevices
+
+
+def test_takeSnapshotKeepsTypeOrderAndStates(cympyLib):
+    snapshot = takeSnapshot(cympyLib, includeFuses=True)
+
+    assert snapshot.typeNames == ('Switch', 'Breaker', 'Recloser', 'Fuse')
+    assert list(snapshot.typeCodes) == sorted(snapshot.typeCodes)
+    for device, closedPhase in zip(snapshot.devices, snapshot.closedPhases):
+        assert device._values['ClosedPhase'] == closedPhase
+    assert list(snapshot.statuses).count('Open') == 6
+
+
+def test_deviceIndexValidate(cympyLib):
+    snapshot = takeSnapshot(cympyLib)
+    deviceIDs = [snapshot.ids[0], 'NOT-A-DEVICE', snapshot.ids[-1], snapshot.ids[0]]
+    typeNames = [snapshot.types[0], 'Switch', snapshot.types[-1], 'Capacitor']
+
+    positions, missingDevices, unknownTypes = snapshot.index.validate(deviceIDs, typeNames)
+
+    assert list(positions) == [0, -1, len(snapshot) - 1, -1]
+    assert missingDevices == ['NOT-A-DEVICE']
+    assert unknownTypes == [snapshot.ids[0]]
+
+
+def test_deviceIndexMatchesIDsAsStrings():
+    from cympy_automation import fakecympy
+    cympyLib = fakecympy.makeSyntheticStudy()
+    device = cympyLib.study.ListDevices(cympyLib.enums.DeviceType.Switch)[0]
+    device.DeviceNumber = '1042'
+    snapshot = takeSnapshot(cympyLib)
+
+    # pandas parses numeric IDs in a CSV as numbers
+    assert snapshot.index.position(1042, 'Switch') == 0
+    assert snapshot.index.position(1042, 'Breaker') is None
+    assert snapshot.index.entry('1042', 'Switch').device is device
+    assert np.array_equal(snapshot.index.validate([1042], ['Switch'])[0], [0])
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Surrogate Hosting Capacity Model Tests             ###
+
+
+import glob
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cympy_automation import (FeederImpactMap, HCSurrogate, RadialityChecker, SectionPhaseCache,
+                              SwitchSweep, extractTopology, fakecympy, loadHCReport,
+                              loadSavedResults, rankCandidates, runSweepDrive, saveHCReport,
+                              takeSnapshot, trainSurrogate)
+
+
+def _study():
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=6, nDER=30)
+    snapshot = takeSnapshot(cympyLib)
+    topology = extractTopology(snapshot, cympyLib, derDeviceType='Photovoltaic')
+    checker = RadialityChecker(cympyLib)
+    checker.build(snapshot, topology)
+    return cympyLib, snapshot, topology, checker
+
+
+def _linearHC(topology, isOpen):
+    """HC that is a known linear function of the feeder features."""
+    summary = topology.feederSummary(isOpen)
+    distributed = 500 + 3 * summary['Nodes'] + 200 * summary['Length'] - 10 * summary['DER']
+    return pd.DataFrame({'Feeder': summary['Feeder'], 'Distributed': distributed,
+                         'Centralized': 2 * distributed})
+
+
+def test_featuresUseTheSectionLengthsAndDER():
+    cympyLib, snapshot, topology, checker = _study()
+    summary = topology.feederSummary()
+
+    assert summary['DER'].sum() == 30
+    assert summary['Length'].sum() == pytest.approx(
+        sum(section.GetValue('Length') for section in cympyLib.study.ListSections()
+            if not section.SectionID.startswith('TIE')))
+    assert (summary['MaxDistance'] != summary['MaxDepth']).all()
+
+
+def test_loadSavedResultsPairsReportsWithSwitchStates(tmp_path):
+    cympyLib, snapshot, topology, checker = _study()
+    phaseCache = SectionPhaseCache(cympyLib)
+    phaseCache.populate(snapshot.sectionIDs)
+    impactMap = FeederImpactMap(cympyLib)
+    impactMap.build(snapshot)
+    feeders = cympyLib.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+    DRIVE = cympyLib.sim.EPRIDrive()
+    DRIVE.Run(feeders)
+    initialPath = saveHCReport(feeders, str(tmp_path / 'HCReport_Initial'), cympyLib)
+    baseResults = loadHCReport(initialPath, feeders)
+    candidates = list(SwitchSweep(snapshot, checker, maxCandidates=3).candidates())
+    sweepResults = list(runSweepDrive(candidates, snapshot, DRIVE, feeders, baseResults,
+                                      str(tmp_path), impactMap, phaseCache, cympyLib))
+    # A report without switch states is not used
+    shutil.copy(initialPath, initialPath.replace('HCReport_Initial', 'HCReport_NoStates'))
+
+    savedResults = loadSavedResults(str(tmp_path), topology)
+
+    assert [name for name, _, _ in savedResults] == ['Initial', 'Sweep1', 'Sweep2', 'Sweep3']
+    assert np.array_equal(savedResults[0][1], ~snapshot.isClosed)
+    for (name, isOpen, hcResults), candidate, candidateResults in zip(savedResults[1:], candidates,
+                                                                      sweepResults):
+        assert np.array_equal(isOpen, candidate.isOpen)
+        # Only the rerun feeders are in the saved report
+        rerunResults = candidateResults[candidateResults['Rerun']]
+        merged = rerunResults.merge(hcResults, on='Feeder', suffixes=('', 'Saved'))
+        assert len(merged) == len(rerunResults) == len(hcResults)
+        assert np.allclose(merged['Distributed'], merged['DistributedSaved'])
+    assert trainSurrogate(str(tmp_path), topology).nObservations == \
+        sum(len(hcResults) for _, _, hcResults in savedResults)
+
+
+def test_fitRecoversALinearRelationship():
+    cympyLib, snapshot, topology, checker = _study()
+    candidates = list(SwitchSweep(snapshot, checker, maxSwaps=2).candidates())
+    training, heldOut = candidates[::2], candidates[1::2]
+    surrogate = HCSurrogate(topology, ridge=1e-6)
+    for candidate in training:
+        surrogate.addResults(candidate.isOpen, _linearHC(topology, candidate.isOpen))
+
+    surrogate.fit()
+
+    for candidate in heldOut[:20]:
+        errors = surrogate.meanAbsoluteError(candidate.isOpen,
+                                             _linearHC(topology, candidate.isOpen))
+        assert errors['Distributed'] < 0.5
+        assert errors['Centralized'] < 1.0
+
+
+def test_rankCandidatesKeepsTheBestEstimates():
+    cympyLib, snapshot, topology, checker = _study()
+    surrogate = HCSurrogate(topology, ridge=1e-6)
+    for candidate in SwitchSweep(snapshot, checker, maxSwaps=2).candidates():
+        surrogate.addResults(candidate.isOpen, _linearHC(topology, candidate.isOpen))
+    surrogate.fit()
+    sweep = SwitchSweep(snapshot, checker, maxSwaps=2)
+    trueScores = {candidate.name: _linearHC(topology, candidate.isOpen)['Distributed'].mean()
+                  for candidate in sweep.candidates()}
+
+    topCandidates = rankCandidates(SwitchSweep(snapshot, checker, maxSwaps=2).candidates(),
+                                   surrogate, 5)
+
+    bestNames = sorted(trueScores, key=trueScores.get, reverse=True)[:5]
+    assert [candidate.name for candidate in topCandidates] == bestNames
+    assert rankCandidates(iter([]), surrogate, 5) == []
+    assert len(rankCandidates(sweep.candidates(), surrogate, 0)) == 0
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Switch Sweep Tests             ###
+
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cympy_automation import (FeederImpactMap, RadialityChecker, RunJournal, SectionPhaseCache,
+                              SwitchSweep, fakecympy, loadHCReport, runSweepDrive, saveHCReport,
+                              takeSnapshot)
+
+
+def _bruteForceCandidates(snapshot, checker, maxSwaps):
+    """Every open x closed swap of up to maxSwaps devices that the checker accepts."""
+    baseIsOpen = ~snapshot.isClosed
+    baseline = checker.check(baseIsOpen)
+    candidates = set()
+    for nSwaps in range(1, maxSwaps + 1):
+        for closePositions in itertools.combinations(np.flatnonzero(baseIsOpen).tolist(), nSwaps):
+            for openPositions in itertools.combinations(np.flatnonzero(~baseIsOpen).tolist(), nSwaps):
+                isOpen = baseIsOpen.copy()
+                isOpen[list(closePositions)] = False
+                isOpen[list(openPositions)] = True
+                result = checker.check(isOpen)
+                if result.loops <= baseline.loops and result.islandedNodes <= baseline.islandedNodes:
+                    candidates.add((closePositions, openPositions))
+    return candidates
+
+
+def test_loopPathCandidatesMatchTheRadialSwaps():
+    cympyLib = fakecympy.makeSyntheticStudy(nFeeders=4, nSwitches=40)
+    snapshot = takeSnapshot(cympyLib)
+    checker = RadialityChecker(cympyLib)
+    checker.build(snapshot)
+
+    sweep = SwitchSweep(snapshot, checker, maxSwaps=2)
+    candidates = {(tuple(candidate.closePositions.tolist()), tuple(candidate.openPositions.tolist()))
+                  for candidate in sweep.candidates()}
+
+    assert candidates == _bruteForceCandidates(snapshot, checker, 2)
+    assert sweep.pruned == 0
+    assert sweep.generated == sweep.accepted == len(candidates)
+
+
+def _runSweep(tmp_path, cympyLib, maxCandidates=1, **kwargs):
+    """Snapshot and per-candidate HC of a sweep of the synthetic study."""
+    snapshot = takeSnapshot(cympyLib)
+    phaseCache = SectionPhaseCache(cympyLib)
+    phaseCache.populate(snapshot.sectionIDs)
+    impactMap = FeederImpactMap(cympyLib)
+    impactMap.build(snapshot)
+    checker = RadialityChecker(cympyLib)
+    checker.build(snapshot)
+    feeders = cympyLib.study.ListNetworks(cympyLib.enums.NetworkType.Feeder)
+    DRIVE = cympyLib.sim.EPRIDrive()
+    DRIVE.Run(feeders)
+    baseResults = loadHCReport(saveHCReport(feeders, str(tmp_path / 'HCReport_Initial'), cympyLib),
+                               feeders)
+
+    candidates = SwitchSweep(snapshot, checker, maxCandidates=maxCandidates).candidates()
+    return snapshot, list(runSweepDrive(candidates, snapshot, DRIVE, feeders, baseResults,
+                                        str(tmp_path), impactMap, phaseCache, cympyLib, **kwargs))
+
+
+def test_sweepStatesAreWrittenAsClose(tmp_path, cympyLib):
+    snapshot, sweepResults = _runSweep(tmp_path, cympyLib)
+
+    assert len(sweepResults) == 1
+    switchStates = pd.read_csv(tmp_path / 'SwitchDevicesAfter_Sweep1.csv')
+    assert set(switchStates['Status']) == {'Open', 'Close'}
+    assert (switchStates['Status'] == 'Open').sum() == (~snapshot.isClosed).sum()
+
+
+def test_journalOnlySkipsCandidatesOfTheSameStudyAndProfile(tmp_path, cympyLib):
+    runJournal = RunJournal(str(tmp_path / 'RunJournal_Sweep.jsonl'))
+    _, firstResults = _runSweep(tmp_path, cympyLib, maxCandidates=3, journal=runJournal,
+                                runKey=('study', 'profile'))
+    driveRuns = cympyLib.callCounts['EPRIDrive.Run']
+
+    _, resumedResults = _runSweep(tmp_path, cympyLib, maxCandidates=3, journal=runJournal,
+                                  runKey=('study', 'profile'))
+    # Only the initial DRIVE run of _runSweep
+    assert cympyLib.callCounts['EPRIDrive.Run'] == driveRuns + 1
+    # The journal keeps the HC columns of each candidate
+    hcColumns = ['Candidate', 'Feeder', 'Distributed', 'Centralized']
+    for first, resumed in zip(firstResults, resumedResults):
+        pd.testing.assert_frame_equal(resumed[hcColumns], first[hcColumns], check_dtype=False)
+
+    _runSweep(tmp_path, cympyLib, maxCandidates=3, journal=runJournal,
+              runKey=('study', 'changedProfile'))
+    assert cympyLib.callCounts['EPRIDrive.Run'] == driveRuns + 2 + len(firstResults)
+
+
+def test_journalNeedsARunKey(tmp_path, cympyLib):
+    with pytest.raises(ValueError, match='runKey'):
+        _runSweep(tmp_path, cympyLib, journal=RunJournal(str(tmp_path / 'RunJournal.jsonl')))
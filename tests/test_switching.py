@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+###               Switch State Application Tests             ###
+
+
+import numpy as np
+
+from cympy_automation import SectionPhaseCache, applySwitchStates, takeSnapshot
+
+
+def _columns(snapshot):
+    return list(snapshot.ids), list(snapshot.statuses), list(snapshot.types)
+
+
+def test_applyWritesOnlyChangedDevices(cympyLib):
+    snapshot = takeSnapshot(cympyLib)
+    deviceIDs, statuses, typeNames = _columns(snapshot)
+    statuses[3] = 'Open'
+    statuses[7] = 'Open'
+    cympyLib.resetCallCounts()
+
+    switchResult = applySwitchStates(snapshot, deviceIDs, statuses, typeNames,
+                                     cympyLib=cympyLib)
+
+    assert switchResult.writes == 2
+    assert switchResult.writesAvoided == len(snapshot) - 2
+    assert cympyLib.callCounts['Device.SetValue'] == 2
+    assert snapshot.devices[3]._values['ClosedPhase'] == 'None'
+    assert snapshot.closedPhases[7] == 'None'
+
+
+def test_applyClosesOnAllPhasesOfTheSection(cympyLib):
+    snapshot = takeSnapshot(cympyLib)
+    openPosition = int(np.flatnonzero(~snapshot.isClosed)[0])
+    deviceIDs, statuses, typeNames = _columns(snapshot)
+    statuses[openPosition] = 'Close'
+
+    applySwitchStates(snapshot, deviceIDs, statuses, typeNames, SectionPhaseCache(cympyLib))
+
+    sectionPhase = cympyLib.study.sections[snapshot.sectionIDs[openPosition]]._values['Phase']
+    assert snapshot.devices[openPosition]._values['ClosedPhase'] == sectionPhase
+
+
+def test_applyLastRowWinsForDuplicateIDs(cympyLib):
+    snapshot = takeSnapshot(cympyLib)
+    deviceID, typeName = snapshot.ids[0], snapshot.types[0]
+    cympyLib.resetCallCounts()
+
+    switchResult = applySwitchStates(snapshot, [deviceID, deviceID, deviceID],
+                                     ['Close', 'Open', 'Close'], [typeName] * 3,
+                                     cympyLib=cympyLib)
+    assert switchResult.writes == 0
+    switchResult = applySwitchStates(snapshot, [deviceID, deviceID], ['Close', 'Open'],
+                                     [typeName] * 2, cympyLib=cympyLib)
+    assert switchResult.writes == 1
+    assert len(switchResult.positions) == 1
+    assert snapshot.devices[0]._values['ClosedPhase'] == 'None'
+    assert cympyLib.callCounts['Device.SetValue'] == 1
+
+
+def test_applyAllDevicesWithoutOnlyChanges(cympyLib):
+    snapshot = takeSnapshot(cympyLib)
+    cympyLib.resetCallCounts()
+
+    switchResult = applySwitchStates(snapshot, *_columns(snapshot), onlyChanges=False,
+                                     cympyLib=cympyLib)
+
+    assert switchResult.writes == len(snapshot)
+    assert cympyLib.callCounts['Device.SetValue'] == len(snapshot)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Network Topology Graph Tests             ###
+
+
+import numpy as np
+import pandas as pd
+
+from cympy_automation import (NetworkTopology, RadialityChecker, SwitchSweep, cachedTopology,
+                              extractTopology, fakecympy, loadTopology, takeSnapshot)
+
+
+# Two feeders joined by an open tie between the ends A3 and B2:
+#   S1 -a1- A1 -a2(SWA2)- A2 -a3- A3 -t(TIE)- B2 -b2- B1 -b1(SWB1)- S2
+NODE_IDS = ['S1', 'A1', 'A2', 'A3', 'S2', 'B1', 'B2']
+SECTION_IDS = ['a1', 'a2', 'a3', 'b1', 'b2', 't']
+SECTION_FROM = [0, 1, 2, 4, 5, 3]
+SECTION_TO = [1, 2, 3, 5, 6, 6]
+SECTION_NETWORKS = ['FA', 'FA', 'FA', 'FB', 'FB', 'FA']
+DEVICE_IDS = ['SWA2', 'TIE', 'SWB1']
+NODE_LOADS = [0, 1, 2, 4, 0, 8, 16]
+
+
+def _twoFeeders():
+    return NetworkTopology(NODE_IDS, SECTION_IDS, SECTION_FROM, SECTION_TO, SECTION_NETWORKS,
+                           DEVICE_IDS, ['Switch'] * 3, [1, 5, 3], [False, True, False], [0, 4],
+                           NODE_LOADS)
+
+
+def test_checkRadialityCountsLoopsAndIslands():
+    topology = _twoFeeders()
+
+    assert tuple(topology.checkRadiality()) == (True, 0, 0)
+    assert tuple(topology.checkRadiality([False, False, False])) == (False, 1, 0)
+    assert tuple(topology.checkRadiality([True, True, False])) == (False, 0, 2)
+    assert tuple(topology.checkRadiality([True, False, False])) == (True, 0, 0)
+
+
+def test_checkRadialityMatchesTheRadialityChecker():
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=6)
+    snapshot = takeSnapshot(cympyLib)
+    topology = extractTopology(snapshot, cympyLib)
+    checker = RadialityChecker(cympyLib)
+    checker.build(snapshot, topology)
+    rng = np.random.default_rng(3)
+    configurations = [candidate.isOpen for candidate in
+                      SwitchSweep(snapshot, checker, maxSwaps=2).candidates()]
+    configurations += [rng.random(len(snapshot)) < 0.2 for _ in range(50)]
+
+    for isOpen in configurations:
+        assert topology.checkRadiality(isOpen) == checker.check(isOpen)
+
+
+def test_deviceFeedersFollowTheConfiguration():
+    topology = _twoFeeders()
+
+    assert list(topology.deviceFeeders()) == ['FA', 'FA', 'FB']
+    # A2 and A3 transferred to FB: the open SWA2 stays on FA, the tie moves to FB
+    assert list(topology.deviceFeeders([True, False, False])) == ['FA', 'FB', 'FB']
+    assert list(topology.nodeFeeders([True, True, False])) == ['FA', 'FA', '', '', 'FB', 'FB',
+                                                               'FB']
+
+
+def test_parentNodesFollowTheTraversal():
+    topology = _twoFeeders()
+
+    sourceOf, parentSection, order = topology.traverse([True, False, False])
+    parentNodes = dict(zip(topology.nodeIDs[order],
+                           topology.parentNodes(parentSection, order).tolist()))
+
+    assert parentNodes == {'S1': -1, 'A1': 0, 'S2': -1, 'B1': 4, 'B2': 5, 'A3': 6, 'A2': 3}
+
+
+def test_downstreamLoadSumsTheLoadBelowEachDevice():
+    topology = _twoFeeders()
+
+    assert list(topology.downstreamLoad()) == [6, 0, 24]
+    assert list(topology.downstreamLoad([True, False, False])) == [0, 6, 30]
+    assert list(topology.downstreamLoad([False, True, True])) == [6, 0, 0]
+
+
+def test_saveAndLoadRoundTrip(tmp_path):
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=6, nDER=10)
+    snapshot = takeSnapshot(cympyLib)
+    studyPath = tmp_path / 'study.sxst'
+    studyPath.write_bytes(b'study')
+    topology = extractTopology(snapshot, cympyLib, studyFilePath=str(studyPath),
+                               derDeviceType='Photovoltaic')
+    isOpen = topology.isOpen.copy()
+    isOpen[:3] = ~isOpen[:3]
+
+    topology.save(str(tmp_path / 'topology.npz'))
+    loaded = loadTopology(str(tmp_path / 'topology.npz'))
+
+    assert loaded.fingerprint == topology.fingerprint != ''
+    for name in ('nodeIDs', 'sectionIDs', 'sectionFrom', 'sectionTo', 'sectionNetworks',
+                 'deviceIDs', 'deviceTypes', 'deviceSections', 'isOpen', 'sourceNodes',
+                 'nodeLoads', 'nodeDER', 'sectionLengths', 'indptr', 'indices', 'entrySections'):
+        assert np.array_equal(getattr(loaded, name), getattr(topology, name)), name
+    assert loaded.checkRadiality(isOpen) == topology.checkRadiality(isOpen)
+    assert np.array_equal(loaded.downstreamLoad(isOpen), topology.downstreamLoad(isOpen))
+    pd.testing.assert_frame_equal(loaded.feederSummary(isOpen), topology.feederSummary(isOpen))
+
+
+def test_cachedTopologyIsOnlyReusedWithTheSameOptions(tmp_path):
+    cympyLib = fakecympy.makeSyntheticStudy(nTies=6, nDER=10)
+    snapshot = takeSnapshot(cympyLib)
+    studyPath = str(tmp_path / 'study.sxst')
+    topologyPath = str(tmp_path / 'topology.npz')
+
+    def extractions(**extractOptions):
+        listCalls = cympyLib.callCounts['study.ListSections']
+        topology = cachedTopology(topologyPath, studyPath, snapshot, cympyLib, **extractOptions)
+        return topology, cympyLib.callCounts['study.ListSections'] - listCalls
+
+    topology, nExtracted = extractions()
+    assert (nExtracted, topology.nodeDER.sum()) == (1, 0)
+    # Passing the default value is the same option
+    assert extractions(loadDeviceType='SpotLoad')[1] == 0
+    topology, nExtracted = extractions(derDeviceType='Photovoltaic')
+    assert (nExtracted, topology.nodeDER.sum()) == (1, 10)
+    assert extractions(derDeviceType='Photovoltaic')[1] == 0
+    assert extractions(derDeviceType='Photovoltaic', lengthKey=None)[1] == 1
+
+    # A file saved without the options is extracted again
+    topology.extractOptions = ''
+    topology.save(topologyPath)
+    assert extractions(derDeviceType='Photovoltaic', lengthKey=None)[1] == 1
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+BSD 3-Clause License
+
+Copyright 2024 National Technology & Engineering Solutions of Sandia, LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights in this software.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+* Neither the name of the copyright holder nor the names of its
+  contributors may be used to endorse or promote products derived from
+  this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+
+###               Resident CYME Worker Tests             ###
+
+
+import functools
+import os
+import stat
+
+import pytest
+
+from cympy_automation import WORKER_FILE, connectWorker, fakecympy, startWorker, takeSnapshot
+
+
+@pytest.fixture
+def worker(tmp_path):
+    workerProcess, client = startWorker('study.sxst', str(tmp_path),
+                                        functools.partial(fakecympy.makeSyntheticStudy, nTies=6),
+                                        timeout=60)
+    yield workerProcess, client
+    if workerProcess.is_alive():
+        workerProcess.terminate()
+        workerProcess.join(30)
+
+
+def test_workerJobRoundTrip(tmp_path, worker):
+    workerProcess, client = worker
+    snapshot = takeSnapshot(fakecympy.makeSyntheticStudy(nTies=6))
+    switchStates = snapshot.toDataFrame()
+    switchStates['Status'] = snapshot.statuses
+    closedPositions = [position for position, isClosed in enumerate(snapshot.isClosed) if isClosed]
+    switchStates.loc[switchStates.index[closedPositions[:2]], 'Status'] = 'Open'
+    statesPath = str(tmp_path / 'SwitchStates_Manual.csv')
+    switchStates.to_csv(statesPath)
+
+    switchJob = client.applySwitchStates(statesPath)
+    assert switchJob.status == 'done', switchJob.message
+    assert switchJob.result['writes'] == 2
+    assert switchJob.result['missingDevices'] == []
+
+    ncoJob = client.runNCO('MinimizeLosses_HeuristicLocal', 'MinimizeLosses_HeuristicLocal')
+    assert ncoJob.status == 'done', ncoJob.message
+    assert ncoJob.result['optimized']
+    assert ncoJob.result['changedDevices'] == 2
+    assert os.path.isfile(ncoJob.result['statesPath'])
+
+    driveJob = client.runDrive('Optimized', 'no-protection')
+    assert driveJob.status == 'done', driveJob.message
+    assert len(driveJob.result['hcResults']) == 4
+    assert driveJob.result['maxDistAvg'] > 0
+
+    shutdownJob = client.shutdown()
+    assert shutdownJob.status == 'done'
+    # The jobs run before the shutdown
+    assert shutdownJob.result['jobsRun'] == 3
+    workerProcess.join(30)
+    assert workerProcess.exitcode == 0
+    assert not os.path.isfile(tmp_path / WORKER_FILE)
+
+
+def test_workerFileIsOnlyReadableByItsOwner(tmp_path, worker):
+    workerProcess, client = worker
+
+    if os.name != 'nt':
+        assert stat.S_IMODE(os.stat(tmp_path / WORKER_FILE).st_mode) == 0o600
+    secondClient = connectWorker(str(tmp_path))
+    assert secondClient.status().result['pid'] == workerProcess.pid
+    secondClient.close()
+    client.shutdown()
+
+
+def test_connectRemovesTheFileOfAnEndedWorker(tmp_path, worker):
+    workerProcess, client = worker
+    client.close()
+    # A killed worker cannot remove its CymeWorker.json
+    workerProcess.terminate()
+    workerProcess.join(30)
+    assert os.path.isfile(tmp_path / WORKER_FILE)
+
+    with pytest.raises(ConnectionRefusedError):
+        connectWorker(str(tmp_path))
+    assert not os.path.isfile(tmp_path / WORKER_FILE)